@@ -6,8 +6,12 @@ from typing import List, Dict, Any
 from urllib.parse import urljoin, urlparse
 import re
 
+from src.net import ratelimit
+
 log = logging.getLogger(__name__)
 
+http = ratelimit.session()
+
 class GovernmentScraper:
     def __init__(self):
         self.african_gov_domains = [
@@ -63,7 +67,7 @@ class GovernmentScraper:
         for agency_domain in security_agencies:
             try:
                 url = f"https://{agency_domain}"
-                resp = requests.head(url, timeout=5)
+                resp = http.head(url, timeout=5)
                 if resp.status_code == 200:
                     feed_sources = self._find_gov_feeds(url, country, agency_domain)
                     sources.extend(feed_sources)
@@ -79,7 +83,7 @@ class GovernmentScraper:
         sources = []
         
         try:
-            resp = requests.get(url, timeout=10)
+            resp = http.get(url, timeout=10)
             if resp.status_code != 200:
                 return sources
             
@@ -104,7 +108,7 @@ class GovernmentScraper:
             
             sitemap_url = url.rstrip('/') + '/sitemap.xml'
             try:
-                sitemap_resp = requests.get(sitemap_url, timeout=5)
+                sitemap_resp = http.get(sitemap_url, timeout=5)
                 if sitemap_resp.status_code == 200:
                     sources.append({
                         "url": sitemap_url,
@@ -143,7 +147,7 @@ class GovernmentScraper:
         documents = []
         
         try:
-            resp = requests.get(url, timeout=15)
+            resp = http.get(url, timeout=15)
             soup = BeautifulSoup(resp.text, 'html.parser')
             
             for link in soup.find_all('a', href=True):
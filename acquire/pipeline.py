@@ -14,10 +14,10 @@ import os
 import sys
 import logging
 import requests
+from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any
 from urllib.parse import urlparse
-import yaml
 from serpapi import GoogleSearch
 from bs4 import BeautifulSoup
 import tldextract
@@ -26,10 +26,14 @@ import json
 from acquire.credibility import CredibilityScorer
 from acquire.gov_scraper import GovernmentScraper
 from acquire.opencorporates import CorporateDataCollector
+from src import whitelist
+from src.net import fetch, ratelimit
 
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
 
+http = ratelimit.session()
+
 class AutoSourcePipeline:
     """Automated intelligence source discovery and validation"""
     
@@ -112,12 +116,14 @@ class AutoSourcePipeline:
         # Phase 5: Discover government sources
         gov_sources = self.gov_scraper.discover_agencies()
         gov_validated = [self.validate_source(s) for s in gov_sources if self.validate_source(s)['is_valid']]
+        sitemaps_added = self.update_sitemaps(gov_sources)
         
         log.info(f"Discovered {len(discovered)} sources")
         log.info(f"Validated {len(validated)} sources")
         log.info(f"Scored {len(scored)} sources")
         log.info(f"Auto-added {auto_added} sources to whitelist")
         log.info(f"Found {len(gov_validated)} government sources")
+        log.info(f"Added {sitemaps_added} government sitemaps")
         
         return {
             'discovered': discovered,
@@ -221,7 +227,7 @@ class AutoSourcePipeline:
             
             for url in rss_candidates:
                 try:
-                    resp = requests.head(url, timeout=5)
+                    resp = http.head(url, timeout=5)
                     if resp.status_code == 200:
                         sources.append({
                             "url": url,
@@ -254,7 +260,7 @@ class AutoSourcePipeline:
                 # Check if they have RSS feeds
                 for feed_path in ["/rss", "/feed", "/feed.xml"]:
                     url = f"{site}{feed_path}"
-                    resp = requests.head(url, timeout=5)
+                    resp = http.head(url, timeout=5)
                     if resp.status_code == 200:
                         sources.append({
                             "url": url,
@@ -287,9 +293,11 @@ class AutoSourcePipeline:
         try:
             # Test accessibility
             start = time.time()
-            resp = requests.get(
+            resp = fetch.get(
+                http,
                 url,
-                timeout=15,
+                "feed" if source.get("source_type") == "rss_feed" else "html",
+                15,
                 headers={
                     "User-Agent": "Mozilla/5.0 (compatible; ACW-Discovery/1.0)"
                 }
@@ -302,7 +310,7 @@ class AutoSourcePipeline:
             
             # Test if it's actually an RSS feed
             if source.get("source_type") == "rss_feed":
-                feed = feedparser.parse(resp.text)
+                feed = feedparser.parse(resp.content, response_headers={"content-type": resp.headers.get("Content-Type", "")})
                 if feed.bozo:
                     result["error"] = f"Not valid RSS: {feed.bozo_exception}"
                     return result
@@ -339,20 +347,17 @@ class AutoSourcePipeline:
         """Auto-add credible sources to whitelist"""
         added_count = 0
         
-        # Load existing whitelist
+        # Load existing whitelist (normalised, canonical-URL deduped)
         whitelist_path = Path("data/whitelist_multilingual.yml")
-        if whitelist_path.exists():
-            whitelist = yaml.safe_load(whitelist_path.read_text()) or {"feeds": []}
-        else:
-            whitelist = {"feeds": []}
-        
-        existing_urls = {feed["url"] for feed in whitelist["feeds"]}
+        existing_urls = {whitelist.canonical_url(feed["url"]) for feed in whitelist.load(whitelist_path, "feeds")}
         
         # Add sources with credibility >= 0.7
+        new_feeds = []
         for source in scored_sources:
             cred = source.get("credibility", {})
-            if cred.get("overall_score", 0) >= 0.7 and source["url"] not in existing_urls:
-                whitelist["feeds"].append({
+            if cred.get("overall_score", 0) >= 0.7 and whitelist.canonical_url(source["url"]) not in existing_urls:
+                existing_urls.add(whitelist.canonical_url(source["url"]))
+                new_feeds.append({
                     "url": source["url"],
                     "lang": source.get("lang", "en"),
                     "tier": "B",
@@ -364,10 +369,22 @@ class AutoSourcePipeline:
                 added_count += 1
                 log.info(f"Auto-added: {source['url']}")
         
-        # Save updated whitelist
-        whitelist_path.write_text(yaml.dump(whitelist, default_flow_style=False))
+        # Append to the whitelist in place (keeps comments and the other entries untouched)
+        whitelist.append(whitelist_path, new_feeds, "feeds")
         
         return added_count
+    
+    def update_sitemaps(self, gov_sources: List[Dict[str, Any]]) -> int:
+        """Record discovered government sitemaps for the sitemap collector"""
+        entries = [{
+            "url": source["url"],
+            "name": source.get("agency"),
+            "country": source.get("country"),
+            "type": "sitemap",
+            "tier": "B",
+            "discovery_date": datetime.now().isoformat()
+        } for source in gov_sources if source.get("source_type") == "gov_sitemap"]
+        return whitelist.append(Path("data/whitelist_sources.yml"), entries, "sitemaps")
 
 if __name__ == "__main__":
     # Test the pipeline
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Mock Feed Farm
+Local HTTP server serving thousands of synthetic RSS/Atom feeds for
+offline load-testing of the collectors.
+
+Each feed gets a stable behaviour derived from its index: normal, error
+(HTTP 5xx/429/404), slow-drip body, huge feed or malformed XML. Every
+response adds the configured latency; ETag/Last-Modified are honoured
+with 304s. 429/503 answers carry a short Retry-After (--retry-after): all
+farm feeds share one host, so a long one pauses the whole farm.
+
+Usage:
+    python scripts/mock_feed_farm.py --feeds 2000 --whitelist /tmp/farm.yml
+    python scripts/mock_feed_farm.py --feeds 500 --run multilingual   # serve + time a collector
+"""
+
+import sys
+import os
+import argparse
+import hashlib
+import random
+import threading
+import time
+import yaml
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import logging
+logging.basicConfig(level=logging.INFO)
+log = logging.getLogger(__name__)
+
+LANGS = ["en", "fr", "ar", "pt", "sw", "am"]
+TIERS = ["A", "B", "B", "C"]
+HEADLINES = [
+    "Boko Haram attack on military base in Borno",
+    "Cocaine shipment seized at port of Lagos",
+    "Ponzi scheme fraud investigation widens in Nairobi",
+    "Ransomware breach hits Johannesburg municipality",
+    "Al-Shabaab militants ambush convoy near Mogadishu",
+    "Customs officers arrest arms smugglers at border",
+    "Bitcoin money laundering ring dismantled in Accra",
+    "Phishing campaign targets Moroccan banks",
+    "Local football club wins national cup",
+]
+
+class FarmConfig:
+    def __init__(self, feeds=1000, entries=20, latency_ms=0.0, jitter_ms=0.0,
+                 error_rate=0.0, slow_rate=0.0, huge_rate=0.0, malformed_rate=0.0,
+                 huge_entries=5000, drip_seconds=5.0, atom_rate=0.3, retry_after=1,
+                 error_statuses=(500, 503, 429, 404), seed=42):
+        self.feeds = feeds
+        self.entries = entries
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.huge_rate = huge_rate
+        self.malformed_rate = malformed_rate
+        self.huge_entries = huge_entries
+        self.drip_seconds = drip_seconds
+        self.atom_rate = atom_rate
+        self.retry_after = retry_after
+        self.error_statuses = tuple(error_statuses)
+        self.seed = seed
+
+    def behaviour(self, idx: int) -> str:
+        """Stable behaviour for feed idx: error|slow|huge|malformed|ok."""
+        r = random.Random(self.seed * 1_000_003 + idx).random()
+        for kind, rate in (("error", self.error_rate), ("slow", self.slow_rate),
+                           ("huge", self.huge_rate), ("malformed", self.malformed_rate)):
+            if r < rate:
+                return kind
+            r -= rate
+        return "ok"
+
+    def is_atom(self, idx: int) -> bool:
+        return random.Random(self.seed + idx * 7919).random() < self.atom_rate
+
+# ---------- feed bodies ----------
+def _entries(idx: int, count: int, now: datetime):
+    rnd = random.Random(idx)
+    for i in range(count):
+        pub = now - timedelta(minutes=rnd.randint(0, 14 * 24 * 60))
+        title = rnd.choice(HEADLINES)
+        yield i, title, pub
+
+def render_feed(idx: int, cfg: FarmConfig, count: int, now: datetime) -> bytes:
+    base = f"http://mock-{idx}.example"
+    if cfg.is_atom(idx):
+        parts = ['<?xml version="1.0" encoding="utf-8"?>',
+                 '<feed xmlns="http://www.w3.org/2005/Atom">',
+                 f"<title>Mock feed {idx}</title><id>{base}/</id>",
+                 f"<updated>{now.isoformat()}</updated>"]
+        for i, title, pub in _entries(idx, count, now):
+            parts.append(f"<entry><title>{title}</title><id>{base}/{i}</id>"
+                         f'<link href="{base}/{i}"/><updated>{pub.isoformat()}</updated>'
+                         f"<summary>{title}. Synthetic entry {i} of feed {idx}.</summary></entry>")
+        parts.append("</feed>")
+    else:
+        parts = ['<?xml version="1.0" encoding="utf-8"?>', '<rss version="2.0"><channel>',
+                 f"<title>Mock feed {idx}</title><link>{base}/</link><description>mock</description>"]
+        for i, title, pub in _entries(idx, count, now):
+            parts.append(f"<item><title>{title}</title><link>{base}/{i}</link>"
+                         f"<guid>{base}/{i}</guid><pubDate>{format_datetime(pub)}</pubDate>"
+                         f"<description>{title}. Synthetic entry {i} of feed {idx}.</description></item>")
+        parts.append("</channel></rss>")
+    return "\n".join(parts).encode("utf-8")
+
+# ---------- server ----------
+class FarmHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "ACW-MockFarm/1.0"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_GET(self):
+        farm: "FeedFarm" = self.server.farm
+        cfg = farm.config
+        farm.count("requests")
+        try:
+            idx = int(self.path.split("/")[-1].split(".")[0])
+        except ValueError:
+            idx = -1
+        if not self.path.startswith("/feeds/") or not 0 <= idx < cfg.feeds:
+            return self._send(404, b"not found", "text/plain")
+
+        delay = cfg.latency_ms + random.uniform(0, cfg.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000.0)
+
+        kind = cfg.behaviour(idx)
+        if kind == "error":
+            farm.count("errors")
+            status = cfg.error_statuses[idx % len(cfg.error_statuses)]
+            extra = {"Retry-After": str(cfg.retry_after)} if status in (429, 503) else {}
+            return self._send(status, b"error", "text/plain", extra)
+
+        body, etag, modified = farm.feed(idx, kind)
+        if (self.headers.get("If-None-Match") == etag or
+                self._not_modified_since(self.headers.get("If-Modified-Since"), modified)):
+            farm.count("not_modified")
+            return self._send(304, b"", None, {"ETag": etag})
+
+        ctype = "application/atom+xml" if cfg.is_atom(idx) else "application/rss+xml"
+        headers = {"ETag": etag, "Last-Modified": format_datetime(modified, usegmt=True)}
+        if kind == "slow":
+            farm.count("slow")
+            return self._drip(body, ctype, headers, cfg.drip_seconds)
+        farm.count("ok")
+        self._send(200, body, f"{ctype}; charset=utf-8", headers)
+
+    def _not_modified_since(self, value: Optional[str], modified: datetime) -> bool:
+        if not value:
+            return False
+        try:
+            return parsedate_to_datetime(value) >= modified.replace(microsecond=0)
+        except (TypeError, ValueError):
+            return False
+
+    def _send(self, status: int, body: bytes, ctype: Optional[str], headers: Dict[str, str] = None):
+        self.send_response(status)
+        if ctype:
+            self.send_header("Content-Type", ctype)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+        self.server.farm.count("bytes", len(body))
+
+    def _drip(self, body: bytes, ctype: str, headers: Dict[str, str], seconds: float):
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        chunks = 20
+        step = max(1, len(body) // chunks)
+        try:
+            for i in range(0, len(body), step):
+                self.wfile.write(body[i:i + step])
+                self.wfile.flush()
+                time.sleep(seconds / chunks)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    do_HEAD = do_GET
+
+class FeedFarm:
+    """Owns the HTTP server, cached feed bodies and request counters."""
+
+    def __init__(self, config: FarmConfig, host: str = "127.0.0.1", port: int = 0):
+        self.config = config
+        self.httpd = ThreadingHTTPServer((host, port), FarmHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.farm = self
+        self.started = datetime.now(timezone.utc)
+        self.stats: Dict[str, int] = {}
+        self._bodies: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, idx: int) -> str:
+        return f"{self.base_url}/feeds/{idx}.xml"
+
+    def count(self, key: str, n: int = 1):
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + n
+
+    def feed(self, idx: int, kind: str):
+        with self._lock:
+            if idx not in self._bodies:
+                count = self.config.huge_entries if kind == "huge" else self.config.entries
+                body = render_feed(idx, self.config, count, self.started)
+                if kind == "malformed":
+                    body = body[: len(body) // 2] + b"<item><title>broken &amp"
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+                self._bodies[idx] = (body, etag, self.started)
+            return self._bodies[idx]
+
+    def whitelist(self, key: str = "feeds") -> Dict[str, list]:
+        """Whitelist matching the farm, in the collectors' YAML schema."""
+        return {key: [{"url": self.url(i), "lang": LANGS[i % len(LANGS)], "tier": TIERS[i % len(TIERS)]}
+                      for i in range(self.config.feeds)]}
+
+    def write_whitelist(self, path: Path, key: str = "feeds") -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(yaml.safe_dump(self.whitelist(key), sort_keys=False), encoding="utf-8")
+        return path
+
+    def start(self) -> "FeedFarm":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+# ---------- collector run ----------
+def run_collector(farm: FeedFarm, name: str, workdir: Path, rate_limit: float = 0.0,
+                  settings=None) -> Dict[str, float]:
+    """Point a collector at the farm (via a temp whitelist) and time it.
+    All farm feeds share one host; the shared rate limiter gets a per-run override for it
+    (rate_limit seconds between requests, 0 = unthrottled, and the collector's full concurrency)."""
+    from src.collectors import multilingual, rss
+    from src.config import CollectionSettings
+    from src.net import ratelimit
+
+    settings = settings or CollectionSettings()
+    ratelimit.LIMITER.override(farm.httpd.server_address[0], rate_limit, settings.burst, settings.concurrency)
+
+    collectors = {
+        "multilingual": (multilingual.collect, "data/whitelist_multilingual.yml", "feeds"),
+        "rss": (rss.collect, "data/whitelist_sources.yml", "rss"),
+    }
+    collect, whitelist, key = collectors[name]
+    farm.write_whitelist(Path(workdir) / whitelist, key)
+
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(days=7)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        t0 = time.perf_counter()
+        rows = collect(start, end, settings)
+        elapsed = time.perf_counter() - t0
+    finally:
+        os.chdir(cwd)
+    return {
+        "collector": name,
+        "feeds": farm.config.feeds,
+        "items": len(rows),
+        "seconds": round(elapsed, 3),
+        "feeds_per_second": round(farm.config.feeds / elapsed, 2) if elapsed else None,
+        **farm.stats,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic RSS/Atom feeds for offline load tests")
+    parser.add_argument("--feeds", type=int, default=1000, help="Number of feeds to serve")
+    parser.add_argument("--entries", type=int, default=20, help="Entries per normal feed")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Base latency per response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform extra latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of feeds answering 5xx/429/404")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Share of feeds with slow-drip bodies")
+    parser.add_argument("--huge-rate", type=float, default=0.0, help="Share of huge feeds")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of truncated/malformed XML")
+    parser.add_argument("--huge-entries", type=int, default=5000, help="Entries in a huge feed")
+    parser.add_argument("--drip-seconds", type=float, default=5.0, help="Duration of a slow-drip body")
+    parser.add_argument("--retry-after", type=int, default=1,
+                        help="Retry-After seconds sent with 429/503 (they throttle the whole farm host)")
+    parser.add_argument("--error-statuses", default="500,503,429,404",
+                        help="Comma-separated statuses error feeds cycle through")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--whitelist", type=Path, help="Write a matching whitelist YAML here")
+    parser.add_argument("--run", choices=["multilingual", "rss"],
+                        help="Run this collector against the farm, print timings and exit")
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="With --run: seconds between requests to the farm (default 0 = unthrottled)")
+    args = parser.parse_args()
+
+    config = FarmConfig(
+        feeds=args.feeds, entries=args.entries, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, slow_rate=args.slow_rate, huge_rate=args.huge_rate,
+        malformed_rate=args.malformed_rate, huge_entries=args.huge_entries,
+        drip_seconds=args.drip_seconds, retry_after=args.retry_after,
+        error_statuses=[int(s) for s in args.error_statuses.split(",")], seed=args.seed,
+    )
+    farm = FeedFarm(config, port=0 if args.run else args.port)
+
+    if args.run:
+        import json
+        import tempfile
+        with farm, tempfile.TemporaryDirectory() as tmp:
+            print(json.dumps(run_collector(farm, args.run, Path(tmp), args.rate_limit), indent=2))
+        return
+
+    if args.whitelist:
+        farm.write_whitelist(args.whitelist)
+        log.info(f"Whitelist for {config.feeds} feeds → {args.whitelist}")
+    log.info(f"Serving {config.feeds} feeds on {farm.base_url}/feeds/<n>.xml (Ctrl-C to stop)")
+    try:
+        farm.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        farm.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Mock WebSub Hub
+Local stand-in hub for exercising scripts/websub_daemon.py offline.
+Accepts subscription requests, verifies intent against the subscriber's
+callback (hub.challenge) and, when a topic is published, fetches it and
+pushes it to every verified subscriber with an X-Hub-Signature (sha256).
+
+Usage:
+    python scripts/mock_websub_hub.py --port 8781
+    curl -d hub.mode=publish -d hub.url=http://127.0.0.1:8000/feed.xml http://127.0.0.1:8781/
+"""
+
+import sys
+import argparse
+import hashlib
+import hmac
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict
+from urllib.parse import parse_qs
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import logging
+logging.basicConfig(level=logging.INFO)
+log = logging.getLogger(__name__)
+
+# topic -> callback -> {"secret", "lease"}
+SUBSCRIPTIONS: Dict[str, Dict[str, Dict[str, str]]] = {}
+LOCK = threading.Lock()
+
+def verify(mode: str, topic: str, callback: str, secret: str, lease: str):
+    """Verification of intent; the subscription only counts once the challenge is echoed."""
+    challenge = secrets.token_hex(8)
+    try:
+        resp = requests.get(callback, params={"hub.mode": mode, "hub.topic": topic,
+                                              "hub.challenge": challenge, "hub.lease_seconds": lease}, timeout=10)
+    except requests.RequestException as e:
+        log.warning(f"Verification of {callback} failed: {e}")
+        return
+    if resp.status_code != 200 or resp.text != challenge:
+        log.warning(f"Subscriber {callback} did not confirm ({resp.status_code})")
+        return
+    with LOCK:
+        if mode == "subscribe":
+            SUBSCRIPTIONS.setdefault(topic, {})[callback] = {"secret": secret, "lease": lease}
+        else:
+            SUBSCRIPTIONS.get(topic, {}).pop(callback, None)
+    log.info(f"{mode} verified: {callback} → {topic}")
+
+def publish(topic: str):
+    """Fetch the topic and push it to its subscribers."""
+    resp = requests.get(topic, timeout=10)
+    with LOCK:
+        subscribers = dict(SUBSCRIPTIONS.get(topic, {}))
+    for callback, sub in subscribers.items():
+        headers = {"Content-Type": resp.headers.get("Content-Type", "application/rss+xml"),
+                   "Link": f'<http://{HubHandler.hub_host}/>; rel="hub", <{topic}>; rel="self"'}
+        if sub["secret"]:
+            digest = hmac.new(sub["secret"].encode("utf-8"), resp.content, hashlib.sha256).hexdigest()
+            headers["X-Hub-Signature"] = f"sha256={digest}"
+        try:
+            pushed = requests.post(callback, data=resp.content, headers=headers, timeout=10)
+            log.info(f"Pushed {topic} to {callback}: HTTP {pushed.status_code}")
+        except requests.RequestException as e:
+            log.warning(f"Push to {callback} failed: {e}")
+
+class HubHandler(BaseHTTPRequestHandler):
+    hub_host = "127.0.0.1"
+
+    def do_POST(self):
+        form = {k: v[0] for k, v in parse_qs(self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                                             .decode("utf-8")).items()}
+        mode = form.get("hub.mode")
+        if mode in ("subscribe", "unsubscribe") and form.get("hub.topic") and form.get("hub.callback"):
+            threading.Thread(target=verify, daemon=True, args=(
+                mode, form["hub.topic"], form["hub.callback"], form.get("hub.secret", ""),
+                form.get("hub.lease_seconds", "864000"))).start()
+            status = 202
+        elif mode == "publish" and (form.get("hub.url") or form.get("hub.topic")):
+            threading.Thread(target=publish, daemon=True,
+                             args=(form.get("hub.url") or form["hub.topic"],)).start()
+            status = 204
+        else:
+            status = 400
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        log.debug(format % args)
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in WebSub hub")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8781, help="Port to listen on")
+    args = parser.parse_args()
+
+    HubHandler.hub_host = f"{args.host}:{args.port}"
+    server = ThreadingHTTPServer((args.host, args.port), HubHandler)
+    log.info(f"Mock WebSub hub on http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
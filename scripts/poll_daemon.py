@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Feed Polling Daemon
+Polls the RSS and multilingual whitelists continuously, each feed just after
+its learned publishing time (tier A first), and spools new in-window
+articles for the weekly run to merge. A per-cycle request budget caps how
+many feeds are fetched between sleeps.
+
+Usage:
+    python scripts/poll_daemon.py                    # run until interrupted
+    python scripts/poll_daemon.py --once --budget 50 # one cycle, at most 50 feeds
+"""
+
+import sys
+import argparse
+import time
+import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Set
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import load_config
+from src import parsepool, whitelist
+from src.net import fetch, health, ratelimit, resolver, schedule
+from src.collectors import rss, multilingual
+
+import logging
+logging.basicConfig(level=logging.INFO)
+log = logging.getLogger(__name__)
+
+MIN_SLEEP = 60.0
+MAX_SLEEP = 3600.0
+
+def load_feeds() -> List[Dict[str, Any]]:
+    """Both whitelists, each entry tagged with the collector that fetches it."""
+    feeds = []
+    for path, key, collector in (("data/whitelist_sources.yml", "rss", "rss"),
+                                 ("data/whitelist_multilingual.yml", "feeds", "multilingual")):
+        feeds.extend(dict(feed, collector=collector) for feed in whitelist.load(Path(path), key))
+    return feeds
+
+def poll(feeds: List[Dict[str, Any]], settings, lookback_days: int) -> List[Dict[str, Any]]:
+    end = dt.datetime.now(dt.timezone.utc)
+    start = end - dt.timedelta(days=lookback_days)
+    session = ratelimit.session()
+    session.headers["User-Agent"] = multilingual.session.headers["User-Agent"]
+
+    def fetch(feed):
+        if feed["collector"] == "rss":
+            return rss._fetch_feed(session, feed, start, end, settings)
+        return multilingual._fetch_feed(feed, start, end, settings)
+
+    rows = []
+    with ThreadPoolExecutor(max_workers=settings.concurrency) as pool:
+        for feed_rows in pool.map(fetch, feeds):
+            rows.extend(feed_rows)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll feeds by learned cadence and spool new articles")
+    parser.add_argument("--config", type=Path, default=Path("configs/weekly.yml"), help="Run configuration")
+    parser.add_argument("--cache", type=Path, default=Path("data/cache"), help="Cache directory (schedule, health, spool)")
+    parser.add_argument("--budget", type=int, default=200, help="Max feeds fetched per cycle")
+    parser.add_argument("--lookback", type=int, default=7, help="Days of entries to keep from each poll")
+    parser.add_argument("--once", action="store_true", help="Run a single cycle and exit")
+    args = parser.parse_args()
+
+    settings = load_config(args.config).collection
+    ratelimit.configure(settings)
+    fetch.configure(settings)
+    parsepool.configure(settings)
+    health.configure(settings, args.cache / "feed_health.json")
+    schedule.configure(args.cache / "feed_schedule.json")
+    resolver.configure(args.cache / "feed_resolution.json")
+    spool_dir = args.cache / "spool"
+
+    feeds = load_feeds()
+    seen: Set[str] = {a.get("link") for a in schedule.read_spool(
+        dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=args.lookback), dt.datetime.now(dt.timezone.utc), spool_dir)}
+    log.info(f"Polling {len(feeds)} feeds, budget {args.budget}/cycle")
+
+    while True:
+        due = schedule.STORE.due([f for f in feeds if health.STORE.allow(f["url"])
+                                  and not resolver.STORE.feedless(f["url"])], budget=args.budget)
+        if due:
+            tiers = {t: sum(1 for f in due if f.get("tier") == t) for t in "ABC"}
+            log.info(f"Cycle: {len(due)} feeds due (tier A {tiers['A']}, B {tiers['B']}, C {tiers['C']})")
+            rows = [r for r in poll(due, settings, args.lookback) if r.get("link") not in seen]
+            seen.update(r.get("link") for r in rows)
+            schedule.append_spool(rows, spool_dir)
+            schedule.STORE.save()
+            health.STORE.save()
+            resolver.STORE.save()
+            log.info(f"Spooled {len(rows)} new articles")
+
+        if args.once:
+            break
+        wake = schedule.STORE.next_wakeup(feeds) - time.time()
+        time.sleep(min(MAX_SLEEP, max(MIN_SLEEP, wake)))
+
+if __name__ == "__main__":
+    main()
@@ -2,30 +2,50 @@
 """
 Feed Testing Script
 Tests all multilingual feeds and reports which ones are working.
+Results are recorded in the same feed health store the collectors use
+(data/cache/feed_health.json), so a manual test can close or open circuits.
+Homepage entries are resolved to their feed (data/cache/feed_resolution.json).
+--save writes the working feeds (every whitelist field kept, resolved feed
+URL in place of the homepage) to a separate file; saving onto the tested
+whitelist itself only rewrites the resolved URLs, leaving every entry,
+field and comment as it was.
 
 Usage:
     python scripts/test_feeds.py
     python scripts/test_feeds.py --limit 20  # Test first 20 feeds only
+    python scripts/test_feeds.py --respect-circuits  # Skip feeds whose circuit is open
+    python scripts/test_feeds.py --workers 16 --budget 600 --json data/feed_health.json
+    python scripts/test_feeds.py --from-json data/feed_health.json --save data/whitelist_working.yml
+    python scripts/test_feeds.py --from-json data/feed_health.json --save data/whitelist_multilingual.yml  # resolved URLs only
 """
 
 import sys
 import argparse
+import calendar
+import dataclasses
+import json
+import threading
 import requests
 import feedparser
 import yaml
+from datetime import datetime, timezone
 from pathlib import Path
 from urllib.parse import urlparse
 import time
 
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+# Add repo root to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import deadline, whitelist
+from src.config import load_config
+from src.net import fetch, health, ratelimit, resolver
 
 import logging
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
 
 # Create session with proper headers
-session = requests.Session()
+session = ratelimit.session()
 session.headers.update({
     "User-Agent": "Mozilla/5.0 (compatible; ACW-FeedTester/1.0; +https://github.com/Kithua/african-crime-weekly)",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
@@ -36,40 +56,47 @@ session.headers.update({
     "Upgrade-Insecure-Requests": "1",
 })
 
-def test_feed(url: str, timeout: int = 15) -> dict:
+def test_feed(url: str, timeout=15, feed_info: dict = None) -> dict:
     """
     Test a single feed URL and return detailed results.
     """
+    feed_info = feed_info or {}
     result = {
         "url": url,
+        "feed_url": None,
+        "lang": feed_info.get("lang", "en"),
+        "tier": feed_info.get("tier", "B"),
         "status": "unknown",
         "entries": 0,
+        "newest_entry": None,
         "error": None,
         "response_time": None,
         "content_type": None,
         "is_rss": False
     }
     
-    start_time = time.time()
-    
     try:
-        # Try to fetch the URL
-        resp = session.get(url, timeout=timeout)
-        result["response_time"] = time.time() - start_time
+        # Fetch the URL (or the feed discovered behind a homepage)
+        resp, feed = resolver.STORE.fetch(session, url, timeout=timeout)
+        result["feed_url"] = resp.url
+        result["response_time"] = resp.elapsed.total_seconds()  # excludes time queued behind the rate limiter
         result["status"] = resp.status_code
         result["content_type"] = resp.headers.get("content-type", "")
         
         if resp.status_code == 200:
-            # Parse as RSS
-            feed = feedparser.parse(resp.text)
-            
             if feed.bozo:  # Parsing error
                 result["error"] = f"RSS Parse Error: {feed.bozo_exception}"
                 result["status"] = "parse_error"
+                health.STORE.record_failure(url, feed.bozo_exception, resp.elapsed.total_seconds(), parse=True)
             else:
+                health.STORE.record_success(url, resp.elapsed.total_seconds(), resp.headers.get("Last-Modified"))
                 result["entries"] = len(feed.entries)
                 result["is_rss"] = True
                 
+                stamps = [calendar.timegm(t) for e in feed.entries
+                          for t in [e.get("published_parsed") or e.get("updated_parsed")] if t]
+                if stamps:
+                    result["newest_entry"] = datetime.fromtimestamp(max(stamps), timezone.utc).isoformat()
                 if feed.entries:
                     result["status"] = "success"
                     # Check publication dates
@@ -80,7 +107,15 @@ def test_feed(url: str, timeout: int = 15) -> dict:
                     result["status"] = "empty"
         else:
             result["error"] = f"HTTP {resp.status_code}"
+            health.STORE.record_failure(url, result["error"], resp.elapsed.total_seconds())
             
+    except resolver.NoFeedError as e:
+        result["status"] = "no_feed"
+        result["error"] = str(e)
+    except requests.exceptions.HTTPError as e:
+        result["status"] = e.response.status_code
+        result["error"] = f"HTTP {e.response.status_code}"
+        health.STORE.record_failure(url, result["error"], e.response.elapsed.total_seconds())
     except requests.exceptions.Timeout:
         result["status"] = "timeout"
         result["error"] = f"Timeout after {timeout}s"
@@ -90,7 +125,11 @@ def test_feed(url: str, timeout: int = 15) -> dict:
     except Exception as e:
         result["status"] = "error"
         result["error"] = str(e)
+    if result["status"] in ("timeout", "connection_error", "error"):
+        health.STORE.record_failure(url, result["error"])
     
+    result["circuit"] = health.STORE.state(url)
+    result["p50"], result["p95"] = health.STORE.latency(url)
     return result
 
 def print_results(results: list, verbose: bool = False):
@@ -105,7 +144,7 @@ def print_results(results: list, verbose: bool = False):
     total = len(results)
     working = sum(1 for r in results if r["status"] == "success" and r["entries"] > 0)
     empty = sum(1 for r in results if r["status"] == "empty")
-    failed = sum(1 for r in results if r["status"] in ["timeout", "connection_error", "error", "parse_error"])
+    failed = sum(1 for r in results if r["status"] in ["timeout", "connection_error", "error", "parse_error", "no_feed"])
     http_errors = sum(1 for r in results if str(r["status"]).startswith("4") or str(r["status"]).startswith("5"))
     
     print(f"\nTotal feeds tested: {total}")
@@ -122,7 +161,9 @@ def print_results(results: list, verbose: bool = False):
             "timeout": "⏱️ ",
             "connection_error": "🔌",
             "parse_error": "📄❌",
-            "error": "❌"
+            "no_feed": "🏠",
+            "error": "❌",
+            "skipped": "⏭️ "
         }.get(result["status"], "❓")
         
         domain = urlparse(result["url"]).netloc[:30]
@@ -138,71 +179,143 @@ def print_results(results: list, verbose: bool = False):
         
         if verbose and result["error"]:
             print(f"     {result['error']}")
+        if verbose and result.get("p50") is not None:
+            print(f"     p50 {result['p50']:.2f}s | p95 {result['p95']:.2f}s | circuit {result['circuit']}")
 
-def save_working_feeds(results: list, output_path: Path):
+def save_working_feeds(results: list, output_path: Path, whitelist_path: Path):
     """
-    Save working feeds to a new YAML whitelist file.
+    Save working feeds to a separate YAML whitelist, each with all of its whitelist
+    fields and the resolved feed URL. Saving onto the tested whitelist instead
+    rewrites only the URLs that resolved to a different feed, in place.
     """
+    working = [r for r in results if r["status"] == "success" and r["entries"] > 0]
+    resolved = {r["url"]: r["feed_url"] for r in working if r.get("feed_url")}
+
+    if output_path.resolve() == whitelist_path.resolve():
+        changed = whitelist.replace_urls(whitelist_path, resolved)
+        print(f"\n💾 Rewrote {changed} resolved feed URLs in {whitelist_path}")
+        return
+
+    entries = {whitelist.canonical_url(e["url"]): e for e in whitelist.load(whitelist_path, "feeds")}
     working_feeds = []
-    
-    for result in results:
-        if result["status"] == "success" and result["entries"] > 0:
-            working_feeds.append({
-                "url": result["url"],
-                "tier": "B",  # Default tier
-                "lang": "en"  # Default language
-            })
+    for result in working:
+        entry = entries.get(whitelist.canonical_url(result["url"])) \
+            or {"tier": result.get("tier", "B"), "lang": result.get("lang", "en")}
+        working_feeds.append(dict(entry, url=resolved.get(result["url"]) or result["url"]))
     
     output_data = {"feeds": working_feeds}
     
     with open(output_path, "w", encoding="utf-8") as f:
-        yaml.dump(output_data, f, default_flow_style=False, allow_unicode=True)
+        yaml.safe_dump(output_data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
     
     print(f"\n💾 Saved {len(working_feeds)} working feeds to {output_path}")
 
+def save_json(results: list, output_path: Path, elapsed: float):
+    """
+    Write machine-readable results (one record per feed plus a status summary).
+    """
+    summary = {}
+    for result in results:
+        summary[str(result["status"])] = summary.get(str(result["status"]), 0) + 1
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps({
+        "tested_at": datetime.now(timezone.utc).isoformat(),
+        "elapsed_seconds": round(elapsed, 1),
+        "summary": summary,
+        "feeds": results,
+    }, indent=1, ensure_ascii=False), encoding="utf-8")
+    print(f"\n💾 Wrote results for {len(results)} feeds to {output_path}")
+
+def run_tests(feeds: list, settings, workers: int) -> list:
+    """
+    Test feeds on `workers` threads (per-host politeness comes from the shared
+    rate limiter), tier A first, until the deadline budget runs out.
+    """
+    lock = threading.Lock()
+    done = []
+    
+    def check(feed_info):
+        url = feed_info["url"]
+        result = test_feed(url, timeout=deadline.clip(health.STORE.timeout(url, settings)), feed_info=feed_info)
+        with lock:
+            done.append(url)
+            mark = f"✓ ({result['entries']} entries)" if result["status"] == "success" else f"✗ ({result['error']})"
+            print(f"Tested {len(done)}/{len(feeds)}: {urlparse(url).netloc} {mark}", flush=True)
+        return [result]
+    
+    tested = {r["url"]: r for r in deadline.run_queue(feeds, check, workers, "test_feeds")}
+    results = []
+    for feed_info in feeds:
+        result = tested.get(feed_info["url"])
+        if result is None:
+            result = {"url": feed_info["url"], "lang": feed_info.get("lang", "en"),
+                      "tier": feed_info.get("tier", "B"), "status": "skipped", "entries": 0,
+                      "newest_entry": None, "error": "Time budget exhausted", "response_time": None,
+                      "content_type": None, "is_rss": False}
+        results.append(result)
+    return results
+
 def main():
     parser = argparse.ArgumentParser(description="Test multilingual RSS feeds")
     parser.add_argument("--limit", type=int, help="Limit number of feeds to test")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
-    parser.add_argument("--save", type=Path, help="Save working feeds to YAML file")
+    parser.add_argument("--save", type=Path, help="Save working feeds to a YAML whitelist (the tested one: rewrite resolved URLs only)")
+    parser.add_argument("--config", type=Path, default=Path("configs/weekly.yml"), help="Run configuration")
+    parser.add_argument("--respect-circuits", action="store_true", help="Skip feeds whose circuit is open")
+    parser.add_argument("--workers", type=int, help="Concurrent tests (default: collection.concurrency)")
+    parser.add_argument("--budget", type=float, default=0, help="Total time budget in seconds (0 = unbounded)")
+    parser.add_argument("--json", type=Path, help="Write machine-readable results to this file")
+    parser.add_argument("--from-json", type=Path, help="Reuse results from a previous --json run instead of testing")
     args = parser.parse_args()
     
-    # Load whitelist
+    settings = load_config(args.config).collection
+    ratelimit.configure(settings)
+    fetch.configure(settings)
+    health.configure(settings)
+    
     whitelist_path = Path("data/whitelist_multilingual.yml")
+    if args.from_json:
+        results = json.loads(args.from_json.read_text(encoding="utf-8"))["feeds"]
+        print_results(results, verbose=args.verbose)
+        if args.save:
+            save_working_feeds(results, args.save, whitelist_path)
+        return
+    
+    # Load whitelist
     if not whitelist_path.exists():
         log.error(f"Whitelist file not found: {whitelist_path}")
         sys.exit(1)
     
-    whitelist = yaml.safe_load(whitelist_path.read_text(encoding="utf-8"))
-    feeds = whitelist.get("feeds", [])
+    feeds = whitelist.load(whitelist_path, "feeds")
     
     if args.limit:
         feeds = feeds[:args.limit]
+    if args.respect_circuits:
+        skipped = [f for f in feeds if not health.STORE.allow(f["url"])]
+        feeds = [f for f in feeds if health.STORE.allow(f["url"])]
+        if skipped:
+            print(f"Skipping {len(skipped)} feeds with an open circuit")
     
-    print(f"Testing {len(feeds)} feeds from {whitelist_path}")
+    workers = args.workers or settings.concurrency
+    print(f"Testing {len(feeds)} feeds from {whitelist_path} ({workers} workers)")
     
-    results = []
-    for i, feed_info in enumerate(feeds, 1):
-        url = feed_info["url"]
-        print(f"Testing {i}/{len(feeds)}: {urlparse(url).netloc}...", end=" ", flush=True)
-        
-        result = test_feed(url)
-        results.append(result)
-        
-        if result["status"] == "success":
-            print(f"✓ ({result['entries']} entries)")
-        else:
-            print(f"✗ ({result['error']})")
-        
-        # Be polite: rate limit requests
-        time.sleep(0.5)
+    # the budget is the only cut-off here; the weekly deadline does not apply to a manual test
+    deadline.configure(dataclasses.replace(settings, run_budget=args.budget, deadline=None))
+    t0 = time.time()
+    results = run_tests(feeds, settings, workers)
+    elapsed = time.time() - t0
+    
+    health.STORE.save()
+    resolver.STORE.save()
+    if args.json:
+        save_json(results, args.json, elapsed)
     
     # Print summary
     print_results(results, verbose=args.verbose)
     
     # Save working feeds if requested
     if args.save:
-        save_working_feeds(results, args.save)
+        save_working_feeds(results, args.save, whitelist_path)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+WebSub Subscriber Daemon
+Subscribes to the hubs advertised by whitelisted feeds (noted by the rss and
+multilingual collectors when collection.websub is on), answers the hubs'
+verification requests, renews leases before they expire and spools pushed
+entries for the weekly run to merge, exactly like scripts/poll_daemon.py.
+Feeds with an active subscription are no longer polled.
+
+The callback server must be reachable at --callback (or collection.websub_callback);
+each subscription gets <callback>/<id>.
+
+Usage:
+    python scripts/websub_daemon.py --port 8780 --callback https://acw.example.org/websub
+    python scripts/mock_websub_hub.py --port 8781   # local stand-in hub for testing
+"""
+
+import sys
+import argparse
+import threading
+import time
+import datetime as dt
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Set
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import load_config
+from src import parsepool
+from src.collectors import multilingual
+from src.net import ratelimit, schedule, websub
+
+import logging
+logging.basicConfig(level=logging.INFO)
+log = logging.getLogger(__name__)
+
+RENEW_INTERVAL = 300.0          # seconds between subscription sweeps
+MAX_PUSH_BYTES = 5_000_000
+
+class Receiver:
+    """Shared state of the callback handler: where to spool and which links were seen."""
+
+    def __init__(self, spool_dir: Path, lookback_days: int, max_entries: int):
+        self.spool_dir = spool_dir
+        self.lookback_days = lookback_days
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.seen: Set[str] = {a.get("link") for a in schedule.read_spool(
+            dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=lookback_days),
+            dt.datetime.now(dt.timezone.utc), spool_dir)}
+
+    def push(self, sub: dict, body: bytes, content_type: str = None) -> int:
+        """Spool the in-window, not yet seen entries of a pushed feed document."""
+        end = dt.datetime.now(dt.timezone.utc)
+        start = end - dt.timedelta(days=self.lookback_days)
+        feed = parsepool.parse(body, content_type, start, end, self.max_entries)
+        feed_info = {"url": sub["source"], "tier": sub["tier"], "lang": sub["lang"]}
+        rows = multilingual.entries_to_rows(feed.entries, feed_info)
+        with self.lock:
+            rows = [r for r in rows if r.get("link") not in self.seen]
+            self.seen.update(r.get("link") for r in rows)
+            schedule.append_spool(rows, self.spool_dir)
+        websub.STORE.pushed(sub["source"])
+        websub.STORE.save()
+        return len(rows)
+
+def make_handler(receiver: Receiver):
+    class CallbackHandler(BaseHTTPRequestHandler):
+        def _subscription(self):
+            return websub.STORE.by_callback(urlparse(self.path).path.rstrip("/").rsplit("/", 1)[-1])
+
+        def _reply(self, status: int, body: bytes = b""):
+            self.send_response(status)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            # verification of intent: echo hub.challenge for topics we asked for
+            query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            sub = self._subscription()
+            mode = query.get("hub.mode")
+            if sub is None or query.get("hub.topic") != sub["topic"]:
+                return self._reply(404)
+            if mode == "denied":
+                websub.STORE.failed(sub["source"], f"denied: {query.get('hub.reason', '')}")
+                websub.STORE.save()
+                return self._reply(200)
+            if mode != "subscribe" or "hub.challenge" not in query:
+                return self._reply(404)
+            lease = query.get("hub.lease_seconds")
+            websub.STORE.verified(sub["source"], int(lease) if lease and lease.isdigit() else None)
+            websub.STORE.save()
+            log.info(f"Subscription verified for {sub['source']} (lease {lease}s)")
+            self._reply(200, query["hub.challenge"].encode("utf-8"))
+
+        def do_POST(self):
+            # content distribution
+            sub = self._subscription()
+            length = int(self.headers.get("Content-Length") or 0)
+            if sub is None or length > MAX_PUSH_BYTES:
+                return self._reply(404 if sub is None else 413)
+            body = self.rfile.read(length)
+            if not websub.valid_signature(sub["secret"], body, self.headers.get("X-Hub-Signature")):
+                log.warning(f"Ignoring push with a bad signature for {sub['source']}")
+                return self._reply(202)     # the spec asks for 2xx so hubs do not retry forgeries
+            spooled = receiver.push(sub, body, self.headers.get("Content-Type"))
+            log.info(f"Push for {sub['source']}: {spooled} new articles spooled")
+            self._reply(202)
+
+        def log_message(self, format, *args):
+            log.debug(format % args)
+
+    return CallbackHandler
+
+def renew(session, callback: str):
+    """(Re)subscribe every source that is new, close to lease expiry or due for a retry."""
+    websub.STORE.reload()           # hubs the weekly run noted since the last sweep
+    due = websub.STORE.due()
+    for source in due:
+        if websub.subscribe(session, source, callback):
+            log.info(f"Subscription requested for {source}")
+    if due:
+        websub.STORE.save()
+
+def main():
+    parser = argparse.ArgumentParser(description="Receive WebSub pushes and spool new articles")
+    parser.add_argument("--config", type=Path, default=Path("configs/weekly.yml"), help="Run configuration")
+    parser.add_argument("--cache", type=Path, default=Path("data/cache"), help="Cache directory (websub state, spool)")
+    parser.add_argument("--host", default="0.0.0.0", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8780, help="Port to listen on")
+    parser.add_argument("--callback", help="Public base URL of this server (default: collection.websub_callback)")
+    parser.add_argument("--lookback", type=int, default=7, help="Days of pushed entries to keep")
+    parser.add_argument("--once", action="store_true", help="Send due subscription requests and exit")
+    args = parser.parse_args()
+
+    settings = load_config(args.config).collection
+    callback = args.callback or settings.websub_callback
+    if not callback:
+        log.error("No callback URL: pass --callback or set collection.websub_callback")
+        sys.exit(1)
+    ratelimit.configure(settings)
+    parsepool.configure(settings)
+    websub.configure(args.cache / "websub.json")
+    session = ratelimit.session()
+
+    receiver = Receiver(args.cache / "spool", args.lookback, settings.max_entries_per_source)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(receiver))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    log.info(f"Listening on {args.host}:{args.port}, callback {callback}")
+
+    try:
+        while True:
+            renew(session, callback)
+            if args.once:
+                time.sleep(2)           # give hubs that verify right away a moment
+                break
+            time.sleep(RENEW_INTERVAL)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        websub.STORE.save()
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,35 @@ Weekly Fusion Intel Style Report Generator
 Takes pre-classified article buckets and generates an intelligence-style PDF report.
 """
 
+import hashlib
 import json
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 
-# Import NLP modules
-from src.nlp import dedup, classifier, geotag
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+from markupsafe import Markup
+
+# NLP stages are resolved lazily; a missing one is skipped
+from src import registry
 
 logger = logging.getLogger(__name__)
 
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent.parent / "templates" / "intel_style"
+BYTECODE_CACHE_DIR = Path("data/cache/jinja")
+
+PILLAR_HEADINGS = {
+    "terrorism": "Terrorism & Extremism",
+    "organised": "Organised Crime",
+    "financial": "Financial Crime",
+    "cyber": "Cybercrime"
+}
+CONFIDENCE_LEVELS = ["Confirmed", "Probable", "Possible", "Doubtful"]
+SOURCE_GRADES = ["A", "B", "C", "D"]
+
+_ENV: Optional[Environment] = None
+
 def build(
     terrorism_bucket: List[Dict[str, Any]],
     organised_bucket: List[Dict[str, Any]],
@@ -36,6 +54,30 @@ def build(
     Returns:
         HTML string of the generated report
     """
+    report_data = prepare_report_data(
+        terrorism_bucket, organised_bucket, financial_bucket, cyber_bucket, start, end
+    )
+    
+    # Generate HTML report
+    html_report = generate_html_report(report_data)
+    
+    # Also save to JSON for archival
+    save_weekly_bundle(report_data)
+    
+    return html_report
+
+def prepare_report_data(
+    terrorism_bucket: List[Dict[str, Any]],
+    organised_bucket: List[Dict[str, Any]],
+    financial_bucket: List[Dict[str, Any]],
+    cyber_bucket: List[Dict[str, Any]],
+    start: datetime,
+    end: datetime
+) -> Dict[str, Any]:
+    """
+    Run the NLP enrichment once and return the report data structure
+    shared by the full report and every tailored variant.
+    """
     
     logger.info(f"Building weekly fusion report for {start.strftime('%Y-%m-%d')} to {end.strftime('%Y-%m-%d')}")
     
@@ -49,19 +91,26 @@ def build(
     logger.info(f"Total articles collected: {len(all_articles)}")
     
     # Remove duplicates
-    articles = dedup.remove_duplicates(all_articles)
+    remove_duplicates = registry.resolve("nlp.dedup")
+    articles = remove_duplicates(all_articles) if remove_duplicates else all_articles
     logger.info(f"After deduplication: {len(articles)} articles")
     
     # Process through NLP pipeline
+    predict = registry.resolve("nlp.classify")
+    extract = registry.resolve("nlp.geotag")
+    confidence = registry.resolve("nlp.confidence")
     for article in articles:
         # Predict crime tags
-        article["crime_tags"] = classifier.predict(article.get("body_en", ""))
+        if predict:
+            article["crime_tags"] = predict(article.get("body_en", ""))
         
         # Extract geolocation
-        article["geo"] = geotag.extract(article)
+        if extract:
+            article["geo"] = extract(article)
         
         # Get confidence score
-        article["confidence"] = classifier.confidence(article)
+        if confidence:
+            article["confidence"] = confidence(article)
     
     # Build report data structure
     report_data = {
@@ -87,237 +136,149 @@ def build(
         "top_articles": sorted(articles, key=lambda x: x.get("confidence", 0), reverse=True)[:10]
     }
     
-    # Generate HTML report
-    html_report = generate_html_report(report_data)
-    
-    # Also save to JSON for archival
-    save_weekly_bundle(report_data)
-    
-    return html_report
+    return report_data
 
-def generate_html_report(data: Dict[str, Any]) -> str:
+def _template_env() -> Environment:
     """
-    Generate HTML report from report data.
+    Compiled Jinja2 environment shared by every render in the process.
+    Templates are autoescaped and their bytecode is cached on disk.
     """
-    
-    # Calculate credibility matrix
-    matrix = build_credibility_matrix(data["all_articles"])
-    
-    # HTML Template (Intelligence Style)
-    html_template = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <title>African Crime Weekly - {week_str}</title>
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                margin: 40px;
-                background: #f5f5f5;
-            }}
-            .header {{
-                background: #2c3e50;
-                color: white;
-                padding: 20px;
-                text-align: center;
-                margin-bottom: 30px;
-            }}
-            .classification {{
-                background: #c0392b;
-                color: white;
-                padding: 5px 15px;
-                font-weight: bold;
-                text-align: center;
-                margin: 10px 0;
-            }}
-            .section {{
-                background: white;
-                padding: 20px;
-                margin-bottom: 20px;
-                border-left: 5px solid #3498db;
-            }}
-            .pillar {{
-                margin-bottom: 30px;
-            }}
-            .article {{
-                border-bottom: 1px solid #eee;
-                padding: 15px 0;
-            }}
-            .article:last-child {{
-                border-bottom: none;
-            }}
-            .meta {{
-                font-size: 0.9em;
-                color: #666;
-                margin-top: 5px;
-            }}
-            .confidence {{
-                display: inline-block;
-                padding: 3px 8px;
-                background: #27ae60;
-                color: white;
-                border-radius: 3px;
-                font-size: 0.8em;
-                margin-left: 10px;
-            }}
-            .matrix {{
-                display: grid;
-                grid-template-columns: repeat(4, 1fr);
-                gap: 10px;
-                margin: 20px 0;
-            }}
-            .matrix-cell {{
-                background: #ecf0f1;
-                padding: 15px;
-                text-align: center;
-            }}
-            .matrix-header {{
-                font-weight: bold;
-                background: #34495e;
-                color: white;
-            }}
-            .footer {{
-                text-align: center;
-                margin-top: 40px;
-                font-size: 0.9em;
-                color: #666;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="classification">UNCLASSIFIED // FOR OFFICIAL USE ONLY</div>
-        
-        <div class="header">
-            <h1>AFRICAN CRIME WEEKLY</h1>
-            <h2>Period: {period_start} to {period_end}</h2>
-            <h3>Report {week_str}</h3>
-        </div>
-        
-        <div class="section">
-            <h2>Executive Summary</h2>
-            <p>Total Articles Analyzed: <strong>{total_articles}</strong></p>
-            <ul>
-                <li>Terrorism & Extremism: {terrorism_count} articles</li>
-                <li>Organised Crime: {organised_count} articles</li>
-                <li>Financial Crime: {financial_count} articles</li>
-                <li>Cybercrime: {cyber_count} articles</li>
-            </ul>
-        </div>
-        
-        <div class="section">
-            <h2>Credibility Matrix</h2>
-            <div class="matrix">
-                <div class="matrix-cell matrix-header">Source Grade →</div>
-                <div class="matrix-cell matrix-header">A (Official)</div>
-                <div class="matrix-cell matrix-header">B (Vetted Media)</div>
-                <div class="matrix-cell matrix-header">C (NGO/Other)</div>
-                
-                <div class="matrix-cell matrix-header">↓ Confidence</div>
-                {matrix_cells}
-            </div>
-        </div>
-        
-        <div class="section">
-            <h2>Top Priority Items</h2>
-            {top_articles}
-        </div>
-        
-        <div class="section">
-            <h2>Terrorism & Extremism</h2>
-            {terrorism_section}
-        </div>
-        
-        <div class="section">
-            <h2>Organised Crime</h2>
-            {organised_section}
-        </div>
-        
-        <div class="section">
-            <h2>Financial Crime</h2>
-            {financial_section}
-        </div>
-        
-        <div class="section">
-            <h2>Cybercrime</h2>
-            {cyber_section}
-        </div>
-        
-        <div class="footer">
-            <p>Generated: {generation_time}</p>
-            <p>African Crime Weekly Intelligence Fusion System</p>
-        </div>
-    </body>
-    </html>
+    global _ENV
+    if _ENV is None:
+        BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _ENV = Environment(
+            loader=FileSystemLoader(str(TEMPLATE_DIR)),
+            autoescape=select_autoescape(["html"]),
+            bytecode_cache=FileSystemBytecodeCache(str(BYTECODE_CACHE_DIR)),
+            trim_blocks=True,
+            lstrip_blocks=True,
+            keep_trailing_newline=True,
+        )
+    return _ENV
+
+class FragmentCache:
+    """
+    Memoises rendered article blocks and credibility matrices so several
+    report variants built from the same enriched articles render each
+    fragment only once. Blocks are keyed on the article's link and a hash
+    of its content, so an article changed in place is rendered again;
+    matrices are keyed on the counts they show.
     """
     
-    # Format sections
-    def format_article(article):
-        confidence = article.get("confidence", 0)
-        geo = article.get("geo", {})
-        location = f"{geo.get('city', '')}, {geo.get('country', '')}" if geo else "Unknown"
-        
-        return f"""
-        <div class="article">
-            <h3>{article.get("title", "No Title")} 
-                <span class="confidence">{confidence:.1f}%</span>
-            </h3>
-            <p>{article.get("summary", "")}</p>
-            <div class="meta">
-                Source: {article.get("source", "Unknown")} | 
-                Location: {location} | 
-                Published: {article.get("date", "Unknown")}
-            </div>
-        </div>
-        """
+    def __init__(self):
+        self._articles: Dict[Tuple[str, str], Markup] = {}
+        self._matrices: Dict[str, Markup] = {}
     
-    # Build matrix cells
-    matrix_html = ""
-    for confidence_level in ["Confirmed", "Probable", "Possible", "Doubtful"]:
-        matrix_html += f'<div class="matrix-cell matrix-header">{confidence_level}</div>'
-        for grade in ["A", "B", "C", "D"]:
-            count = matrix.get(grade, {}).get(confidence_level, 0)
-            matrix_html += f'<div class="matrix-cell">{count}</div>'
+    def article(self, article: Dict[str, Any]) -> Markup:
+        content = json.dumps(article, sort_keys=True, default=str, ensure_ascii=False)
+        key = (str(article.get("link", "")), hashlib.sha1(content.encode("utf-8")).hexdigest())
+        if key not in self._articles:
+            self._articles[key] = render_article(article)
+        return self._articles[key]
     
-    # Build sections
-    top_articles_html = "".join(format_article(a) for a in data["top_articles"])
+    def matrix(self, articles: List[Dict[str, Any]]) -> Markup:
+        matrix = build_credibility_matrix(articles)
+        key = json.dumps(matrix, sort_keys=True)
+        if key not in self._matrices:
+            self._matrices[key] = _render_matrix(matrix)
+        return self._matrices[key]
+
+def render_article(article: Dict[str, Any]) -> Markup:
+    return _template_env().get_template("article.html").module.article_block(article)
+
+def render_matrix(articles: List[Dict[str, Any]]) -> Markup:
+    return _render_matrix(build_credibility_matrix(articles))
+
+def _render_matrix(matrix: Dict[str, Dict[str, int]]) -> Markup:
+    return Markup(_template_env().get_template("matrix.html").render(
+        matrix=matrix,
+        confidence_levels=CONFIDENCE_LEVELS,
+        grades=SOURCE_GRADES,
+    ))
+
+def iter_html_report(
+    data: Dict[str, Any],
+    pillars: Optional[Iterable[str]] = None,
+    fragments: Optional[FragmentCache] = None
+) -> Iterator[str]:
+    """
+    Render the report as a stream of HTML chunks.
+    Each pillar section is rendered on demand, so the full document is
+    never held in memory. ``pillars`` restricts the report to those sections;
+    ``fragments`` reuses blocks already rendered for another variant.
+    """
+    env = _template_env()
+    render_block = fragments.article if fragments else render_article
+    matrix_html = fragments.matrix(data["all_articles"]) if fragments else render_matrix(data["all_articles"])
     
-    terrorism_html = "".join(format_article(a) for a in data["pillars"]["terrorism"])
-    organised_html = "".join(format_article(a) for a in data["pillars"]["organised"])
-    financial_html = "".join(format_article(a) for a in data["pillars"]["financial"])
-    cyber_html = "".join(format_article(a) for a in data["pillars"]["cyber"])
+    yield from env.get_template("head.html").generate(
+        period=data["period"],
+        summary=data["summary"],
+        matrix_html=matrix_html,
+    )
     
-    # Fill template
-    html = html_template.format(
-        week_str=data["period"]["week_str"],
-        period_start=data["period"]["start"][:10],
-        period_end=data["period"]["end"][:10],
-        total_articles=data["summary"]["total_articles"],
-        terrorism_count=data["summary"]["terrorism_count"],
-        organised_count=data["summary"]["organised_count"],
-        financial_count=data["summary"]["financial_count"],
-        cyber_count=data["summary"]["cyber_count"],
-        matrix_cells=matrix_html,
-        top_articles=top_articles_html,
-        terrorism_section=terrorism_html or "<p>No items this week.</p>",
-        organised_section=organised_html or "<p>No items this week.</p>",
-        financial_section=financial_html or "<p>No items this week.</p>",
-        cyber_section=cyber_html or "<p>No items this week.</p>",
-        generation_time=datetime.utcnow().isoformat()
+    section = env.get_template("section.html")
+    yield from section.generate(
+        heading="Top Priority Items",
+        blocks=map(render_block, data["top_articles"]),
+        placeholder=False,
     )
+    for pillar, heading in PILLAR_HEADINGS.items():
+        if pillars is not None and pillar not in pillars:
+            continue
+        yield from section.generate(
+            heading=heading,
+            blocks=map(render_block, data["pillars"][pillar]),
+            placeholder=True,
+        )
     
-    return html
+    yield from env.get_template("tail.html").generate(
+        generation_time=datetime.utcnow().isoformat()
+    )
+
+def write_html_report(
+    data: Dict[str, Any],
+    path: Path,
+    pillars: Optional[Iterable[str]] = None,
+    fragments: Optional[FragmentCache] = None
+) -> Path:
+    """
+    Stream the rendered report straight to ``path``.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in iter_html_report(data, pillars, fragments):
+            f.write(chunk)
+    return path
+
+def generate_html_report(
+    data: Dict[str, Any],
+    pillars: Optional[Iterable[str]] = None,
+    fragments: Optional[FragmentCache] = None
+) -> str:
+    """
+    Generate HTML report from report data.
+    """
+    return "".join(iter_html_report(data, pillars, fragments))
+
+def generate_pillar_reports(
+    data: Dict[str, Any],
+    pillars: Optional[Iterable[str]] = None,
+    fragments: Optional[FragmentCache] = None
+) -> Dict[str, str]:
+    """
+    Generate one stand-alone HTML report per pillar, keyed by pillar name.
+    """
+    pillars = list(PILLAR_HEADINGS) if pillars is None else [p for p in PILLAR_HEADINGS if p in pillars]
+    fragments = fragments or FragmentCache()
+    return {pillar: generate_html_report(data, [pillar], fragments) for pillar in pillars}
 
 def build_credibility_matrix(articles: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
     """
     Build 4x4 credibility matrix (Grades A-D x Confidence levels).
     """
-    matrix = {
-        "A": {"Confirmed": 0, "Probable": 0, "Possible": 0, "Doubtful": 0},
-        "B": {"Confirmed": 0, "Probable": 0, "Possible": 0, "Doubtful": 0},
-        "C": {"Confirmed": 0, "Probable": 0, "Possible": 0, "Doubtful": 0},
-        "D": {"Confirmed": 0, "Probable": 0, "Possible": 0, "Doubtful": 0}
-    }
+    matrix = {grade: {level: 0 for level in CONFIDENCE_LEVELS} for grade in SOURCE_GRADES}
     
     # Map numeric confidence to textual levels
     def confidence_to_level(confidence: float) -> str:
@@ -6,13 +6,16 @@ Sentinel Protocol ICF v2  (STIX format)
 import os, requests, datetime as dt, re
 from pathlib import Path
 
+from src.net import ratelimit
+
 BASE    = "https://icf.api.sentinelprotocol.io/v2"
 API_KEY = os.getenv("SENTINEL_API_KEY")
+_http = ratelimit.session()
 AFRICA_ISO3 = {"DZA","AGO","BEN","BWA","BFA","BDI","CMR","CPV","CAF","TCD","COM","COG","COD","CIV","DJI","EGY","GNQ","ERI","SWZ","ETH","GAB","GMB","GHA","GIN","GNB","KEN","LSO","LBR","LBY","MDG","MWI","MLI","MRT","MUS","MAR","MOZ","NAM","NER","NGA","RWA","STP","SEN","SYC","SLE","SOM","ZAF","SSD","SDN","TZA","TGO","TUN","UGA","ZMB","ZWE"}
 
 # ---------- helpers ----------
 def _post(path, payload):
-    r = requests.post(f"{BASE}{path}", json=payload, headers={"x-api-key": API_KEY}, timeout=30)
+    r = _http.post(f"{BASE}{path}", json=payload, headers={"x-api-key": API_KEY}, timeout=30)
     return r.json() if r.ok else None
 
 def _extract_addresses(text):
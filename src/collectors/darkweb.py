@@ -1,12 +1,19 @@
 #!/usr/bin/env python3
 import logging
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import requests
-from datetime import datetime
+import time
+from datetime import datetime, timezone
+
+from src import metrics, parsepool
+from src.config import CollectionSettings
+from src.net import fetch, ratelimit
 
 log = logging.getLogger(__name__)
 
+http = ratelimit.session()
+
 KEYWORDS = {
     "terrorism": {"terror", "Jama at Nusrat al-Islam wal Muslimeen", "JNIM", "Islamic State in West Africa", "ISIS-WA", "Islamic State in the Greater Sahara", "ISGS", "Rapid Support Forces", "RSF", "ADF", "M23", "al-shabaab", "boko haram",
                   "isis", "jihad", "attack", "bomb", "suicide", "extremist", "militant", "insurgent"},
@@ -20,7 +27,10 @@ def _score(text: str) -> str:
     scores = {p: len(kw & set(re.split(r"\W+", text))) for p, kw in KEYWORDS.items()}
     return max(scores, key=scores.get) if max(scores.values()) > 0 else "cyber"
 
-def collect_darkweb_mentions(start_time: datetime, end_time: datetime) -> List[Dict[str, Any]]:
+def collect_darkweb_mentions(start_time: datetime, end_time: datetime,
+                             settings: Optional[CollectionSettings] = None) -> List[Dict[str, Any]]:
+    settings = settings or CollectionSettings()
+    start_time, end_time = parsepool.window(start_time, end_time)
     rows = []
     
     darkweb_monitors = [
@@ -30,16 +40,19 @@ def collect_darkweb_mentions(start_time: datetime, end_time: datetime) -> List[D
     ]
     
     for monitor_url in darkweb_monitors:
+        t0 = time.perf_counter()
+        kept = len(rows)
         try:
             import feedparser
             
-            response = requests.get(monitor_url, timeout=10)
+            response = fetch.get(http, monitor_url, "feed", settings.http_timeout)
             if response.status_code == 200:
-                feed = feedparser.parse(response.text)
+                feed = feedparser.parse(response.content,
+                                        response_headers={"content-type": response.headers.get("Content-Type", "")})
                 
-                for entry in feed.entries[:20]:
+                for entry in feed.entries[:settings.max_entries_per_source]:
                     if hasattr(entry, "published_parsed") and entry.published_parsed:
-                        pub_time = datetime(*entry.published_parsed[:6])
+                        pub_time = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
                         
                         if start_time <= pub_time <= end_time:
                             text = (entry.title or "") + " " + (entry.summary or "")
@@ -56,13 +69,21 @@ def collect_darkweb_mentions(start_time: datetime, end_time: datetime) -> List[D
                                 "pillar": pillar,
                                 "classification": "UNCLASSIFIED"
                             })
+                metrics.record_source(monitor_url, "darkweb", time.perf_counter() - t0, len(response.content),
+                                      entries=len(feed.entries), kept=len(rows) - kept)
+            else:
+                metrics.record_source(monitor_url, "darkweb", time.perf_counter() - t0,
+                                      error=f"HTTP {response.status_code}")
         
         except Exception as e:
             log.warning(f"Dark web monitor failed {monitor_url}: {e}")
+            metrics.record_source(monitor_url, "darkweb", time.perf_counter() - t0, error=e)
     
     return rows
 
-def collect_cybercrime_forums(start_time: datetime, end_time: datetime) -> List[Dict[str, Any]]:
+def collect_cybercrime_forums(start_time: datetime, end_time: datetime,
+                              settings: Optional[CollectionSettings] = None) -> List[Dict[str, Any]]:
+    settings = settings or CollectionSettings()
     rows = []
     
     forum_monitors = [
@@ -73,7 +94,8 @@ def collect_cybercrime_forums(start_time: datetime, end_time: datetime) -> List[
     
     for forum in forum_monitors:
         try:
-            response = requests.get(forum["url"], timeout=5)
+            # reachability only: read no more than one chunk of the page
+            response = fetch.get(http, forum["url"], "html", settings.http_timeout, max_bytes=fetch.CHUNK)
             if response.status_code == 200:
                 log.info(f"Reached {forum['name']} for monitoring reference")
         
@@ -82,11 +104,12 @@ def collect_cybercrime_forums(start_time: datetime, end_time: datetime) -> List[
     
     return rows
 
-def collect_all(start_time: datetime, end_time: datetime) -> List[Dict[str, Any]]:
+def collect_all(start_time: datetime, end_time: datetime,
+                settings: Optional[CollectionSettings] = None) -> List[Dict[str, Any]]:
     all_intel = []
     
-    all_intel.extend(collect_darkweb_mentions(start_time, end_time))
-    all_intel.extend(collect_cybercrime_forums(start_time, end_time))
+    all_intel.extend(collect_darkweb_mentions(start_time, end_time, settings))
+    all_intel.extend(collect_cybercrime_forums(start_time, end_time, settings))
     
     log.info(f"Dark web collection complete: {len(all_intel)} items")
     return all_intel
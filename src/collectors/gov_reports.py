@@ -6,10 +6,13 @@ Extend this file later to scrape real government PDFs.
 """
 import logging
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from src.config import CollectionSettings
 
 log = logging.getLogger(__name__)
 
-def collect_all(start: datetime, end: datetime) -> List[Dict[str, Any]]:
+def collect_all(start: datetime, end: datetime,
+                settings: Optional[CollectionSettings] = None) -> List[Dict[str, Any]]:
     log.info("Government-reports collector: stub – nothing to fetch yet.")
     return []
@@ -1,43 +1,30 @@
 #!/usr/bin/env python3
-import feedparser
 import logging
-import re
+import time
 import requests
-import yaml
 from pathlib import Path
 import datetime as dt
 import pytz
 from urllib3.util.retry import Retry
-from requests.adapters import HTTPAdapter
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-KEYWORDS = {
-    "terrorism": {"terror", "Jama at Nusrat al-Islam wal Muslimeen", "JNIM", "Islamic State in West Africa", "ISIS-WA", "Islamic State in the Greater Sahara", "ISGS", "Rapid Support Forces", "RSF", "ADF", "M23", "al-shabaab", "boko haram",
-                  "isis", "jihad", "attack", "bomb", "suicide", "extremist", "militant", "insurgent"},
-    "organised": {"drug", "cocaine", "heroin", "traffick", "smuggl", "mafia", "cartel", "mine illegal", "arms", "weapon", "border", "port", "customs", "kidnap", "ransom", "organized crime"},
-    "financial": {"money launder", "bitcoin", "usdt", "fraud", "scam", "ponzi", "pyramid", "ofac", "sanction", "nft", "evasion", "forex", "investment scam", "dnfbp"},
-    "cyber": {"ransomware", "phish", "malware", "hack", "breach", "ddos", "botnet", "zero-day", "exploit", "darkweb", "onion", "trojan", "worm", "c&c", "pig butchering", "romance scam"}
-}
-
-INTEL_MAP = {
-    "terrorism": "Regional conflict reporting; follow for local sentiment.",
-    "organised": "Mentions ports / borders; potential smuggling angle.",
-    "financial": "Banking / crypto references; fraud or laundering lead.",
-    "cyber": "No cyber keywords – default bucket."
-}
+from src import deadline, metrics, parsepool
+from src.config import CollectionSettings
+from src.nlp.pillars import INTEL_MAP, score
+from src.whitelist import load as load_whitelist
+from src.net import health, ratelimit, resolver, schedule, websub
 
 log = logging.getLogger(__name__)
 
 def get_session():
-    session = requests.Session()
+    # 429/503 are handled by the shared rate limiter (Retry-After + slow-down);
+    # 403 means "go away" and is never retried.
     retry_strategy = Retry(
         total=3,
         backoff_factor=1,
-        status_forcelist=[429, 500, 502, 503, 504, 403],
+        status_forcelist=[500, 502, 504],
     )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
+    session = ratelimit.session(max_retries=retry_strategy)
     session.headers.update({
         "User-Agent": "Mozilla/5.0 (compatible; ACW-Bot/1.0; +https://github.com/Kithua/african-crime-weekly)",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
@@ -46,69 +33,111 @@ def get_session():
 
 session = get_session()
 
-def _score(text: str) -> str:
-    text = text.lower()
-    scores = {p: len(kw & set(re.split(r"\W+", text))) for p, kw in KEYWORDS.items()}
-    return max(scores, key=scores.get) if max(scores.values()) else "cyber"
+def entries_to_rows(entries: List[parsepool.Entry], feed_info: Dict[str, Any],
+                    intel_map: Dict[str, str] = INTEL_MAP) -> List[Dict[str, Any]]:
+    """Article rows for in-window entries returned by parsepool.parse."""
+    rows = []
+    for entry in entries:
+        pillar = score(entry.title + " " + entry.summary)
+        rows.append({
+            "title": entry.title,
+            "summary": entry.summary,
+            "link": entry.link,
+            "date": dt.datetime.fromtimestamp(entry.published, pytz.UTC).isoformat(),
+            "source": feed_info["url"],
+            "tier": feed_info.get("tier", "B"),
+            "lang": feed_info.get("lang", "en"),
+            "intel_sentence": intel_map[pillar],
+            "pillar": pillar
+        })
+    return rows
 
-def collect(start: dt.datetime, end: dt.datetime) -> List[Dict[str, Any]]:
+def fetch_feed(session: requests.Session, feed_info: Dict[str, Any], start: dt.datetime, end: dt.datetime,
+               settings: CollectionSettings, collector: str = "multilingual",
+               intel_map: Dict[str, str] = INTEL_MAP) -> List[Dict[str, Any]]:
+    """Fetch, parse and turn one whitelisted feed into rows, keeping its health, schedule and
+    WebSub state; shared by the rss and multilingual collectors (collector labels the metrics)."""
     rows = []
-    whitelist_path = Path("data/whitelist_multilingual.yml")
+    t0 = time.perf_counter()
+    url = feed_info["url"]
+    if not health.STORE.allow(url):
+        log.debug(f"Skipping {url}: circuit open")
+        metrics.count("circuit_open_skips")
+        return rows
+    if settings.websub and websub.STORE.active(url):
+        metrics.count("websub_skips")          # entries arrive by push (scripts/websub_daemon.py)
+        return rows
+    try:
+        log.info(f"Fetching {collector} feed: {url}")
+        
+        resp = resolver.STORE.resolve(
+            session,
+            url,
+            timeout=deadline.clip(health.STORE.timeout(url, settings)),
+        )
+        
+        # parsed on the pool; only in-window entries come back
+        feed = parsepool.parse(resp.content, resp.headers.get("Content-Type"), start, end,
+                               settings.max_entries_per_source)
+        
+        if feed.bozo:
+            log.warning(f"RSS parse error for {url}: {feed.bozo}")
+            metrics.record_source(url, collector, time.perf_counter() - t0, len(resp.content),
+                                  error=f"parse: {feed.bozo}")
+            health.STORE.record_failure(url, feed.bozo, resp.elapsed.total_seconds(), parse=True)
+            return rows
+        
+        schedule.STORE.observe(url, feed.stamps)
+        
+        rows = entries_to_rows(feed.entries, feed_info, intel_map)
+        if settings.websub:
+            websub.STORE.note(url, feed_info, feed.links, resp)
+                
+        metrics.record_source(url, collector, time.perf_counter() - t0, len(resp.content),
+                              entries=feed.total, kept=len(rows))
+        health.STORE.record_success(url, resp.elapsed.total_seconds(), resp.headers.get("Last-Modified"),
+                                    kept=len(rows))
+
+    except resolver.NoFeedError as e:
+        # the site answered; a missing feed is not a health failure
+        log.debug(str(e))
+        metrics.count("feeds.feedless")
+        metrics.record_source(url, collector, time.perf_counter() - t0, error="no feed")
+    except Exception as e:
+        log.warning(f"Failed to fetch feed {url}: {e}")
+        metrics.record_source(url, collector, time.perf_counter() - t0, error=e)
+        health.STORE.record_failure(url, e)
     
-    if not whitelist_path.exists():
-        log.warning(f"Whitelist file not found: {whitelist_path}")
+    return rows
+
+def _fetch_feed(feed_info: Dict[str, Any], start: dt.datetime, end: dt.datetime,
+                settings: CollectionSettings) -> List[Dict[str, Any]]:
+    return fetch_feed(session, feed_info, start, end, settings)
+
+def collect(start: dt.datetime, end: dt.datetime,
+            settings: Optional[CollectionSettings] = None) -> List[Dict[str, Any]]:
+    settings = settings or CollectionSettings()
+    rows = []
+    whitelist = [f for f in load_whitelist(Path("data/whitelist_multilingual.yml"), "feeds")
+                 if f.get("type") != "scrape"]          # feedless sites: see collectors/scrape.py
+    if not whitelist:
         return rows
     
-    whitelist = yaml.safe_load(whitelist_path.read_text()).get("feeds", [])
+    if settings.adaptive_polling:
+        window_start = parsepool.window(start, end)[0].timestamp()
+        planned = [f for f in schedule.STORE.order(whitelist)
+                   if not schedule.STORE.can_skip(f["url"], window_start)]
+        log.info(f"Adaptive polling: {len(planned)}/{len(whitelist)} feeds due")
+        metrics.count("schedule_skips", len(whitelist) - len(planned))
+        whitelist = planned
     
-    for feed_info in whitelist:
-        try:
-            url = feed_info["url"]
-            log.info(f"Fetching multilingual RSS: {url}")
-            
-            resp = session.get(
-                url,
-                timeout=(10, 30),
-            )
-            resp.raise_for_status()
-            
-            feed = feedparser.parse(resp.text)
-            
-            if feed.bozo:
-                log.warning(f"RSS parse error for {url}: {feed.bozo_exception}")
-                continue
-            
-            for entry in feed.entries:
-                try:
-                    if hasattr(entry, "published_parsed") and entry.published_parsed:
-                        pub = dt.datetime(*entry.published_parsed[:6], tzinfo=pytz.UTC)
-                    elif hasattr(entry, "updated_parsed") and entry.updated_parsed:
-                        pub = dt.datetime(*entry.updated_parsed[:6], tzinfo=pytz.UTC)
-                    else:
-                        continue
-                    
-                    if start <= pub <= end:
-                        text = (entry.title or "") + " " + (entry.summary or "")
-                        pillar = _score(text)
-                        
-                        rows.append({
-                            "title": entry.title,
-                            "summary": entry.summary,
-                            "link": entry.link,
-                            "date": pub.isoformat(),
-                            "source": url,
-                            "tier": feed_info.get("tier", "B"),
-                            "lang": feed_info.get("lang", "en"),
-                            "intel_sentence": INTEL_MAP[pillar],
-                            "pillar": pillar
-                        })
-                except Exception as e:
-                    log.warning(f"Error processing multilingual entry: {e}")
-                    continue
-                    
-        except Exception as e:
-            log.warning(f"Failed to fetch feed {feed_info.get('url')}: {e}")
-            continue
+    fetch = lambda feed_info: _fetch_feed(feed_info, start, end, settings)
+    rows.extend(deadline.run_queue(whitelist, fetch, settings.concurrency, "multilingual"))
+    health.STORE.save()
+    schedule.STORE.save()
+    resolver.STORE.save()
+    if settings.websub:
+        websub.STORE.save()
     
     log.info(f"Multilingual collection complete: {len(rows)} articles")
     return rows
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Listing-page scraper for sources without a usable feed.
+Covers whitelist entries tagged `type: scrape` and pages the feed resolver
+found to be feedless. Each listing page is fetched conditionally (ETag /
+Last-Modified); article links are picked with a selector learned per page
+(the ancestor path shared by most article-like links) and diffed against
+the page's seen-entry index, so only links not seen before are fetched.
+Rows are kept in the listing state, so a re-run whose window still covers
+them (including one answered 304) returns them again.
+"""
+import datetime as dt
+import logging
+import re
+import time
+from collections import defaultdict
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+import requests
+from lxml import etree, html as lxml_html
+
+from src import deadline, metrics
+from src.parsepool import window
+from src.config import CollectionSettings
+from src.nlp import extract
+from src.nlp.pillars import INTEL_MAP, score
+from src.whitelist import load as load_whitelist
+from src.net import fetch, health, listings, ratelimit, resolver
+
+log = logging.getLogger(__name__)
+
+MIN_LINKS = 3                           # a selector matching fewer links is re-learned
+RELEARN_AFTER = 30 * 24 * 3600.0        # layouts change; re-learn selectors monthly
+SIGNATURE_DEPTH = 3                     # ancestors (tag.class) in a learned selector
+ARTICLE_PATH = re.compile(r"/\d{4}/\d{1,2}/|\d{5,}|[^/]+(?:-[^/-]+){2,}")
+SKIP_PATH = re.compile(
+    r"/(tags?|category|categories|author|page|search|login|register|contact|about|privacy|terms|feed|"
+    r"wp-admin|videos?|gallery|galleries)(/|$)|\.(jpe?g|png|gif|webp|pdf|mp3|mp4|zip)$", re.I)
+DATE_XPATHS = [
+    "//meta[@property='article:published_time']/@content",
+    "//meta[@itemprop='datePublished']/@content",
+    "//*[@itemprop='datePublished']/@datetime",
+    "//meta[@name='date' or @name='pubdate' or @name='publishdate' or @name='DC.date.issued']/@content",
+    "//time/@datetime",
+]
+
+session = ratelimit.session()
+session.headers.update({
+    "User-Agent": "Mozilla/5.0 (compatible; ACW-Collector/1.0; +https://github.com/Kithua/african-crime-weekly)",
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+})
+
+# ---------- sources ----------
+def sources() -> List[Dict[str, Any]]:
+    """Entries tagged type: scrape, plus feed entries the resolver found to be feedless."""
+    multilingual = load_whitelist(Path("data/whitelist_multilingual.yml"), "feeds")
+    rss = load_whitelist(Path("data/whitelist_sources.yml"), "rss")
+    tagged = [f for f in multilingual if f.get("type") == "scrape"]
+    feedless = [f for f in multilingual + rss if f.get("type") != "scrape" and resolver.STORE.feedless(f["url"])]
+    return tagged + feedless
+
+# ---------- link selection ----------
+def _site(host: str) -> str:
+    return (host or "").lower().removeprefix("www.")
+
+def is_article_url(link: str, page_url: str) -> bool:
+    """Same-site link whose path looks like an article (slug, id or dated path)."""
+    parts = urlsplit(link)
+    if parts.scheme not in ("http", "https") or _site(parts.hostname) != _site(urlsplit(page_url).hostname):
+        return False
+    path = parts.path.rstrip("/")
+    if not path or SKIP_PATH.search(path):
+        return False
+    return bool(ARTICLE_PATH.search(path))
+
+def _signature(a) -> str:
+    """tag.firstclass of the anchor's nearest ancestors, e.g. 'div.news-list > h3.title > a'."""
+    steps = []
+    el = a.getparent()
+    while el is not None and len(steps) < SIGNATURE_DEPTH and el.tag not in ("body", "html"):
+        cls = (el.get("class") or "").split()
+        steps.append(f"{el.tag}.{cls[0]}" if cls else str(el.tag))
+        el = el.getparent()
+    return " > ".join(list(reversed(steps)) + ["a"])
+
+def _anchors(doc, page_url: str):
+    for a in doc.iter("a"):
+        href = a.get("href")
+        if href:
+            link = urldefrag(urljoin(page_url, href.strip()))[0]
+            if is_article_url(link, page_url):
+                yield a, link
+
+def learn_selector(doc, page_url: str) -> Optional[str]:
+    """Signature shared by the most distinct article-like links on the page."""
+    groups = defaultdict(set)
+    for a, link in _anchors(doc, page_url):
+        groups[_signature(a)].add(link)
+    if not groups:
+        return None
+    best = max(groups, key=lambda sig: len(groups[sig]))
+    return best if len(groups[best]) >= MIN_LINKS else None
+
+def article_links(doc, page_url: str, selector: Optional[str]) -> List[str]:
+    """Article links on the page, in page order; only those matching selector when given."""
+    return list(dict.fromkeys(link for a, link in _anchors(doc, page_url)
+                              if selector is None or _signature(a) == selector))
+
+# ---------- articles ----------
+def _parse_date(value: str) -> Optional[dt.datetime]:
+    value = value.strip()
+    try:
+        parsed = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=dt.timezone.utc)
+
+def parse_article(page: bytes) -> Dict[str, Any]:
+    """title, summary and published date (None when the page has none) of an article page."""
+    doc = lxml_html.document_fromstring(page)
+    def first(*xpaths):
+        for xp in xpaths:
+            for value in doc.xpath(xp):
+                value = " ".join(str(value).split())
+                if value:
+                    return value
+        return ""
+    published = None
+    for xp in DATE_XPATHS:
+        for value in doc.xpath(xp):
+            published = _parse_date(str(value))
+            if published:
+                break
+        if published:
+            break
+    return {
+        "title": first("//meta[@property='og:title']/@content", "//h1//text()", "//title/text()"),
+        "summary": first("//meta[@property='og:description']/@content", "//meta[@name='description']/@content"),
+        "date": published,
+    }
+
+# ---------- collection ----------
+def _scrape_listing(source: Dict[str, Any], start: dt.datetime, end: dt.datetime,
+                    settings: CollectionSettings) -> List[Dict[str, Any]]:
+    rows = []
+    t0 = time.perf_counter()
+    url = source["url"]
+    if not health.STORE.allow(url):
+        metrics.count("circuit_open_skips")
+        return listings.STORE.rows(url, start, end)
+    try:
+        log.info(f"Scraping listing: {url}")
+        resp = fetch.get(session, url, "html", deadline.clip(health.STORE.timeout(url, settings)),
+                         headers=listings.STORE.validators(url))
+        if resp.status_code == 304:
+            metrics.count("scrape.not_modified")
+            metrics.record_source(url, "scrape", time.perf_counter() - t0)
+            health.STORE.record_success(url, resp.elapsed.total_seconds(), kept=0)
+            return listings.STORE.rows(url, start, end)
+        resp.raise_for_status()
+        doc = lxml_html.document_fromstring(resp.content)
+
+        state = listings.STORE.get(url)
+        selector = state["selector"]
+        links = article_links(doc, url, selector) if selector else []
+        if len(links) < MIN_LINKS or time.time() - (state["learned"] or 0) > RELEARN_AFTER:
+            selector = learn_selector(doc, url)
+            listings.STORE.set_selector(url, selector)
+            links = article_links(doc, url, selector)
+            log.debug(f"Learned selector for {url}: {selector!r} ({len(links)} links)")
+
+        new = listings.STORE.new_links(url, links)
+        metrics.count("scrape.links_new", len(new))
+        metrics.count("scrape.links_known", len(links) - len(new))
+        todo = new[:min(settings.scrape_max_new, settings.max_entries_per_source)]
+        failed = 0
+        for link in todo:
+            if deadline.expired():
+                break
+            try:
+                page = extract.download(link, settings)
+                article = parse_article(page)
+            except (requests.RequestException, ValueError, etree.ParserError) as e:
+                log.debug(f"Article fetch failed for {link}: {e}")
+                metrics.count("scrape.article_failures")
+                failed += 1         # left unseen: retried next run
+                continue
+            listings.STORE.mark_seen(url, [link])
+            pub = article["date"] or dt.datetime.fromtimestamp(listings.STORE.first_seen(url, link), dt.timezone.utc)
+            if not start <= pub <= end or not article["title"]:
+                continue
+            body = extract.extract_text(page)
+            pillar = score(article["title"] + " " + article["summary"])
+            row = {
+                "title": article["title"],
+                "summary": article["summary"] or body[:500],
+                "link": link,
+                "date": pub.isoformat(),
+                "source": url,
+                "tier": source.get("tier", "B"),
+                "lang": source.get("lang", "en"),
+                "intel_sentence": INTEL_MAP[pillar],
+                "pillar": pillar,
+            }
+            if body:
+                row["body"] = body
+                if row["lang"] in ("en", "auto"):
+                    row["body_en"] = body
+            rows.append(row)
+        listings.STORE.keep_rows(url, rows)
+
+        # only a fully processed listing may be answered with 304 next time
+        complete = len(todo) == len(new) and not failed and not deadline.expired()
+        listings.STORE.set_validators(url, resp.headers.get("ETag") if complete else None,
+                                      resp.headers.get("Last-Modified") if complete else None)
+        metrics.record_source(url, "scrape", time.perf_counter() - t0, len(resp.content),
+                              entries=len(links), kept=len(rows))
+        health.STORE.record_success(url, resp.elapsed.total_seconds(), resp.headers.get("Last-Modified"),
+                                    kept=len(rows))
+    except Exception as e:
+        log.warning(f"Failed to scrape {url}: {e}")
+        metrics.record_source(url, "scrape", time.perf_counter() - t0, error=e)
+        health.STORE.record_failure(url, e)
+    fresh = {row["link"] for row in rows}
+    return rows + [row for row in listings.STORE.rows(url, start, end) if row["link"] not in fresh]
+
+def collect(start: dt.datetime, end: dt.datetime,
+            settings: Optional[CollectionSettings] = None) -> List[Dict[str, Any]]:
+    settings = settings or CollectionSettings()
+    start, end = window(start, end)
+    targets = sources()
+    log.info(f"Scraping {len(targets)} feedless sources")
+
+    fetch = lambda source: _scrape_listing(source, start, end, settings)
+    rows = list(deadline.run_queue(targets, fetch, settings.concurrency, "scrape"))
+    listings.STORE.save()
+    health.STORE.save()
+
+    log.info(f"Scrape collection complete: {len(rows)} articles")
+    return rows
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Sitemap collector for news and government sites.
+Reads the `sitemaps` block of data/whitelist_sources.yml (filled by source
+discovery from government sites' /sitemap.xml). Sitemap indexes and
+(Google News) URL sets are parsed with a streaming iterparse and each
+element is discarded once read, so memory stays flat however large the
+sitemap. The [start, end] window is pushed down: child sitemaps whose
+lastmod (or year/month in the URL) predates the window, or whose URL month
+is after it, are never fetched, and only URLs whose publication_date /
+lastmod fall inside it are kept.
+"""
+import datetime as dt
+import gzip
+import io
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from lxml import etree
+
+from src import deadline, metrics
+from src.parsepool import window
+from src.collectors.scrape import parse_article
+from src.config import CollectionSettings
+from src.nlp import extract
+from src.nlp.pillars import INTEL_MAP, score
+from src.whitelist import load as load_whitelist
+from src.net import fetch, health, ratelimit
+
+log = logging.getLogger(__name__)
+
+SM = "http://www.sitemaps.org/schemas/sitemap/0.9"
+NEWS = "http://www.google.com/schemas/sitemap-news/0.9"
+MAX_SITEMAPS = 50                       # child sitemaps fetched per source
+URL_MONTH = re.compile(r"(?<!\d)(20\d\d)(?:[-_/]|&\w{1,8}=)?(0[1-9]|1[0-2])(?!\d)")   # sitemap-2024-05.xml, ?yyyy=2024&mm=05 …
+
+session = ratelimit.session()
+session.headers.update({
+    "User-Agent": "Mozilla/5.0 (compatible; ACW-Collector/1.0; +https://github.com/Kithua/african-crime-weekly)",
+    "Accept": "application/xml,text/xml;q=0.9,*/*;q=0.8",
+})
+
+# ---------- parsing ----------
+def _date(value: Optional[str]) -> Optional[dt.datetime]:
+    if not value:
+        return None
+    try:
+        parsed = dt.datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=dt.timezone.utc)
+
+def _text(el, path: str) -> Optional[str]:
+    found = el.find(path)
+    return found.text.strip() if found is not None and found.text else None
+
+def iter_sitemap(stream) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """("sitemap" | "url", fields) for each entry of a sitemap index or URL set, in constant memory."""
+    tags = (f"{{{SM}}}sitemap", f"{{{SM}}}url")
+    for _, el in etree.iterparse(stream, events=("end",), tag=tags, huge_tree=True,
+                                 resolve_entities=False, no_network=True):
+        loc = _text(el, f"{{{SM}}}loc")
+        if loc:
+            fields = {"loc": loc, "lastmod": _date(_text(el, f"{{{SM}}}lastmod"))}
+            if el.tag == tags[1]:
+                fields["published"] = _date(_text(el, f"{{{NEWS}}}news/{{{NEWS}}}publication_date"))
+                fields["title"] = _text(el, f"{{{NEWS}}}news/{{{NEWS}}}title")
+                fields["lang"] = _text(el, f"{{{NEWS}}}news/{{{NEWS}}}publication/{{{NEWS}}}language")
+            yield ("sitemap" if el.tag == tags[0] else "url"), fields
+        # drop the element and everything before it: the tree never grows
+        el.clear(keep_tail=False)
+        while el.getprevious() is not None:
+            del el.getparent()[0]
+
+def may_contain(child: Dict[str, Any], start: dt.datetime, end: dt.datetime) -> bool:
+    """False when a child sitemap cannot hold URLs published within [start, end].
+    (A lastmod after end proves nothing: the file may have been edited since.)"""
+    if child["lastmod"] and child["lastmod"] < start:
+        return False
+    month = URL_MONTH.search(child["loc"])
+    if month:
+        year, mon = int(month.group(1)), int(month.group(2))
+        if not (start.year, start.month) <= (year, mon) <= (end.year, end.month):
+            return False
+    return True
+
+class _ChunkStream(io.RawIOBase):
+    """File-like view of resp.iter_content() (transfer-decoded chunks) for iterparse."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks, self._pending = chunks, b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buf) -> int:
+        while not self._pending:
+            self._pending = next(self._chunks, None)
+            if self._pending is None:
+                self._pending = b""
+                return 0
+        n = min(len(buf), len(self._pending))
+        buf[:n], self._pending = self._pending[:n], self._pending[n:]
+        return n
+
+def _open(url: str, settings: CollectionSettings) -> Tuple[requests.Response, Any]:
+    """Streamed GET; returns the response and a readable, decompressed body stream."""
+    resp = session.get(url, timeout=deadline.clip(health.STORE.timeout(url, settings)), stream=True)
+    resp.raise_for_status()
+    fetch.check_type(resp, "sitemap")
+    body = io.BufferedReader(_ChunkStream(resp.iter_content(fetch.CHUNK)), fetch.CHUNK)
+    if body.peek(2)[:2] == fetch.GZIP_MAGIC:    # .xml.gz served without Content-Encoding
+        return resp, gzip.GzipFile(fileobj=body)
+    return resp, body
+
+# ---------- collection ----------
+def _collect_source(source: Dict[str, Any], start: dt.datetime, end: dt.datetime,
+                    settings: CollectionSettings) -> List[Dict[str, Any]]:
+    rows = []
+    t0 = time.perf_counter()
+    root = source["url"]
+    if not health.STORE.allow(root):
+        metrics.count("circuit_open_skips")
+        return rows
+    queue, fetched, seen_urls, untitled = [root], 0, 0, []
+    try:
+        while queue and fetched < MAX_SITEMAPS and not deadline.expired():
+            url = queue.pop(0)
+            log.info(f"Reading sitemap: {url}")
+            resp, stream = _open(url, settings)
+            fetched += 1
+            with resp:
+                for kind, entry in iter_sitemap(stream):
+                    if kind == "sitemap":
+                        if may_contain(entry, start, end):
+                            queue.append(entry["loc"])
+                        else:
+                            metrics.count("sitemap.children_skipped")
+                        continue
+                    seen_urls += 1
+                    published = entry["published"] or entry["lastmod"]
+                    if published is None or not start <= published <= end:
+                        continue
+                    if len(rows) + len(untitled) >= settings.max_entries_per_source:
+                        continue
+                    row = {
+                        "title": entry["title"] or "",
+                        "summary": "",
+                        "link": entry["loc"],
+                        "date": published.isoformat(),
+                        "source": root,
+                        "tier": source.get("tier", "B"),
+                        "lang": entry["lang"] or source.get("lang", "en"),
+                    }
+                    (rows if row["title"] else untitled).append(row)
+            if url == root:
+                health.STORE.record_success(root, resp.elapsed.total_seconds())
+
+        # plain (non-news) sitemaps carry no titles: read them from the pages, within the page budget
+        for row in untitled[:settings.scrape_max_new]:
+            if deadline.expired():
+                break
+            try:
+                page = extract.download(row["link"], settings)
+            except (requests.RequestException, ValueError) as e:
+                log.debug(f"Page fetch failed for {row['link']}: {e}")
+                continue
+            article = parse_article(page)
+            if not article["title"]:
+                continue
+            body = extract.extract_text(page)
+            row.update(title=article["title"], summary=article["summary"] or body[:500], body=body)
+            if body and row["lang"] in ("en", "auto"):
+                row["body_en"] = body
+            rows.append(row)
+
+        for row in rows:
+            row["pillar"] = score(row["title"] + " " + row["summary"])
+            row["intel_sentence"] = INTEL_MAP[row["pillar"]]
+        metrics.count("sitemap.files", fetched)
+        metrics.record_source(root, "sitemap", time.perf_counter() - t0,
+                              entries=seen_urls, kept=len(rows))
+    except Exception as e:
+        log.warning(f"Failed to read sitemap {root}: {e}")
+        metrics.record_source(root, "sitemap", time.perf_counter() - t0, error=e)
+        health.STORE.record_failure(root, e)
+    return rows
+
+def collect(start: dt.datetime, end: dt.datetime,
+            settings: Optional[CollectionSettings] = None) -> List[Dict[str, Any]]:
+    settings = settings or CollectionSettings()
+    start, end = window(start, end)
+    sources = load_whitelist(Path("data/whitelist_sources.yml"), "sitemaps")
+    if not sources:
+        return []
+    log.info(f"Reading {len(sources)} sitemaps")
+
+    fetch = lambda source: _collect_source(source, start, end, settings)
+    rows = list(deadline.run_queue(sources, fetch, settings.concurrency, "sitemap"))
+    health.STORE.save()
+
+    log.info(f"Sitemap collection complete: {len(rows)} articles")
+    return rows
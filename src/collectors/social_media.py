@@ -1,13 +1,19 @@
 #!/usr/bin/env python3
 import logging
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import requests
 import time
-from datetime import datetime
+from datetime import datetime, timezone
+
+from src import metrics, parsepool
+from src.config import CollectionSettings
+from src.net import fetch, ratelimit
 
 log = logging.getLogger(__name__)
 
+http = ratelimit.session()
+
 KEYWORDS = {
     "terrorism": {"terror", "Jama at Nusrat al-Islam wal Muslimeen", "JNIM", "Islamic State in West Africa", "ISIS-WA", "Islamic State in the Greater Sahara", "ISGS", "Rapid Support Forces", "RSF", "ADF", "M23", "al-shabaab", "boko haram",
                   "isis", "jihad", "attack", "bomb", "suicide", "extremist", "militant", "insurgent"},
@@ -21,7 +27,10 @@ def _score(text: str) -> str:
     scores = {p: len(kw & set(re.split(r"\W+", text))) for p, kw in KEYWORDS.items()}
     return max(scores, key=scores.get) if max(scores.values()) > 0 else "cyber"
 
-def collect_mastodon(start_time: datetime, end_time: datetime) -> List[Dict[str, Any]]:
+def collect_mastodon(start_time: datetime, end_time: datetime,
+                     settings: Optional[CollectionSettings] = None) -> List[Dict[str, Any]]:
+    settings = settings or CollectionSettings()
+    start_time, end_time = parsepool.window(start_time, end_time)
     rows = []
     
     mastodon_instances = [
@@ -31,11 +40,13 @@ def collect_mastodon(start_time: datetime, end_time: datetime) -> List[Dict[str,
     ]
     
     for instance in mastodon_instances:
+        t0 = time.perf_counter()
+        kept = len(rows)
         try:
             url = f"{instance}/api/v1/timelines/public"
-            params = {"limit": 40, "min_id": None}
+            params = {"limit": min(40, settings.max_entries_per_source), "min_id": None}
             
-            response = requests.get(url, params=params, timeout=10)
+            response = fetch.get(http, url, "json", settings.http_timeout, params=params)
             if response.status_code == 200:
                 toots = response.json()
                 
@@ -61,14 +72,21 @@ def collect_mastodon(start_time: datetime, end_time: datetime) -> List[Dict[str,
                                 "author": toot["account"]["username"]
                             })
             
-            time.sleep(1)
+            metrics.record_source(f"mastodon/{instance}", "social_media", time.perf_counter() - t0,
+                                  len(response.content), kept=len(rows) - kept,
+                                  entries=len(toots) if response.status_code == 200 else 0,
+                                  error=None if response.status_code == 200 else f"HTTP {response.status_code}")
             
         except Exception as e:
             log.warning(f"Mastodon collection failed for {instance}: {e}")
+            metrics.record_source(f"mastodon/{instance}", "social_media", time.perf_counter() - t0, error=e)
     
     return rows
 
-def collect_reddit(start_time: datetime, end_time: datetime) -> List[Dict[str, Any]]:
+def collect_reddit(start_time: datetime, end_time: datetime,
+                   settings: Optional[CollectionSettings] = None) -> List[Dict[str, Any]]:
+    settings = settings or CollectionSettings()
+    start_time, end_time = parsepool.window(start_time, end_time)
     rows = []
     
     subreddits = [
@@ -81,17 +99,19 @@ def collect_reddit(start_time: datetime, end_time: datetime) -> List[Dict[str, A
     }
     
     for subreddit in subreddits:
+        t0 = time.perf_counter()
+        kept = len(rows)
         try:
             url = f"https://www.reddit.com/r/{subreddit}/new.json"
-            params = {"limit": 20}
+            params = {"limit": min(100, settings.max_entries_per_source)}
             
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = fetch.get(http, url, "json", settings.http_timeout, params=params, headers=headers)
             if response.status_code == 200:
                 posts = response.json()["data"]["children"]
                 
                 for post in posts:
                     data = post["data"]
-                    post_time = datetime.fromtimestamp(data["created_utc"])
+                    post_time = datetime.fromtimestamp(data["created_utc"], timezone.utc)
                     
                     if start_time <= post_time <= end_time:
                         title = data.get("title", "")
@@ -113,23 +133,28 @@ def collect_reddit(start_time: datetime, end_time: datetime) -> List[Dict[str, A
                                 "author": data["author"]
                             })
             
-            time.sleep(2)
+            metrics.record_source(f"reddit/r/{subreddit}", "social_media", time.perf_counter() - t0,
+                                  len(response.content), kept=len(rows) - kept,
+                                  entries=len(posts) if response.status_code == 200 else 0,
+                                  error=None if response.status_code == 200 else f"HTTP {response.status_code}")
             
         except Exception as e:
             log.warning(f"Reddit collection failed for r/{subreddit}: {e}")
+            metrics.record_source(f"reddit/r/{subreddit}", "social_media", time.perf_counter() - t0, error=e)
     
     return rows
 
-def collect_all(start_time: datetime, end_time: datetime) -> List[Dict[str, Any]]:
+def collect_all(start_time: datetime, end_time: datetime,
+                settings: Optional[CollectionSettings] = None) -> List[Dict[str, Any]]:
     all_posts = []
     
     try:
-        all_posts.extend(collect_mastodon(start_time, end_time))
+        all_posts.extend(collect_mastodon(start_time, end_time, settings))
     except Exception as e:
         log.warning(f"Mastodon collection failed: {e}")
     
     try:
-        all_posts.extend(collect_reddit(start_time, end_time))
+        all_posts.extend(collect_reddit(start_time, end_time, settings))
     except Exception as e:
         log.warning(f"Reddit collection failed: {e}")
     
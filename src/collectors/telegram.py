@@ -2,15 +2,20 @@
 Telethon-based public-channel collector.
 Only whitelisted channels; no media auto-download.
 """
-import os, yaml, datetime as dt, pytz, asyncio, re
+import os, yaml, datetime as dt, asyncio, re
 from telethon.sessions import StringSession
 from telethon import TelegramClient
 from pathlib import Path
 
-API_ID   = int(os.getenv("TELEGRAM_API_ID"))
-API_HASH = os.getenv("TELEGRAM_API_HASH")
-SESSION  = os.getenv("TELEGRAM_SESSION_STRING")
-WHITELIST = yaml.safe_load(Path("data/whitelist_telegram.yml").read_text())["channels"]
+from src import parsepool
+from src.config import CollectionSettings
+
+WHITELIST_PATH = Path("data/whitelist_telegram.yml")
+
+def _credentials():
+    """(api_id, api_hash, session) from the environment, read at fetch time rather than import."""
+    return (int(os.environ["TELEGRAM_API_ID"]), os.environ["TELEGRAM_API_HASH"],
+            os.environ["TELEGRAM_SESSION_STRING"])
 
 # ----------- helpers -----------
 KEYWORDS = {
@@ -33,14 +38,15 @@ INTEL_MAP = {
 }
 # ---------------------------------
 
-async def _fetch_since(start: dt.datetime):
-    client = TelegramClient(StringSession(SESSION), API_ID, API_HASH)
+async def _fetch_since(start: dt.datetime, limit: int = None):
+    api_id, api_hash, session = _credentials()
+    client = TelegramClient(StringSession(session), api_id, api_hash)
     await client.connect()
     rows = []
-    for ch in WHITELIST:
+    for ch in yaml.safe_load(WHITELIST_PATH.read_text())["channels"]:
         try:
             entity = await client.get_entity(ch["username"])
-            async for msg in client.iter_messages(entity, offset_date=start, reverse=True):
+            async for msg in client.iter_messages(entity, offset_date=start, reverse=True, limit=limit):
                 if msg.message and msg.date >= start:
                     txt = msg.text or ""
                     pillar = _score(txt)
@@ -59,6 +65,13 @@ async def _fetch_since(start: dt.datetime):
     await client.disconnect()
     return rows
 
-def fetch_since(start: dt.datetime):
+def fetch_since(start: dt.datetime, limit: int = None):
     """Synchronous wrapper for GitHub runner."""
-    return asyncio.run(_fetch_since(start))
+    return asyncio.run(_fetch_since(start, limit))
+
+def collect(start: dt.datetime, end: dt.datetime, settings: CollectionSettings = None):
+    """Collector entry point used by main.py; caps messages per channel."""
+    settings = settings or CollectionSettings()
+    start, end = parsepool.window(start, end)
+    return [r for r in fetch_since(start, settings.max_entries_per_source)
+            if dt.datetime.fromisoformat(r["date"]) <= end]
@@ -0,0 +1,94 @@
+"""
+Typed loader for configs/weekly.yml.
+One CollectionSettings object is built per run and handed to every
+collector, so timeouts, caps, rate limits and concurrency are tuned in
+YAML rather than in code.
+"""
+import logging
+import os
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import yaml
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = Path("configs/weekly.yml")
+
+@dataclass
+class CollectionSettings:
+    sources: Dict[str, bool] = field(default_factory=dict)
+    timeout: float = 30.0                  # read timeout, seconds
+    connect_timeout: float = 10.0
+    max_entries_per_source: int = 100      # entries kept per feed / channel / subreddit
+    rate_limit: float = 0.5                # min seconds between requests to one host
+    burst: int = 3                         # requests a host may get back-to-back
+    concurrency: int = 8                   # parallel fetches per collector
+    per_host_concurrency: int = 2
+    circuit_threshold: int = 3             # consecutive failures before a feed is skipped
+    circuit_cooldown: float = 3600.0       # first skip period, seconds; doubles per re-open
+    adaptive_timeouts: bool = True         # derive per-host timeouts from observed latency
+    adaptive_polling: bool = False         # skip feeds not expected to have published in the window
+    fetch_bodies: bool = True              # download linked pages of relevant articles for body text
+    max_body_bytes: int = 2_000_000        # per page; longer bodies are truncated
+    max_feed_bytes: int = 5_000_000        # per feed / API response; larger ones are refused
+    scrape_max_new: int = 20               # new article pages fetched per scraped listing per run
+    websub: bool = False                   # note feed hubs; feeds with an active push subscription are not polled
+    websub_callback: Optional[str] = None  # public base URL of scripts/websub_daemon.py
+    parse_workers: int = 0                 # feed parser processes: 0 = one per CPU, 1 = parse inline
+    record_raw: bool = True                # keep every fetched body in the raw store (enables --replay)
+    raw_keep_runs: int = 12                # recorded runs kept; unreferenced blobs are pruned
+    run_budget: float = 0.0                # wall-clock seconds for collection; 0 = unbounded
+    deadline: Optional[str] = None         # e.g. "Sun 06:00": collection ends deadline_reserve before it
+    deadline_tz: str = "Africa/Nairobi"
+    deadline_reserve: float = 1800.0       # seconds kept for NLP, rendering and delivery
+    deadline_min_budget: float = 600.0     # collection time a late-started run still gets
+
+    @property
+    def http_timeout(self) -> Tuple[float, float]:
+        """(connect, read) tuple for requests."""
+        return (self.connect_timeout, self.timeout)
+
+    def enabled(self, source: str) -> bool:
+        return self.sources.get(source, True)
+
+@dataclass
+class Config:
+    collection: CollectionSettings = field(default_factory=CollectionSettings)
+    raw: Dict[str, Any] = field(default_factory=dict)
+
+    def section(self, name: str) -> Dict[str, Any]:
+        return self.raw.get(name) or {}
+
+def _expand(value: Any) -> Any:
+    if isinstance(value, str):
+        return os.path.expandvars(value)
+    if isinstance(value, dict):
+        return {k: _expand(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_expand(v) for v in value]
+    return value
+
+def _typed(cls, data: Dict[str, Any]):
+    """Build a dataclass from a dict, coercing scalars to the declared field types."""
+    kwargs = {}
+    known = {f.name: f for f in fields(cls)}
+    for key, value in (data or {}).items():
+        if key not in known:
+            log.debug(f"Ignoring unknown {cls.__name__} key: {key}")
+            continue
+        default = getattr(cls(), key)
+        if isinstance(default, (int, float)) and not isinstance(default, bool) and value is not None:
+            value = type(default)(value)
+        kwargs[key] = value
+    return cls(**kwargs)
+
+def load_config(path: Optional[Path] = None) -> Config:
+    """Load and type-check the run configuration; missing file -> defaults."""
+    path = Path(path or DEFAULT_CONFIG)
+    if not path.exists():
+        log.warning(f"Config not found: {path} – using defaults")
+        return Config()
+    raw = _expand(yaml.safe_load(path.read_text(encoding="utf-8")) or {})
+    return Config(collection=_typed(CollectionSettings, raw.get("collection", {})), raw=raw)
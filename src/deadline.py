@@ -0,0 +1,125 @@
+"""
+Global wall-clock budget for the collection phase.
+configure() turns collection.deadline ("Sun 06:00" in deadline_tz, minus
+deadline_reserve for NLP and rendering) and/or collection.run_budget into
+one cut-off. The scheduled workflow starts three hours ahead of the
+deadline; a late run (delayed, or re-run by hand) started inside the
+reserve or shortly after the deadline still gets deadline_min_budget
+seconds of collection rather than none. run_queue() fetches sources in priority
+order (tier, then credibility, then historical yield) and stops starting
+new work once the cut-off passes; everything left is recorded in the run
+report instead of delaying it.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pytz
+
+from src import metrics, profiling
+from src.net import health
+
+log = logging.getLogger(__name__)
+
+TIER_RANK = {"A": 0, "B": 1, "C": 2, "D": 3}
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+MIN_REQUEST_SECONDS = 1.0       # never hand a request a smaller timeout than this
+DEADLINE_GRACE = timedelta(hours=6)     # a run started this long after a deadline still belongs to it
+
+_cutoff: Optional[float] = None            # time.monotonic() value; None = unbounded
+_lock = threading.Lock()
+_skipped: Dict[str, List[str]] = {}
+
+def next_occurrence(spec: str, tz: str, now: Optional[datetime] = None,
+                    grace: timedelta = timedelta(0)) -> datetime:
+    """Next moment matching a "Sun 06:00"-style spec in tz; one passed less than grace ago still counts."""
+    day, clock = spec.split()
+    hour, minute = (int(p) for p in clock.split(":"))
+    zone = pytz.timezone(tz)
+    now = now.astimezone(zone) if now else datetime.now(zone)
+    local = now.replace(tzinfo=None, hour=hour, minute=minute, second=0, microsecond=0)
+    local += timedelta(days=(WEEKDAYS.index(day[:3].lower()) - now.weekday()) % 7)   # this week's, today included
+    if zone.localize(local - timedelta(days=7)) + grace >= now:
+        local -= timedelta(days=7)
+    elif zone.localize(local) + grace < now:
+        local += timedelta(days=7)
+    return zone.localize(local)
+
+def configure(settings, now: Optional[datetime] = None):
+    """Set the collection cut-off from CollectionSettings; the earlier of deadline and run_budget wins."""
+    global _cutoff
+    budgets = []
+    if settings.run_budget:
+        budgets.append(settings.run_budget)
+    if settings.deadline:
+        now = now.astimezone() if now else datetime.now(pytz.utc)
+        target = next_occurrence(settings.deadline, settings.deadline_tz, now, DEADLINE_GRACE)
+        seconds = (target - now).total_seconds() - settings.deadline_reserve
+        log.info(f"Collection must finish by {target.isoformat()} minus {settings.deadline_reserve:.0f}s reserve")
+        if seconds < settings.deadline_min_budget:
+            # late start: a short collection beats an empty bundle
+            log.warning(f"Deadline {target.isoformat()} leaves {max(0.0, seconds):.0f}s after the reserve; "
+                        f"collecting for the minimum {settings.deadline_min_budget:.0f}s")
+            seconds = settings.deadline_min_budget
+        budgets.append(seconds)
+    with _lock:
+        _cutoff = time.monotonic() + min(budgets) if budgets else None
+        _skipped.clear()
+    if budgets:
+        log.info(f"Collection budget: {min(budgets):.0f}s")
+        metrics.note("deadline.budget_seconds", round(min(budgets), 1))
+
+def remaining() -> Optional[float]:
+    """Seconds left before the cut-off, None when unbounded."""
+    return None if _cutoff is None else _cutoff - time.monotonic()
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+def clip(timeout: Tuple[float, float]) -> Tuple[float, float]:
+    """Shrink a (connect, read) timeout so one request cannot run past the cut-off."""
+    left = remaining()
+    if left is None:
+        return timeout
+    left = max(MIN_REQUEST_SECONDS, left)
+    return (min(timeout[0], left), min(timeout[1], left))
+
+def skip(collector: str, items: List[str]):
+    """Record work dropped because the budget ran out."""
+    if not items:
+        return
+    with _lock:
+        _skipped.setdefault(collector, []).extend(items)
+        metrics.note("deadline.skipped", {k: list(v) for k, v in _skipped.items()})
+    metrics.count("deadline.skipped", len(items))
+    log.warning(f"Deadline reached: skipped {len(items)} {collector} source(s)")
+
+def priority(feed: Dict[str, Any]) -> Tuple[int, float, float]:
+    """Sort key: tier, then credibility score, then articles kept per past fetch."""
+    tier = TIER_RANK.get(str(feed.get("tier", "B")).upper(), 1)
+    credibility = float(feed.get("credibility_score") or 0.5)
+    return (tier, -credibility, -health.STORE.get(feed["url"]).get("yield", 0.0))
+
+def run_queue(feeds: List[Dict[str, Any]], fetch: Callable[[Dict[str, Any]], List[Any]],
+              workers: int, collector: str) -> List[Any]:
+    """fetch() every feed in priority order on `workers` threads until the cut-off; returns the rows."""
+    queue = deque(sorted(feeds, key=priority))
+    fetch = profiling.in_thread(fetch)
+    rows: List[Any] = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        while queue or pending:
+            while queue and len(pending) < workers and not expired():
+                pending.add(pool.submit(fetch, queue.popleft()))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                rows.extend(future.result())
+    skip(collector, [f["url"] for f in queue])
+    return rows
@@ -3,14 +3,15 @@ import os
 import sys
 import argparse
 import logging
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timedelta
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.analyst import weekly_fusion_intel_style
-from src.collectors import rss, telegram, multilingual, social_media, darkweb, gov_reports
-from src.nlp import geotag, dedup, classifier
+from src import deadline, metrics, parsepool, profiling, registry
+from src.config import load_config
+from src.net import fetch, health, listings, ratelimit, rawstore, resolver, schedule, websub
 
 logging.basicConfig(
     level=logging.INFO,
@@ -18,6 +19,28 @@ logging.basicConfig(
 )
 log = logging.getLogger("ACW")
 
+# (name, label); each resolves lazily through registry "collector.<name>"
+COLLECTORS = [
+    ("rss", "RSS"),
+    ("telegram", "Telegram"),
+    ("multilingual", "multilingual"),
+    ("scrape", "scraped sites"),        # after the feed collectors: picks up pages they found feedless
+    ("sitemap", "sitemaps"),
+    ("social_media", "social media"),
+    ("darkweb", "dark web mentions"),
+    ("gov_reports", "government reports"),
+]
+NOT_REPLAYABLE = {"telegram", "sitemap"}    # MTProto / streamed sitemaps: not in the raw store
+# state a run starts from, snapshotted with its raw responses so --replay starts from it too
+STATE_FILES = ["feed_health.json", "feed_schedule.json", "feed_resolution.json", "listings.json",
+               "websub.json", "spool/*.jsonl"]
+
+@contextmanager
+def stage(name: str):
+    """Time (and, when enabled, profile) one pipeline phase."""
+    with metrics.phase(name), profiling.phase(name):
+        yield
+
 def parse_date(date_str: str) -> datetime:
     return datetime.strptime(date_str, "%Y-%m-%d")
 
@@ -58,6 +81,12 @@ def main():
         help="Cache directory path"
     )
 
+    parser.add_argument(
+        "--only",
+        type=str,
+        help="Comma-separated collectors to run, e.g. rss,multilingual (default: all enabled)"
+    )
+
     parser.add_argument(
         "--auto-discover",
         action="store_true",
@@ -70,8 +99,75 @@ def main():
         help="Test all feeds and exit"
     )
 
+    parser.add_argument(
+        "--distribution",
+        type=str,
+        help="Render and e-mail per-recipient variants from this config (e.g. configs/distribution.yml)"
+    )
+
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Record per-phase/per-source metrics; writes <bundle>.run.json and <bundle>.prom"
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="cProfile each phase; .pstats files go to <cache>/profile/"
+    )
+
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="tracemalloc each phase; top allocations go to <cache>/profile/"
+    )
+
+    parser.add_argument(
+        "--no-deadline",
+        action="store_true",
+        help="Ignore collection.deadline / run_budget (backfills, debugging)"
+    )
+
+    parser.add_argument(
+        "--replay",
+        type=str,
+        metavar="RUN_ID",
+        help="Re-run parsing, NLP and rendering from the raw responses recorded by run RUN_ID (no network)"
+    )
+
     args = parser.parse_args()
 
+    config = load_config(Path(args.config))
+    settings = config.collection
+    raw_dir = Path(args.cache) / "raw"
+    state_dir = Path(args.cache)
+    if args.replay:
+        # recorded responses only; the recorded run's state is restored into a scratch dir
+        # so the live stores are untouched
+        manifest = rawstore.start_replay(args.replay, raw_dir)
+        args.start = args.start or manifest["meta"].get("start")
+        args.end = args.end or manifest["meta"].get("end")
+        args.output = args.output or f"data/weekly/replay-{args.replay}.json"
+        state_dir = Path(args.cache) / "replay" / args.replay
+        log.info(f"Restored {rawstore.restore_state(manifest, state_dir)} state files into {state_dir}")
+        args.no_deadline = True
+    ratelimit.configure(settings)
+    fetch.configure(settings)
+    parsepool.configure(settings)
+    health.configure(settings, state_dir / "feed_health.json")
+    schedule.configure(state_dir / "feed_schedule.json")
+    resolver.configure(state_dir / "feed_resolution.json")
+    listings.configure(state_dir / "listings.json")
+    websub.configure(state_dir / "websub.json")
+
+    if args.metrics:
+        metrics.enable()
+    if not args.no_deadline:
+        deadline.configure(settings)
+    if args.profile or args.profile_memory:
+        profiling.enable(Path(args.cache), cpu=args.profile, memory=args.profile_memory)
+
     if not args.start:
         args.start = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
     if not args.end:
@@ -86,7 +182,7 @@ def main():
     if args.test_feeds:
         log.info("Running feed test mode...")
         from scripts.test_feeds import main as test_main
-        sys.argv = ["test_feeds.py", "--verbose"]
+        sys.argv = ["test_feeds.py", "--verbose", "--config", args.config]
         test_main()
         return
 
@@ -104,59 +200,87 @@ def main():
 
     log.info("=== COLLECTION PHASE ===")
     articles = []
-
-    log.info("Collect RSS")
-    try:
-        articles.extend(rss.collect(parse_date(args.start), parse_date(args.end)))
-    except Exception as e:
-        log.warning(f"RSS collection failed: {e}")
-
-    log.info("Collect Telegram")
-    try:
-        articles.extend(telegram.collect(parse_date(args.start), parse_date(args.end)))
-    except Exception as e:
-        log.warning(f"Telegram collection failed: {e}")
-
-    log.info("Collect multilingual")
-    try:
-        articles.extend(multilingual.collect(parse_date(args.start), parse_date(args.end)))
-    except Exception as e:
-        log.warning(f"Multilingual collection failed: {e}")
-
-    log.info("Collect social media")
-    try:
-        articles.extend(social_media.collect_all(parse_date(args.start), parse_date(args.end)))
-    except Exception as e:
-        log.warning(f"Social media collection failed: {e}")
-
-    log.info("Collect dark web mentions")
-    try:
-        articles.extend(darkweb.collect_all(parse_date(args.start), parse_date(args.end)))
-    except Exception as e:
-        log.warning(f"Dark web collection failed: {e}")
-
-    log.info("Collect government reports")
-    try:
-        articles.extend(gov_reports.collect_all(parse_date(args.start), parse_date(args.end)))
-    except Exception as e:
-        log.warning(f"Government reports collection failed: {e}")
+    if settings.record_raw and not args.replay:
+        rawstore.start_run(raw_dir, state_dir, STATE_FILES,
+                           start=args.start, end=args.end, only=args.only, config=args.config)
+
+    start, end = parse_date(args.start), parse_date(args.end)
+    only = set(args.only.split(",")) if args.only else None
+    for name, label in COLLECTORS:
+        if only is not None and name not in only:
+            continue
+        if not settings.enabled(name):
+            log.info(f"Skip {label} (disabled in {args.config})")
+            continue
+        if args.replay and name in NOT_REPLAYABLE:
+            log.info(f"Skip {label} (not recorded in the raw store)")
+            continue
+        if deadline.expired():
+            deadline.skip("collectors", [name])
+            continue
+        collect = registry.resolve(f"collector.{name}")
+        if collect is None:
+            continue
+        log.info(f"Collect {label}")
+        with stage(f"collect.{name}"):
+            try:
+                found = collect(start, end, settings)
+                articles.extend(found)
+                metrics.count(f"collected.{name}", len(found))
+            except Exception as e:
+                log.warning(f"{label} collection failed: {e}")
+
+    spooled = schedule.read_spool(*parsepool.window(start, end), state_dir / "spool")
+    if spooled:
+        seen = {a.get("link") for a in articles}
+        spooled = [a for a in spooled if a.get("link") not in seen]
+        log.info(f"Merged {len(spooled)} articles from the polling daemon spool")
+        articles.extend(spooled)
+        metrics.count("collected.spool", len(spooled))
 
     log.info(f"Total articles collected: {len(articles)}")
+    metrics.count("articles.collected", len(articles))
 
     if not articles:
         log.error("No articles collected. Exiting.")
+        rawstore.finish_run(settings.raw_keep_runs)
+        metrics.write(Path(args.output))
+        profiling.finish()
         sys.exit(1)
 
     log.info("=== NLP PROCESSING PHASE ===")
     log.info("Deduplication")
-    articles = dedup.remove_duplicates(articles)
+    remove_duplicates = registry.resolve("nlp.dedup")
+    if remove_duplicates:
+        with stage("dedup"):
+            articles = remove_duplicates(articles)
+    metrics.count("articles.deduplicated", len(articles))
     log.info(f"After deduplication: {len(articles)} articles")
 
+    fetch_bodies = registry.resolve("nlp.bodies") if settings.fetch_bodies else None
+    if fetch_bodies:
+        log.info("Article bodies")
+        with stage("bodies"):
+            try:
+                fetch_bodies(articles, settings, state_dir / "bodies")
+            except Exception as e:
+                log.warning(f"Article body extraction failed: {e}")
+    rawstore.finish_run(settings.raw_keep_runs)
+
     log.info("Classification & Geotagging")
-    for article in articles:
-        article["crime_tags"] = classifier.predict(article.get("summary", ""))
-        article["geo"] = geotag.extract(article)
-        article["confidence"] = classifier.confidence(article)
+    predict, extract, confidence = (registry.resolve(n) for n in ("nlp.classify", "nlp.geotag", "nlp.confidence"))
+    if predict:
+        with stage("classify"):
+            for article in articles:
+                article["crime_tags"] = predict(article.get("body_en") or article.get("summary", ""))
+    if extract:
+        with stage("geotag"):
+            for article in articles:
+                article["geo"] = extract(article)
+    if confidence:
+        with stage("classify"):
+            for article in articles:
+                article["confidence"] = confidence(article)
 
     log.info("=== BUCKETING PHASE ===")
     buckets = {
@@ -175,35 +299,57 @@ def main():
              f"Financial: {len(buckets['financial'])} | Cyber: {len(buckets['cyber'])}")
 
     log.info("=== REPORT GENERATION PHASE ===")
+    weekly_fusion_intel_style = registry.resolve("report.intel_style")
     try:
-        report_html = weekly_fusion_intel_style.build(
-            terrorism_bucket=buckets["terrorism"],
-            organised_bucket=buckets["organised"],
-            financial_bucket=buckets["financial"],
-            cyber_bucket=buckets["cyber"],
-            start=parse_date(args.start),
-            end=parse_date(args.end)
-        )
+        with stage("enrich"):
+            report_data = weekly_fusion_intel_style.prepare_report_data(
+                terrorism_bucket=buckets["terrorism"],
+                organised_bucket=buckets["organised"],
+                financial_bucket=buckets["financial"],
+                cyber_bucket=buckets["cyber"],
+                start=parse_date(args.start),
+                end=parse_date(args.end)
+            )
 
         output_path = Path(args.output)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-
         html_output = output_path.with_suffix('.html')
-        html_output.write_text(report_html, encoding='utf-8')
+        with stage("render.html"):
+            # streamed chunk by chunk to the file; the PDF step renders from it
+            weekly_fusion_intel_style.write_html_report(report_data, html_output)
         log.info(f"HTML report saved to {html_output}")
+        with stage("bundle"):
+            weekly_fusion_intel_style.save_weekly_bundle(report_data)
 
-        try:
-            from weasyprint import HTML
+        pdf = registry.resolve("render.pdf")
+        if pdf:
             pdf_output = output_path.with_suffix('.pdf')
-            HTML(string=report_html).write_pdf(pdf_output)
+            with stage("render.pdf"):
+                pdf.write_document(html_output, pdf_output, cache_dir=Path(args.cache) / "pdf")
             log.info(f"PDF report saved to {pdf_output}")
-        except ImportError:
+        else:
             log.warning("weasyprint not installed. PDF generation skipped.")
 
+        if args.distribution:
+            from src.render import email, variants
+            recipients = variants.load_distribution(Path(args.distribution))
+            with stage("render.variants"):
+                deliveries = variants.render_variants(
+                    report_data, recipients, parse_date(args.start),
+                    cache_dir=Path(args.cache) / "pdf"
+                )
+            with stage("email"):
+                email.distribute(deliveries)
+
     except Exception as e:
         log.error(f"Report generation failed: {e}")
         from src.analyst import weekly_fusion
         weekly_fusion.main()
 
+    metrics.note("components.disabled", registry.disabled())
+    metrics.write(Path(args.output))
+    summary = profiling.finish()
+    if summary:
+        print(summary)
+
 if __name__ == "__main__":
     main()
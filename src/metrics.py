@@ -0,0 +1,129 @@
+"""
+Run instrumentation: per-phase timers, per-source fetch stats and counters.
+Disabled by default – every hook returns immediately until enable() is called.
+Results are written as a JSON run report plus a Prometheus textfile.
+"""
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+_enabled = False
+_lock = threading.Lock()
+_started: Optional[float] = None
+_phases: Dict[str, Dict[str, float]] = {}
+_sources: Dict[str, Dict[str, Any]] = {}
+_counters: Dict[str, float] = {}
+_notes: Dict[str, Any] = {}
+
+def enable():
+    global _enabled, _started
+    _enabled = True
+    _started = time.perf_counter()
+
+def enabled() -> bool:
+    return _enabled
+
+@contextmanager
+def phase(name: str):
+    """Time a pipeline phase; nested/repeated phases accumulate."""
+    if not _enabled:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        with _lock:
+            p = _phases.setdefault(name, {"seconds": 0.0, "calls": 0})
+            p["seconds"] += elapsed
+            p["calls"] += 1
+
+def record_source(url: str, collector: str, latency: float = 0.0, bytes: int = 0,
+                  entries: int = 0, kept: int = 0, error: Optional[str] = None):
+    """Accumulate fetch stats for one source (a feed, subreddit, instance …)."""
+    if not _enabled:
+        return
+    with _lock:
+        s = _sources.setdefault(url, {
+            "collector": collector, "fetches": 0, "latency": 0.0, "bytes": 0,
+            "entries": 0, "kept": 0, "errors": 0, "last_error": None,
+        })
+        s["fetches"] += 1
+        s["latency"] += latency
+        s["bytes"] += bytes
+        s["entries"] += entries
+        s["kept"] += kept
+        if error:
+            s["errors"] += 1
+            s["last_error"] = str(error)[:200]
+
+def count(name: str, value: float = 1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def note(name: str, value: Any):
+    """Attach free-form data (e.g. skipped work) to the run report."""
+    if not _enabled:
+        return
+    with _lock:
+        _notes[name] = value
+
+def report() -> Dict[str, Any]:
+    with _lock:
+        return {
+            "generated": datetime.utcnow().isoformat(),
+            "wall_seconds": time.perf_counter() - _started if _started else None,
+            "phases": {k: dict(v) for k, v in _phases.items()},
+            "sources": {k: dict(v) for k, v in _sources.items()},
+            "counters": dict(_counters),
+            "notes": dict(_notes),
+        }
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+def prometheus(data: Dict[str, Any]) -> str:
+    lines = [
+        "# HELP acw_phase_seconds Wall time spent per pipeline phase.",
+        "# TYPE acw_phase_seconds gauge",
+    ]
+    lines += [f'acw_phase_seconds{{phase="{_label(k)}"}} {v["seconds"]:.6f}'
+              for k, v in data["phases"].items()]
+    for metric, field, help_text in (
+        ("acw_source_latency_seconds", "latency", "Total fetch latency per source."),
+        ("acw_source_bytes", "bytes", "Bytes downloaded per source."),
+        ("acw_source_entries", "entries", "Feed entries seen per source."),
+        ("acw_source_kept", "kept", "In-window items kept per source."),
+        ("acw_source_errors", "errors", "Failed fetches per source."),
+    ):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+        lines += [f'{metric}{{collector="{_label(s["collector"])}",source="{_label(url)}"}} {s[field]}'
+                  for url, s in data["sources"].items()]
+    lines += ["# HELP acw_counter Run counters.", "# TYPE acw_counter gauge"]
+    lines += [f'acw_counter{{name="{_label(k)}"}} {v}' for k, v in data["counters"].items()]
+    if data["wall_seconds"] is not None:
+        lines += ["# TYPE acw_run_seconds gauge", f"acw_run_seconds {data['wall_seconds']:.6f}"]
+    return "\n".join(lines) + "\n"
+
+def write(bundle_path: Path) -> Optional[Path]:
+    """Write <bundle>.run.json and <bundle>.prom next to the weekly bundle."""
+    if not _enabled:
+        return None
+    bundle_path = Path(bundle_path)
+    bundle_path.parent.mkdir(parents=True, exist_ok=True)
+    data = report()
+    json_path = bundle_path.with_suffix(".run.json")
+    json_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    bundle_path.with_suffix(".prom").write_text(prometheus(data), encoding="utf-8")
+    log.info(f"Run report saved to {json_path}")
+    return json_path
@@ -0,0 +1,121 @@
+"""
+Bounded, streamed HTTP GETs for the collectors.
+get() checks the Content-Type against the source kind's allowlist before
+any body is read, then streams the body with a size cap (counted on the
+decoded bytes, so a Content-Encoding bomb is capped too) and inflates
+gzip bodies served without Content-Encoding (.xml.gz), again bounded.
+The body is attached to the response as bytes (resp.content) for parsers
+to take directly; nothing decodes it to str. Bodies are recorded in the
+raw store once read; a body refused or cut off is recorded with its error,
+which a replay raises again.
+"""
+import logging
+import zlib
+from typing import Dict, Optional, Tuple
+
+import requests
+
+from src import metrics
+from src.net import rawstore
+
+log = logging.getLogger(__name__)
+
+CHUNK = 64 * 1024
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Content-Type substrings accepted per source kind; a missing Content-Type is always accepted
+ALLOWED: Dict[str, Tuple[str, ...]] = {
+    "feed": ("xml", "rss", "atom", "rdf", "json", "html", "text/plain", "gzip", "octet-stream"),
+    "html": ("html",),
+    "sitemap": ("xml", "text/plain", "gzip", "octet-stream"),
+    "json": ("json",),
+}
+# maximum body bytes per kind; html is truncated at the limit (parsers cope), the rest is refused
+LIMITS: Dict[str, int] = {"feed": 5_000_000, "html": 2_000_000, "sitemap": 0, "json": 5_000_000}
+TRUNCATE = {"html"}
+
+class BodyTooLarge(ValueError):
+    """The body exceeds the kind's size limit."""
+
+class UnexpectedContentType(ValueError):
+    """The Content-Type is not acceptable for the kind of source fetched."""
+
+ERRORS = {cls.__name__: cls for cls in (BodyTooLarge, UnexpectedContentType)}
+
+def _replayed_error(url: str) -> Optional[Exception]:
+    """The exception reading url's body raised in the run being replayed, if it raised one."""
+    error = rawstore.recorded_error(url)
+    if error is None:
+        return None
+    cls = ERRORS.get(error["type"]) or getattr(requests.exceptions, error["type"], requests.RequestException)
+    return cls(error["message"])
+
+def configure(settings):
+    """Apply CollectionSettings (max_feed_bytes, max_body_bytes)."""
+    LIMITS.update(feed=settings.max_feed_bytes, json=settings.max_feed_bytes, html=settings.max_body_bytes)
+
+def check_type(resp: requests.Response, kind: str):
+    """Raise UnexpectedContentType unless resp's Content-Type suits kind."""
+    ctype = resp.headers.get("Content-Type", "").lower()
+    if ctype and not any(allowed in ctype for allowed in ALLOWED[kind]):
+        metrics.count("fetch.bad_type")
+        raise UnexpectedContentType(f"{resp.url}: unexpected Content-Type {ctype!r} for {kind}")
+
+def _inflate(body: bytes, url: str, max_bytes: int) -> bytes:
+    """Decompress a gzip body the server sent as a file, up to max_bytes."""
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        data = inflater.decompress(body, max_bytes or 0)
+    except zlib.error as e:
+        log.debug(f"{url}: gzip magic but not gzip ({e}); keeping the raw body")
+        return body
+    if inflater.unconsumed_tail:
+        metrics.count("fetch.too_large")
+        raise BodyTooLarge(f"{url}: gzip body inflates past {max_bytes} bytes")
+    return data
+
+def _read(resp: requests.Response, max_bytes: int, truncate: bool) -> bytes:
+    chunks, size = [], 0
+    for chunk in resp.iter_content(CHUNK):
+        chunks.append(chunk)
+        size += len(chunk)
+        if max_bytes and size > max_bytes:
+            if not truncate:
+                metrics.count("fetch.too_large")
+                raise BodyTooLarge(f"{resp.url}: body exceeds {max_bytes} bytes")
+            log.debug(f"Truncated {resp.url} at {max_bytes} bytes")
+            return b"".join(chunks)[:max_bytes]
+    return b"".join(chunks)
+
+def get(session: requests.Session, url: str, kind: str, timeout, max_bytes: Optional[int] = None,
+        **kwargs) -> requests.Response:
+    """Streamed GET of url for a source kind ("feed", "html", "sitemap", "json").
+    Error and 304 responses come back with an empty body for the caller to handle;
+    raises UnexpectedContentType / BodyTooLarge (both ValueError) for unusable bodies."""
+    max_bytes = LIMITS[kind] if max_bytes is None else max_bytes
+    with session.get(url, timeout=timeout, stream=True, **kwargs) as resp:
+        body = b""
+        try:
+            if 200 <= resp.status_code < 300:
+                replayed = _replayed_error(resp.url)
+                if replayed is not None:
+                    raise replayed
+                check_type(resp, kind)
+                length = resp.headers.get("Content-Length", "")
+                if max_bytes and kind not in TRUNCATE and length.isdigit() and int(length) > max_bytes:
+                    metrics.count("fetch.too_large")
+                    raise BodyTooLarge(f"{url}: Content-Length {length} exceeds {max_bytes} bytes")
+                body = _read(resp, max_bytes, kind in TRUNCATE)
+        except Exception as e:
+            # never record the empty body as the answer: a replay would parse an empty 200
+            rawstore.record(resp.url, resp.status_code, resp.headers, b"", error=e)
+            raise
+        rawstore.record(resp.url, resp.status_code, resp.headers, body)
+    # only now, after close(): a response marked consumed would hand an unread connection back to the pool
+    if body[:2] == GZIP_MAGIC:
+        body = _inflate(body, resp.url, max_bytes)
+        if any(t in resp.headers.get("Content-Type", "") for t in ("gzip", "octet-stream")):
+            del resp.headers["Content-Type"]    # let the parser sniff the inflated document
+    resp._content = body
+    resp._content_consumed = True
+    return resp
@@ -0,0 +1,199 @@
+"""
+Persistent per-feed health records.
+Tracks success/failure streaks, latency percentiles, Last-Modified cadence
+and consecutive parse errors for every feed URL. Chronically failing feeds
+get an open circuit (skipped until an exponentially growing cooldown
+expires) and per-host timeouts are derived from observed latency instead
+of the flat configured (connect, read) pair. A feed whose last fetch timed
+out gets the configured pair again until it succeeds: timeouts leave no
+latency sample, so the host's p95 alone would keep shrinking below it.
+"""
+import logging
+import statistics
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from src.net import statefile
+from src.net.ratelimit import host_of
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path("data/cache/feed_health.json")
+LATENCY_SAMPLES = 50            # rolling window per feed
+MODIFIED_SAMPLES = 20           # distinct Last-Modified values kept per feed
+MIN_TIMEOUT_SAMPLES = 5         # host latencies needed before timeouts adapt
+MIN_READ_TIMEOUT = 5.0
+MIN_CONNECT_TIMEOUT = 3.0
+MAX_COOLDOWN = 7 * 24 * 3600.0
+YIELD_WEIGHT = 0.3              # EWMA weight of the latest fetch's kept-article count
+
+def _new_record() -> Dict[str, Any]:
+    return {
+        "successes": 0, "failures": 0,
+        "success_streak": 0, "failure_streak": 0, "parse_error_streak": 0,
+        "latencies": [], "last_success": None, "last_failure": None, "last_error": None,
+        "last_modified": None, "modified_history": [],
+        "open_until": 0.0, "cooldown": 0.0, "yield": 0.0, "timed_out": False,
+    }
+
+def _timed_out(error: Any) -> bool:
+    # read timeouts while streaming a body surface as ConnectionError("... Read timed out.")
+    return isinstance(error, requests.Timeout) or "timed out" in str(error).lower()
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+class HealthStore:
+    def __init__(self, path: Path = DEFAULT_PATH, failure_threshold: int = 3,
+                 base_cooldown: float = 3600.0, adaptive_timeouts: bool = True):
+        self.path = Path(path)
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = base_cooldown
+        self.adaptive_timeouts = adaptive_timeouts
+        self._feeds: Optional[Dict[str, Dict[str, Any]]] = None
+        self._hosts: Optional[Dict[str, List[float]]] = None
+        self._lock = threading.RLock()
+
+    # ---------- persistence ----------
+    def _records(self) -> Dict[str, Dict[str, Any]]:
+        if self._feeds is None:
+            self._feeds = statefile.read(self.path, "feeds")
+        return self._feeds
+
+    def save(self):
+        """Merge with what other processes saved since (newest copy of each feed wins) and write."""
+        with self._lock:
+            if self._feeds is not None:
+                statefile.save(self.path, "feeds", self._feeds)
+                self._hosts = None          # rebuilt from the merged latencies
+
+    def get(self, url: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._records().get(url) or _new_record())
+
+    def _record(self, url: str) -> Dict[str, Any]:
+        return self._records().setdefault(url, _new_record())
+
+    def _add_latency(self, url: str, rec: Dict[str, Any], latency: float):
+        rec["latencies"] = (rec["latencies"] + [round(latency, 3)])[-LATENCY_SAMPLES:]
+        if self._hosts is not None:
+            samples = self._hosts.setdefault(host_of(url), [])
+            samples.append(latency)
+            del samples[:-LATENCY_SAMPLES * 4]
+
+    def _host_latencies(self, host: str) -> List[float]:
+        if self._hosts is None:
+            self._hosts = {}
+            for feed, rec in self._records().items():
+                self._hosts.setdefault(host_of(feed), []).extend(rec["latencies"])
+        return self._hosts.get(host, [])
+
+    # ---------- circuit breaker ----------
+    def allow(self, url: str) -> bool:
+        """False while the feed's circuit is open; after the cooldown one trial fetch is let through."""
+        with self._lock:
+            rec = self._records().get(url)
+            return rec is None or time.time() >= rec["open_until"]
+
+    def state(self, url: str) -> str:
+        with self._lock:
+            rec = self._records().get(url)
+            if rec is None or not rec["cooldown"]:
+                return "closed"
+            return "open" if time.time() < rec["open_until"] else "half-open"
+
+    def record_success(self, url: str, latency: float, last_modified: Optional[str] = None,
+                       kept: Optional[int] = None):
+        with self._lock:
+            rec = self._record(url)
+            if kept is not None:
+                rec["yield"] = round((1 - YIELD_WEIGHT) * rec.get("yield", 0.0) + YIELD_WEIGHT * kept, 3)
+            rec["successes"] += 1
+            rec["success_streak"] += 1
+            rec["failure_streak"] = 0
+            rec["parse_error_streak"] = 0
+            rec["timed_out"] = False
+            rec["last_success"] = time.time()
+            self._add_latency(url, rec, latency)
+            if rec["cooldown"]:
+                log.info(f"Circuit closed for {url}")
+            rec["open_until"] = rec["cooldown"] = 0.0
+            if last_modified and last_modified != rec["last_modified"]:
+                rec["last_modified"] = last_modified
+                try:
+                    stamp = parsedate_to_datetime(last_modified).timestamp()
+                    rec["modified_history"] = (rec["modified_history"] + [stamp])[-MODIFIED_SAMPLES:]
+                except (TypeError, ValueError):
+                    pass
+            statefile.stamp(rec)
+
+    def record_failure(self, url: str, error: Any, latency: Optional[float] = None, parse: bool = False):
+        """Count a failed fetch (or an unparseable body) and open the circuit past the threshold."""
+        with self._lock:
+            rec = self._record(url)
+            rec["failures"] += 1
+            rec["failure_streak"] += 1
+            rec["success_streak"] = 0
+            rec["parse_error_streak"] = rec["parse_error_streak"] + 1 if parse else 0
+            rec["last_failure"] = time.time()
+            rec["last_error"] = str(error)[:200]
+            rec["timed_out"] = _timed_out(error)
+            if latency is not None:
+                self._add_latency(url, rec, latency)
+            if rec["failure_streak"] >= self.failure_threshold:
+                rec["cooldown"] = min(MAX_COOLDOWN, rec["cooldown"] * 2 if rec["cooldown"] else self.base_cooldown)
+                rec["open_until"] = time.time() + rec["cooldown"]
+                log.info(f"Circuit open for {url} after {rec['failure_streak']} failures; "
+                         f"retry in {rec['cooldown'] / 3600:.1f}h")
+            statefile.stamp(rec)
+
+    # ---------- stats ----------
+    def latency(self, url: str) -> Tuple[Optional[float], Optional[float]]:
+        """(p50, p95) fetch latency in seconds."""
+        with self._lock:
+            values = (self._records().get(url) or {}).get("latencies", [])
+            return _percentile(values, 50), _percentile(values, 95)
+
+    def cadence(self, url: str) -> Optional[float]:
+        """Median seconds between distinct Last-Modified values, if seen at least twice."""
+        with self._lock:
+            history = sorted((self._records().get(url) or {}).get("modified_history", []))
+        gaps = [b - a for a, b in zip(history, history[1:]) if b > a]
+        return statistics.median(gaps) if gaps else None
+
+    def timeout(self, url: str, settings) -> Tuple[float, float]:
+        """(connect, read) timeout for url: the host's p95 latency with headroom, capped by settings.
+        The configured pair after the feed's last fetch timed out."""
+        default = settings.http_timeout
+        if not self.adaptive_timeouts:
+            return default
+        with self._lock:
+            if (self._records().get(url) or {}).get("timed_out"):
+                return default
+            samples = list(self._host_latencies(host_of(url)))
+        if len(samples) < MIN_TIMEOUT_SAMPLES:
+            return default
+        p95 = _percentile(samples, 95)
+        connect = min(settings.connect_timeout, max(MIN_CONNECT_TIMEOUT, p95 * 2))
+        read = min(settings.timeout, max(MIN_READ_TIMEOUT, p95 * 3))
+        return (connect, read)
+
+STORE = HealthStore()
+
+def configure(settings, path: Optional[Path] = None):
+    """Apply CollectionSettings (circuit_threshold, circuit_cooldown, adaptive_timeouts)."""
+    with STORE._lock:
+        if path is not None and Path(path) != STORE.path:
+            STORE.path = Path(path)
+            STORE._feeds = STORE._hosts = None
+        STORE.failure_threshold = settings.circuit_threshold
+        STORE.base_cooldown = settings.circuit_cooldown
+        STORE.adaptive_timeouts = settings.adaptive_timeouts
@@ -0,0 +1,129 @@
+"""
+Per-listing-page state for the scrape collector.
+For every scraped section/listing page it keeps the HTTP validators
+(ETag, Last-Modified) for conditional requests, the link selector learned
+for the site, and the index of article links already seen with when they
+were first seen, plus the article rows scraped from it (without bodies)
+so re-runs over the same window return them. Stored in
+data/cache/listings.json; saves are merged with other processes' (see
+src/net/statefile.py).
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.net import statefile
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path("data/cache/listings.json")
+SEEN_LIMIT = 1000               # links remembered per listing page (newest kept)
+ROWS_KEPT = timedelta(days=35)  # scraped rows older than this (by article date) are dropped
+
+def _new_record() -> Dict[str, Any]:
+    return {"etag": None, "last_modified": None, "selector": None, "learned": None, "seen": {}, "rows": {}}
+
+class ListingState:
+    def __init__(self, path: Path = DEFAULT_PATH):
+        self.path = Path(path)
+        self._pages: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.RLock()
+
+    # ---------- persistence ----------
+    def _records(self) -> Dict[str, Dict[str, Any]]:
+        if self._pages is None:
+            self._pages = statefile.read(self.path, "pages")
+        return self._pages
+
+    def save(self):
+        """Merge with what other processes saved since (newest copy of each page wins) and write."""
+        with self._lock:
+            if self._pages is not None:
+                statefile.save(self.path, "pages", self._pages)
+
+    def get(self, url: str) -> Dict[str, Any]:
+        with self._lock:
+            rec = self._records().get(url) or _new_record()
+            return dict(rec, seen=dict(rec["seen"]), rows=dict(rec.get("rows", {})))
+
+    def _record(self, url: str) -> Dict[str, Any]:
+        """The page's record for changing; stamped as updated."""
+        rec = self._records().setdefault(url, _new_record())
+        rec.setdefault("rows", {})          # state written before rows were kept
+        return statefile.stamp(rec)
+
+    # ---------- conditional requests ----------
+    def validators(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for the listing page."""
+        with self._lock:
+            rec = self._records().get(url) or {}
+            headers = {}
+            if rec.get("etag"):
+                headers["If-None-Match"] = rec["etag"]
+            if rec.get("last_modified"):
+                headers["If-Modified-Since"] = rec["last_modified"]
+            return headers
+
+    def set_validators(self, url: str, etag: Optional[str], last_modified: Optional[str]):
+        with self._lock:
+            rec = self._record(url)
+            rec["etag"], rec["last_modified"] = etag, last_modified
+
+    # ---------- selectors ----------
+    def selector(self, url: str) -> Optional[str]:
+        with self._lock:
+            return (self._records().get(url) or {}).get("selector")
+
+    def set_selector(self, url: str, selector: Optional[str]):
+        with self._lock:
+            rec = self._record(url)
+            rec["selector"], rec["learned"] = selector, time.time()
+
+    # ---------- seen-entry index ----------
+    def new_links(self, url: str, links: Iterable[str]) -> List[str]:
+        """Links not in the page's seen index, in page order."""
+        with self._lock:
+            seen = (self._records().get(url) or {}).get("seen", {})
+            return [link for link in dict.fromkeys(links) if link not in seen]
+
+    def first_seen(self, url: str, link: str) -> Optional[float]:
+        with self._lock:
+            return (self._records().get(url) or {}).get("seen", {}).get(link)
+
+    def mark_seen(self, url: str, links: Iterable[str], when: Optional[float] = None):
+        when = when or time.time()
+        with self._lock:
+            seen = self._record(url)["seen"]
+            for link in links:
+                seen.setdefault(link, when)
+            if len(seen) > SEEN_LIMIT:
+                keep = sorted(seen.items(), key=lambda kv: kv[1])[-SEEN_LIMIT:]
+                self._record(url)["seen"] = dict(keep)
+
+    # ---------- scraped rows ----------
+    def keep_rows(self, url: str, rows: Iterable[Dict[str, Any]]):
+        """Remember rows scraped from the page; bodies are not kept (the bodies phase refetches them)."""
+        cutoff = datetime.now(timezone.utc) - ROWS_KEPT
+        with self._lock:
+            kept = self._record(url)["rows"]
+            for row in rows:
+                kept[row["link"]] = {k: v for k, v in row.items() if k not in ("body", "body_en")}
+            for link in [link for link, row in kept.items() if datetime.fromisoformat(row["date"]) < cutoff]:
+                del kept[link]
+
+    def rows(self, url: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Kept rows of the page dated inside [start, end] (aware bounds)."""
+        with self._lock:
+            kept = (self._records().get(url) or {}).get("rows", {})
+            return [dict(row) for row in kept.values() if start <= datetime.fromisoformat(row["date"]) <= end]
+
+STORE = ListingState()
+
+def configure(path: Path):
+    with STORE._lock:
+        if Path(path) != STORE.path:
+            STORE.path = Path(path)
+            STORE._pages = None
@@ -0,0 +1,222 @@
+"""
+Process-wide per-host rate limiter.
+Each host gets a token bucket (steady rate + burst) and a concurrency
+cap. 429/503 responses honour Retry-After and halve the host's rate;
+successes slowly restore it. Sessions from session() apply all of this
+transparently through RateLimitedAdapter, which also owns retries so every
+attempt waits on the limiter. A host slot is held until the body has been
+read: streamed responses give it back when they are closed.
+"""
+import logging
+import threading
+import time
+import weakref
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError
+from urllib3.util.retry import Retry
+
+from src.net import rawstore
+
+log = logging.getLogger(__name__)
+
+SLOWDOWN_STATUSES = {429, 503}
+MAX_BLOCK_SECONDS = 600.0
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds (delta-seconds or HTTP-date); None if absent/invalid."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+def host_of(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+class _Bucket:
+    __slots__ = ("rate", "base_rate", "burst", "tokens", "updated", "blocked_until", "strikes", "slots")
+
+    def __init__(self, rate: float, burst: int, concurrency: int):
+        self.rate = self.base_rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.strikes = 0
+        self.slots = threading.BoundedSemaphore(concurrency)
+
+class HostRateLimiter:
+    def __init__(self, rate: float = 2.0, burst: int = 3, concurrency: int = 2, min_rate: float = 1 / 60):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.min_rate = min_rate
+        self._buckets: Dict[str, _Bucket] = {}
+        self._overrides: Dict[str, Tuple[float, int, int]] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, rate_limit: float, burst: int, concurrency: int):
+        """rate_limit is the minimum spacing in seconds between requests to one host."""
+        with self._lock:
+            self.rate = 1.0 / rate_limit if rate_limit > 0 else float("inf")
+            self.burst = max(1, burst)
+            self.concurrency = max(1, concurrency)
+            self._buckets.clear()
+
+    def override(self, host: str, rate_limit: float, burst: int, concurrency: int):
+        """Per-host limits (e.g. an unthrottled local test server); same units as configure()."""
+        with self._lock:
+            self._overrides[host.lower()] = (1.0 / rate_limit if rate_limit > 0 else float("inf"),
+                                             max(1, burst), max(1, concurrency))
+            self._buckets.pop(host.lower(), None)
+
+    def _bucket(self, host: str) -> _Bucket:
+        b = self._buckets.get(host)
+        if b is None:
+            rate, burst, concurrency = self._overrides.get(host, (self.rate, self.burst, self.concurrency))
+            b = self._buckets[host] = _Bucket(rate, burst, concurrency)
+        return b
+
+    def acquire(self, url: str) -> _Bucket:
+        """Block until the host allows one more request; returns the bucket (release its slot after)."""
+        host = host_of(url)
+        with self._lock:
+            b = self._bucket(host)
+            now = time.monotonic()
+            if b.rate != float("inf"):
+                b.tokens = min(b.burst, b.tokens + (now - b.updated) * b.rate)
+                b.updated = now
+                b.tokens -= 1
+                wait = -b.tokens / b.rate if b.tokens < 0 else 0.0
+            else:
+                wait = 0.0
+            wait = max(wait, b.blocked_until - now)
+        if wait > 0:
+            time.sleep(wait)
+        b.slots.acquire()
+        return b
+
+    def feedback(self, url: str, status: int, headers=None):
+        """Adapt to the server: back off on 429/503, recover on success."""
+        host = host_of(url)
+        with self._lock:
+            b = self._bucket(host)
+            if status in SLOWDOWN_STATUSES:
+                b.strikes += 1
+                retry_after = parse_retry_after((headers or {}).get("Retry-After"))
+                delay = retry_after if retry_after is not None else min(2 ** b.strikes, MAX_BLOCK_SECONDS)
+                b.blocked_until = max(b.blocked_until, time.monotonic() + min(delay, MAX_BLOCK_SECONDS))
+                # no saved-up burst once the pause ends: tokens refill from blocked_until
+                b.tokens = 0.0
+                b.updated = b.blocked_until
+                if b.rate != float("inf"):
+                    b.rate = max(self.min_rate, b.rate / 2)
+                else:
+                    b.rate = b.base_rate = max(self.min_rate, 1.0)
+                log.info(f"Rate limited by {host} (HTTP {status}); pausing {delay:.0f}s, "
+                         f"rate now {b.rate:.2f}/s")
+            elif status < 400:
+                b.strikes = 0
+                if b.rate < b.base_rate:
+                    b.rate = min(b.base_rate, b.rate * 1.1)
+
+def _release_once(bucket: _Bucket):
+    """Slot release that is safe to call from close() and from the finalizer alike."""
+    done = threading.Lock()
+
+    def release():
+        if done.acquire(blocking=False):
+            bucket.slots.release()
+    return release
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter that waits on the shared limiter before every request (retries included)."""
+
+    def __init__(self, limiter: "HostRateLimiter" = None, retries: Optional[Retry] = None, **kwargs):
+        self.limiter = limiter or LIMITER
+        self.retries = retries          # urllib3 would retry behind the limiter's back; we do it here
+        super().__init__(**kwargs)
+
+    def _send_once(self, request, **kwargs):
+        bucket = self.limiter.acquire(request.url)
+        release = _release_once(bucket)
+        try:
+            resp = super().send(request, **kwargs)
+            self.limiter.feedback(request.url, resp.status_code, resp.headers)
+            if not kwargs.get("stream"):
+                rawstore.record_response(resp)     # reads the body while the slot is held
+            elif resp.is_redirect:
+                rawstore.record(resp.url, resp.status_code, resp.headers, b"")   # the caller only sees the last hop
+        except BaseException:
+            release()
+            raise
+        if not kwargs.get("stream"):
+            release()
+        else:
+            # the body is still on the wire: hold the slot until the caller closes the response
+            close = resp.close
+
+            def close_and_release():
+                try:
+                    close()
+                finally:
+                    release()
+            resp.close = close_and_release
+            weakref.finalize(resp, release)        # responses that are never closed
+        return resp
+
+    def send(self, request, **kwargs):
+        if rawstore.replaying():
+            return rawstore.replay_response(request)
+        retries = self.retries
+        while True:
+            try:
+                resp = self._send_once(request, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if retries is None:
+                    raise
+                try:
+                    retries = retries.increment(request.method, request.url, error=e)
+                except MaxRetryError:
+                    raise e
+                log.debug(f"Retrying {request.url} after {e}")
+                retries.sleep()
+                continue
+            if retries is None or not retries.is_retry(request.method, resp.status_code,
+                                                       "Retry-After" in resp.headers):
+                return resp
+            try:
+                retries = retries.increment(request.method, request.url, response=resp.raw)
+            except MaxRetryError:
+                return resp
+            log.debug(f"Retrying {request.url} after HTTP {resp.status_code}")
+            resp.close()
+            retries.sleep()
+
+LIMITER = HostRateLimiter()
+
+def configure(settings):
+    """Apply CollectionSettings (rate_limit, burst, per_host_concurrency)."""
+    LIMITER.configure(settings.rate_limit, settings.burst, settings.per_host_concurrency)
+
+def session(max_retries=0, pool_maxsize: int = 32) -> requests.Session:
+    """requests.Session whose every request (and every retry, int or urllib3 Retry) goes through the shared limiter."""
+    s = requests.Session()
+    retries = Retry.from_int(max_retries) if max_retries else None
+    adapter = RateLimitedAdapter(LIMITER, retries=retries, pool_maxsize=pool_maxsize)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
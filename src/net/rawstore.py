@@ -0,0 +1,212 @@
+"""
+Content-addressed store of raw HTTP responses.
+While a run is being recorded every response body fetched through the
+rate-limited sessions is written once under its SHA-256 (zstd-compressed,
+zlib when zstandard is not installed) and a per-run manifest maps each URL
+to its blob. In replay mode the same sessions answer from a manifest
+instead of the network, so a past run can be re-parsed offline.
+Responses a run never fetched because its state answered instead (feed
+resolutions, conditional-request validators, cached article bodies, the
+polling spool) are kept too: the state files are snapshotted into the
+manifest when the run starts or when a cache hit is served, and a replay
+restores them into its scratch state dir first.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import zstandard
+except ImportError:                      # optional: fall back to zlib
+    zstandard = None
+
+log = logging.getLogger(__name__)
+
+STORE_DIR = Path("data/cache/raw")
+KEPT_HEADERS = ("Content-Type", "Last-Modified", "ETag", "Location", "Retry-After")
+ZSTD_LEVEL = 10
+
+_lock = threading.Lock()
+_root: Path = STORE_DIR
+_run: Optional[Dict[str, Any]] = None        # manifest being recorded
+_state_dir: Optional[Path] = None            # state snapshots are stored relative to this
+_replay: Optional[Dict[str, Any]] = None     # manifest being replayed
+
+# ---------- blobs ----------
+def _blob_path(digest: str, root: Path) -> Path:
+    suffix = ".zst" if zstandard else ".z"
+    return root / "blobs" / digest[:2] / f"{digest}{suffix}"
+
+def put_blob(body: bytes, root: Optional[Path] = None) -> str:
+    """Store body once; returns its SHA-256."""
+    root = root or _root
+    digest = hashlib.sha256(body).hexdigest()
+    path = _blob_path(digest, root)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body) if zstandard else zlib.compress(body, 6)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    return digest
+
+def get_blob(digest: str, root: Optional[Path] = None) -> bytes:
+    root = root or _root
+    for suffix, decode in ((".zst", lambda d: zstandard.ZstdDecompressor().decompress(d) if zstandard else None),
+                           (".z", zlib.decompress)):
+        path = root / "blobs" / digest[:2] / f"{digest}{suffix}"
+        if path.exists():
+            body = decode(path.read_bytes())
+            if body is None:
+                raise RuntimeError(f"blob {digest} is zstd-compressed but zstandard is not installed")
+            return body
+    raise FileNotFoundError(f"blob {digest} not in {root}")
+
+# ---------- recording ----------
+def start_run(root: Path = STORE_DIR, state_dir: Optional[Path] = None, state: Iterable[str] = (),
+              **meta) -> str:
+    """Begin recording; returns the run id (also the manifest name).
+    `state` globs (relative to state_dir) are snapshotted as the run starts."""
+    global _root, _run, _state_dir
+    run_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+    with _lock:
+        _root = Path(root)
+        _state_dir = Path(state_dir) if state_dir else None
+        _run = {"run_id": run_id, "started": time.time(), "meta": meta, "responses": {}, "state": {}}
+    if _state_dir:
+        for pattern in state:
+            for path in sorted(_state_dir.glob(pattern)):
+                snapshot(path)
+    log.info(f"Recording raw responses as run {run_id}")
+    return run_id
+
+def record(url: str, status: int, headers, body: bytes, error: Optional[BaseException] = None):
+    """Add one response to the run being recorded (no-op otherwise); `error` is what reading it raised."""
+    if _run is None or _replay is not None:
+        return
+    digest = put_blob(body, _root)
+    entry = {"blob": digest, "status": status, "bytes": len(body), "fetched_at": time.time(),
+             "headers": {h: headers[h] for h in KEPT_HEADERS if headers and h in headers}}
+    if error is not None:
+        entry["error"] = {"type": type(error).__name__, "message": str(error)[:500]}
+    with _lock:
+        if _run is not None:
+            _run["responses"][url] = entry
+
+def record_response(resp: requests.Response):
+    """Record one adapter-level response (redirect hops are recorded separately, with Location)."""
+    if _run is None or _replay is not None:
+        return
+    record(resp.url, resp.status_code, resp.headers, resp.content)
+
+def snapshot(path: Path):
+    """Keep a state file's current contents with the run being recorded (no-op otherwise)."""
+    if _run is None or _replay is not None or _state_dir is None:
+        return
+    try:
+        name = Path(path).relative_to(_state_dir).as_posix()
+        digest = put_blob(Path(path).read_bytes(), _root)
+    except (ValueError, OSError) as e:
+        log.debug(f"Not snapshotting {path}: {e}")
+        return
+    with _lock:
+        if _run is not None:
+            _run["state"].setdefault(name, digest)     # first sight wins: the state the run started from
+
+def finish_run(keep_runs: int = 0) -> Optional[Path]:
+    """Write the manifest of the recorded run and prune old runs; returns the manifest path."""
+    global _run
+    with _lock:
+        run, _run = _run, None
+    if run is None:
+        return None
+    run["finished"] = time.time()
+    path = _root / "runs" / f"{run['run_id']}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(run, indent=1, ensure_ascii=False), encoding="utf-8")
+    log.info(f"Raw store: {len(run['responses'])} responses for run {run['run_id']} → {path}")
+    if keep_runs:
+        prune(keep_runs, _root)
+    return path
+
+def prune(keep_runs: int, root: Path = STORE_DIR):
+    """Keep the newest keep_runs manifests and delete blobs no remaining manifest references."""
+    manifests = sorted((root / "runs").glob("*.json"))
+    for old in manifests[:-keep_runs]:
+        old.unlink()
+    referenced = set()
+    for path in (root / "runs").glob("*.json"):
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+        referenced.update(r["blob"] for r in manifest["responses"].values())
+        referenced.update(manifest.get("state", {}).values())
+    removed = 0
+    for blob in (root / "blobs").glob("*/*"):
+        if blob.name.split(".")[0] not in referenced:
+            blob.unlink()
+            removed += 1
+    if removed:
+        log.info(f"Raw store: pruned {removed} unreferenced blobs")
+
+# ---------- replay ----------
+def load_manifest(run_id: str, root: Path = STORE_DIR) -> Dict[str, Any]:
+    return json.loads((Path(root) / "runs" / f"{run_id}.json").read_text(encoding="utf-8"))
+
+def start_replay(run_id: str, root: Path = STORE_DIR) -> Dict[str, Any]:
+    """Serve every request from run_id's manifest from now on; returns the manifest."""
+    global _root, _replay
+    manifest = load_manifest(run_id, root)
+    with _lock:
+        _root = Path(root)
+        _replay = manifest
+    log.info(f"Replaying run {run_id}: {len(manifest['responses'])} recorded responses")
+    return manifest
+
+def restore_state(manifest: Dict[str, Any], state_dir: Path) -> int:
+    """Recreate the recorded run's state snapshots in a fresh state_dir; returns files written."""
+    state_dir = Path(state_dir)
+    if state_dir.exists():
+        shutil.rmtree(state_dir)
+    for name, digest in manifest.get("state", {}).items():
+        path = state_dir / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(get_blob(digest, _root))
+    return len(manifest.get("state", {}))
+
+def replaying() -> bool:
+    return _replay is not None
+
+def recorded_error(url: str) -> Optional[Dict[str, str]]:
+    """{type, message} of the error reading url's body raised in the replayed run, if any."""
+    if _replay is None:
+        return None
+    return _replay["responses"].get(url, {}).get("error")
+
+def replay_response(request: requests.PreparedRequest) -> requests.Response:
+    """Recorded response for request.url; ConnectionError when the run never fetched it."""
+    entry = _replay["responses"].get(request.url)
+    if entry is None:
+        raise requests.ConnectionError(f"{request.url} not recorded in run {_replay['run_id']}", request=request)
+    body = get_blob(entry["blob"], _root)
+    resp = requests.Response()
+    resp.status_code = entry["status"]
+    resp.headers = CaseInsensitiveDict(entry["headers"])    # bodies are stored decoded
+    resp.url = request.url
+    resp.request = request
+    resp.reason = "Replayed"
+    resp.raw = io.BytesIO(body)
+    resp._content = body
+    resp._content_consumed = True
+    resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+    return resp
@@ -0,0 +1,179 @@
+"""
+Feed URL resolution for whitelist entries that point at a homepage.
+When a "feed" turns out to be an HTML page, its <link rel="alternate">
+feeds, WordPress' /feed/ and a few common feed paths are tried once and
+the working feed URL is cached (data/cache/feed_resolution.json) with a
+TTL. Later runs fetch the resolved feed directly; pages where nothing was
+found are not fetched again until their (shorter) TTL expires. Saves are
+merged with other processes' (see src/net/statefile.py).
+"""
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import feedparser
+import requests
+from lxml import etree, html as lxml_html
+
+from src.net import fetch, rawstore, statefile
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path("data/cache/feed_resolution.json")
+FOUND_TTL = 30 * 24 * 3600.0        # re-check resolved feeds monthly
+NOT_FOUND_TTL = 7 * 24 * 3600.0     # feedless pages are retried weekly
+MAX_CANDIDATES = 6                  # feed fetches spent on one page
+FEED_TYPES = {"application/rss+xml", "application/atom+xml", "application/rdf+xml",
+              "application/feed+json", "application/xml", "text/xml"}
+COMMON_PATHS = ["feed/", "rss", "rss.xml", "feed.xml", "atom.xml", "index.xml", "?feed=rss2",
+                "feeds/posts/default"]
+
+class NoFeedError(ValueError):
+    """The page is not a feed and no feed could be discovered from it."""
+
+def looks_like_html(resp: requests.Response) -> bool:
+    ctype = resp.headers.get("Content-Type", "").lower()
+    if "html" in ctype:
+        return True
+    head = resp.content[:512].lstrip().lower()
+    return head.startswith(b"<!doctype html") or head.startswith(b"<html")
+
+def candidates(page_url: str, page: bytes) -> List[str]:
+    """Feed URLs worth trying for an HTML page, best first."""
+    found: List[str] = []
+    wordpress = False
+    try:
+        doc = lxml_html.document_fromstring(page)
+        for link in doc.xpath("//link[@rel and @href]"):
+            rel = link.get("rel", "").lower().split()
+            kind = link.get("type", "").lower().split(";")[0].strip()
+            href = link.get("href", "")
+            if "alternate" in rel and kind in FEED_TYPES and "comments" not in (href + link.get("title", "")).lower():
+                found.append(urljoin(page_url, href))
+        wordpress = bool(doc.xpath("//link[contains(@href, '/wp-content/') or contains(@href, '/wp-json')]"))
+    except (etree.ParserError, ValueError):
+        pass
+
+    parts = urlsplit(page_url)
+    root = f"{parts.scheme}://{parts.netloc}/"
+    base = page_url if page_url.endswith("/") else page_url.rsplit("/", 1)[0] + "/"
+    paths = ["feed/"] + COMMON_PATHS if wordpress else COMMON_PATHS
+    for path in paths:
+        found.append(urljoin(base, path))
+        found.append(urljoin(root, path))
+    return list(dict.fromkeys(u for u in found if u != page_url))
+
+def _is_feed(resp: requests.Response) -> Optional[Any]:
+    """Parsed feed when resp is a usable feed, else None."""
+    if not resp.ok or looks_like_html(resp):
+        return None
+    feed = feedparser.parse(resp.content)
+    if feed.version and (feed.entries or not feed.bozo):
+        return feed
+    return None
+
+class FeedResolver:
+    def __init__(self, path: Path = DEFAULT_PATH):
+        self.path = Path(path)
+        self._pages: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.RLock()
+
+    # ---------- persistence ----------
+    def _records(self) -> Dict[str, Dict[str, Any]]:
+        if self._pages is None:
+            self._pages = statefile.read(self.path, "pages")
+        return self._pages
+
+    def save(self):
+        """Merge with what other processes saved since (newest copy of each page wins) and write."""
+        with self._lock:
+            if self._pages is not None:
+                statefile.save(self.path, "pages", self._pages)
+
+    # ---------- lookups ----------
+    def _fresh(self, url: str) -> Optional[Dict[str, Any]]:
+        rec = self._records().get(url)
+        if rec is None or rec.get("forgotten"):
+            return None
+        if rawstore.replaying():
+            return rec          # the recorded run's resolutions stand, however old; nothing can be re-resolved
+        ttl = FOUND_TTL if rec["feed"] else NOT_FOUND_TTL
+        return rec if time.time() - rec["checked"] < ttl else None
+
+    def lookup(self, url: str) -> Optional[str]:
+        """Cached feed URL for a page, or None when unknown / expired / feedless."""
+        with self._lock:
+            rec = self._fresh(url)
+            return rec["feed"] if rec else None
+
+    def feedless(self, url: str) -> bool:
+        """True while the page is known (within NOT_FOUND_TTL) to have no discoverable feed."""
+        with self._lock:
+            rec = self._fresh(url)
+            return rec is not None and not rec["feed"]
+
+    def forget(self, url: str):
+        # kept as a stamped tombstone: a dropped record would come back from another process' copy on save
+        with self._lock:
+            self._records()[url] = statefile.stamp({"feed": None, "checked": 0.0, "forgotten": True})
+
+    def _store(self, url: str, feed_url: Optional[str]):
+        with self._lock:
+            self._records()[url] = statefile.stamp({"feed": feed_url, "checked": time.time()})
+
+    # ---------- discovery ----------
+    def discover(self, url: str, page: bytes, session: requests.Session, timeout,
+                 **kwargs) -> Tuple[Optional[str], Optional[requests.Response], Optional[Any]]:
+        """Try the page's feed candidates; caches and returns (feed_url, response, parsed feed)."""
+        for candidate in candidates(url, page)[:MAX_CANDIDATES]:
+            try:
+                resp = fetch.get(session, candidate, "feed", timeout, **kwargs)
+            except (requests.RequestException, ValueError) as e:
+                log.debug(f"Feed candidate {candidate} failed: {e}")
+                continue
+            feed = _is_feed(resp)
+            if feed is not None:
+                log.info(f"Resolved {url} → {resp.url}")
+                self._store(url, resp.url)
+                return resp.url, resp, feed
+        log.info(f"No feed found for {url}")
+        self._store(url, None)
+        return None, None, None
+
+    def resolve(self, session: requests.Session, url: str, timeout, **kwargs) -> requests.Response:
+        """GET the feed behind a whitelist URL, resolving homepages; the body is left unparsed.
+        Raises NoFeedError for pages known to have no feed, HTTP errors as requests does and
+        fetch.BodyTooLarge / fetch.UnexpectedContentType for unusable bodies."""
+        if self.feedless(url):
+            raise NoFeedError(f"{url} has no discoverable feed")
+        feed_url = self.lookup(url) or url
+        resp = fetch.get(session, feed_url, "feed", timeout, **kwargs)
+        if feed_url != url and (not resp.ok or looks_like_html(resp)):
+            log.info(f"Resolved feed {feed_url} for {url} stopped working; rediscovering")
+            self.forget(url)
+            feed_url = url
+            resp = fetch.get(session, url, "feed", timeout, **kwargs)
+        resp.raise_for_status()
+
+        if feed_url == url and looks_like_html(resp):
+            found, feed_resp, _ = self.discover(url, resp.content, session, timeout, **kwargs)
+            if found is None:
+                raise NoFeedError(f"{url} is an HTML page without a discoverable feed")
+            return feed_resp
+        return resp
+
+    def fetch(self, session: requests.Session, url: str, timeout, **kwargs) -> Tuple[requests.Response, Any]:
+        """resolve() and parse the feed with feedparser."""
+        resp = self.resolve(session, url, timeout, **kwargs)
+        return resp, feedparser.parse(resp.content, response_headers={"content-type": resp.headers.get("Content-Type", "")})
+
+STORE = FeedResolver()
+
+def configure(path: Path):
+    with STORE._lock:
+        if Path(path) != STORE.path:
+            STORE.path = Path(path)
+            STORE._pages = None
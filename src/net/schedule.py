@@ -0,0 +1,176 @@
+"""
+Adaptive polling schedule.
+Learns each feed's publishing interval from its entry timestamps and plans
+the next poll just after the next expected update. Feeds that are polled
+without producing anything new back off exponentially. Tier A feeds are
+always ordered first so a limited request budget goes to them.
+The polling daemon (scripts/poll_daemon.py) spools what it finds per ISO
+week; the weekly run merges the spool for its window. The daemon and the
+weekly run share data/cache/feed_schedule.json; saves are merged (see
+src/net/statefile.py).
+"""
+import json
+import logging
+import statistics
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.net import statefile
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path("data/cache/feed_schedule.json")
+ENTRY_SAMPLES = 50              # distinct entry timestamps kept per feed
+MIN_INTERVAL = 15 * 60.0
+MAX_INTERVAL = 35 * 24 * 3600.0     # monthly journals still get polled once a month
+GRACE = 0.1                     # poll this fraction of the interval after the expected update
+TIER_RANK = {"A": 0, "B": 1, "C": 2, "D": 3}
+
+def _new_record() -> Dict[str, Any]:
+    return {"entries": [], "interval": None, "last_poll": None, "newest": None, "misses": 0, "next_due": 0.0}
+
+class PollSchedule:
+    def __init__(self, path: Path = DEFAULT_PATH):
+        self.path = Path(path)
+        self._feeds: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.RLock()
+
+    # ---------- persistence ----------
+    def _records(self) -> Dict[str, Dict[str, Any]]:
+        if self._feeds is None:
+            self._feeds = statefile.read(self.path, "feeds")
+        return self._feeds
+
+    def save(self):
+        """Merge with what other processes saved since (newest copy of each feed wins) and write."""
+        with self._lock:
+            if self._feeds is not None:
+                statefile.save(self.path, "feeds", self._feeds)
+
+    def get(self, url: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._records().get(url) or _new_record())
+
+    # ---------- learning ----------
+    def observe(self, url: str, entry_times: Iterable[float], polled_at: Optional[float] = None):
+        """Record one successful poll and the publication times (epoch seconds) of the entries it returned."""
+        now = polled_at or time.time()
+        with self._lock:
+            rec = self._records().setdefault(url, _new_record())
+            newest_before = rec["newest"] or 0.0
+            stamps = sorted(set(rec["entries"]) | {round(t) for t in entry_times if t and t <= now + 3600})
+            rec["entries"] = stamps[-ENTRY_SAMPLES:]
+            rec["newest"] = stamps[-1] if stamps else None
+            rec["last_poll"] = now
+
+            gaps = [b - a for a, b in zip(rec["entries"], rec["entries"][1:]) if b > a]
+            if gaps:
+                rec["interval"] = min(MAX_INTERVAL, max(MIN_INTERVAL, statistics.median(gaps)))
+
+            rec["misses"] = 0 if (rec["newest"] or 0) > newest_before else rec["misses"] + 1
+            rec["next_due"] = self._plan(rec, now)
+            statefile.stamp(rec)
+
+    def _plan(self, rec: Dict[str, Any], now: float) -> float:
+        interval = rec["interval"] or MIN_INTERVAL * 4
+        expected = (rec["newest"] or now) + interval * (1 + GRACE)
+        backoff = now + min(MAX_INTERVAL, MIN_INTERVAL * 2 ** rec["misses"])
+        return min(now + MAX_INTERVAL, max(expected, backoff))
+
+    # ---------- planning ----------
+    def is_due(self, url: str, now: Optional[float] = None) -> bool:
+        with self._lock:
+            rec = self._records().get(url)
+            return rec is None or (now or time.time()) >= rec["next_due"]
+
+    def can_skip(self, url: str, start: float, now: Optional[float] = None) -> bool:
+        """True when a window starting at `start` cannot gain anything from polling url now:
+        it was polled inside the window, had nothing in it, and is not expected to publish yet."""
+        with self._lock:
+            rec = self._records().get(url)
+            if rec is None or not rec["last_poll"]:
+                return False
+            return (rec["last_poll"] >= start and (rec["newest"] or 0) < start
+                    and (now or time.time()) < rec["next_due"])
+
+    def order(self, feeds: List[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Feeds sorted by tier, then by how overdue they are relative to their interval."""
+        now = now or time.time()
+
+        def key(feed):
+            rec = self._records().get(feed["url"])
+            if rec is None:
+                overdue = float("inf")
+            else:
+                overdue = (now - rec["next_due"]) / (rec["interval"] or MIN_INTERVAL * 4)
+            return (TIER_RANK.get(str(feed.get("tier", "B")).upper(), 1), -overdue)
+
+        with self._lock:
+            return sorted(feeds, key=key)
+
+    def due(self, feeds: List[Dict[str, Any]], budget: Optional[int] = None,
+            now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Feeds whose next poll is due, highest priority first, at most `budget` of them."""
+        now = now or time.time()
+        due = [f for f in self.order(feeds, now) if self.is_due(f["url"], now)]
+        return due[:budget] if budget else due
+
+    def next_wakeup(self, feeds: List[Dict[str, Any]]) -> float:
+        """Epoch time at which the earliest of feeds becomes due."""
+        with self._lock:
+            return min((self._records().get(f["url"], {}).get("next_due", 0.0) for f in feeds), default=0.0)
+
+# ---------- spool ----------
+SPOOL_DIR = Path("data/cache/spool")
+
+def _epoch(value) -> float:
+    """datetime (naive = UTC) or ISO string -> epoch seconds."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def append_spool(rows: List[Dict[str, Any]], spool_dir: Path = SPOOL_DIR) -> int:
+    """Append articles found by the polling daemon to the spool of their ISO week; returns rows written."""
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    by_week: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        week = datetime.fromtimestamp(_epoch(row["date"]), timezone.utc).strftime("%G-W%V")
+        by_week.setdefault(week, []).append(row)
+    for week, week_rows in by_week.items():
+        with open(spool_dir / f"{week}.jsonl", "a", encoding="utf-8") as f:
+            for row in week_rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    return len(rows)
+
+def read_spool(start: datetime, end: datetime, spool_dir: Path = SPOOL_DIR) -> List[Dict[str, Any]]:
+    """Spooled articles dated inside [start, end], first copy of each link only."""
+    if not spool_dir.exists():
+        return []
+    lo, hi = _epoch(start), _epoch(end)
+    rows, seen = [], set()
+    for path in sorted(spool_dir.glob("*.jsonl")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                    if row.get("link") in seen or not lo <= _epoch(row["date"]) <= hi:
+                        continue
+                except (ValueError, KeyError) as e:
+                    log.debug(f"Bad spool line in {path}: {e}")
+                    continue
+                seen.add(row.get("link"))
+                rows.append(row)
+    return rows
+
+STORE = PollSchedule()
+
+def configure(path: Path):
+    with STORE._lock:
+        if Path(path) != STORE.path:
+            STORE.path = Path(path)
+            STORE._feeds = None
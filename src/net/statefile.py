@@ -0,0 +1,60 @@
+"""
+Shared JSON state files.
+The feed health, polling schedule, feed resolution, listing and WebSub
+stores are each written by more than one process: the weekly run, the
+polling and WebSub daemons, a hand-started run. save() takes a lock file,
+re-reads the file and keeps the most recently updated copy of each record
+(every change stamps its record with "updated"), so no writer drops
+another's changes. Records written before stamps existed count as oldest.
+"""
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+try:
+    import fcntl
+except ImportError:                      # Windows: saves are merged but not locked
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+Records = Dict[str, Dict[str, Any]]
+
+def read(path: Path, key: str) -> Records:
+    """The records saved under key in path; {} when it is missing or unreadable."""
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get(key, {})
+    except (OSError, ValueError) as e:
+        log.warning(f"Ignoring unreadable state file {path}: {e}")
+        return {}
+
+def stamp(rec: Dict[str, Any]) -> Dict[str, Any]:
+    """Mark a record as changed now; returns it."""
+    rec["updated"] = time.time()
+    return rec
+
+def merge(records: Records, saved: Records) -> bool:
+    """Take each saved record that is newer than ours into records; True when any was taken."""
+    taken = False
+    for name, rec in saved.items():
+        mine = records.get(name)
+        if mine is None or rec.get("updated", 0) > mine.get("updated", 0):
+            records[name] = rec
+            taken = True
+    return taken
+
+def save(path: Path, key: str, records: Records):
+    """Merge what other processes saved since into records (in place), then write them."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_suffix(".lock"), "w") as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        merge(records, read(path, key))
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"updated": time.time(), key: records}, indent=1), encoding="utf-8")
+        os.replace(tmp, path)
@@ -0,0 +1,182 @@
+"""
+WebSub (PubSubHubbub) subscriptions.
+Feeds that advertise a hub (<link rel="hub"> in the feed or an HTTP Link
+header) are noted while they are polled. scripts/websub_daemon.py then
+subscribes to them, answers the hubs' verification requests, renews leases
+before they run out and spools pushed entries for the weekly run. While a
+subscription is active the collectors stop polling that feed.
+State lives in data/cache/websub.json. The weekly run (noting hubs) and
+the daemon (subscription lifecycle) both write it; saves are merged
+(see src/net/statefile.py), so neither overwrites the other's changes.
+"""
+import hashlib
+import hmac
+import logging
+import secrets
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from src.net import statefile
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path("data/cache/websub.json")
+LEASE_SECONDS = 10 * 24 * 3600          # requested lease; hubs may grant less
+RENEW_MARGIN = 24 * 3600.0              # renew this long before the lease ends
+PENDING_TIMEOUT = 3600.0                # re-request when a hub never verified
+RETRY_AFTER = 24 * 3600.0               # after a hub refused or failed
+
+def callback_id(source: str) -> str:
+    """Path component identifying a subscription in callback URLs."""
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+
+def discover(links: List[Dict[str, str]], resp: Optional[requests.Response] = None) -> Optional[Dict[str, str]]:
+    """{"hub", "topic"} advertised by a feed's <link>s (or its response's Link header), else None."""
+    hub = topic = None
+    for link in links:
+        if link.get("rel") == "hub" and not hub:
+            hub = link.get("href")
+        elif link.get("rel") == "self" and not topic:
+            topic = link.get("href")
+    if resp is not None:
+        hub = hub or resp.links.get("hub", {}).get("url")
+        topic = topic or resp.links.get("self", {}).get("url") or resp.url
+    return {"hub": hub, "topic": topic} if hub and topic else None
+
+def valid_signature(secret: str, body: bytes, header: Optional[str]) -> bool:
+    """Check X-Hub-Signature ("sha1=…" / "sha256=…") against the subscription secret."""
+    if not header or "=" not in header:
+        return False
+    method, _, digest = header.partition("=")
+    if method not in ("sha1", "sha256", "sha384", "sha512"):
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, method).hexdigest()
+    return hmac.compare_digest(expected, digest.strip())
+
+class SubscriptionStore:
+    def __init__(self, path: Path = DEFAULT_PATH):
+        self.path = Path(path)
+        self._subs: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.RLock()
+
+    # ---------- persistence ----------
+    def _records(self) -> Dict[str, Dict[str, Any]]:
+        if self._subs is None:
+            self._subs = statefile.read(self.path, "subscriptions")
+        return self._subs
+
+    def reload(self):
+        """Pick up what other processes saved since this store was loaded."""
+        with self._lock:
+            if self._subs is not None:
+                statefile.merge(self._subs, statefile.read(self.path, "subscriptions"))
+
+    def save(self):
+        """Merge with what other processes saved since (newest copy of each subscription wins) and write."""
+        with self._lock:
+            if self._subs is not None:
+                statefile.save(self.path, "subscriptions", self._subs)
+
+    def get(self, source: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            rec = self._records().get(source)
+            return dict(rec) if rec else None
+
+    def by_callback(self, cid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            for source, rec in self._records().items():
+                if rec["id"] == cid:
+                    return dict(rec, source=source)
+            return None
+
+    # ---------- discovery ----------
+    def note(self, source: str, feed_info: Dict[str, Any], links: List[Dict[str, str]],
+             resp: Optional[requests.Response] = None):
+        """Remember the hub a polled feed advertises (no-op when it has none or nothing changed)."""
+        found = discover(links, resp)
+        if not found:
+            return
+        with self._lock:
+            rec = self._records().get(source)
+            if rec and (rec["hub"], rec["topic"]) == (found["hub"], found["topic"]):
+                return
+            self._records()[source] = {
+                "id": callback_id(source), "hub": found["hub"], "topic": found["topic"],
+                "tier": feed_info.get("tier", "B"), "lang": feed_info.get("lang", "en"),
+                "secret": secrets.token_hex(20), "state": "new", "requested": None,
+                "lease_expires": None, "last_push": None, "error": None, "updated": time.time(),
+            }
+            log.info(f"WebSub hub for {source}: {found['hub']}")
+
+    def active(self, source: str) -> bool:
+        """True while a verified lease covers the feed (it need not be polled), renewals included."""
+        with self._lock:
+            rec = self._records().get(source)
+            return bool(rec and rec["state"] in ("active", "pending") and (rec["lease_expires"] or 0) > time.time())
+
+    # ---------- lifecycle ----------
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Sources that need a (re)subscription request now."""
+        now = now or time.time()
+        due = []
+        with self._lock:
+            for source, rec in self._records().items():
+                state, requested = rec["state"], rec["requested"] or 0
+                if state == "new" \
+                        or (state == "active" and (rec["lease_expires"] or 0) - now < RENEW_MARGIN) \
+                        or (state == "pending" and now - requested > PENDING_TIMEOUT) \
+                        or (state == "failed" and now - requested > RETRY_AFTER):
+                    due.append(source)
+        return due
+
+    def _update(self, source: str, **fields):
+        with self._lock:
+            rec = self._records().get(source)
+            if rec is not None:
+                rec.update(fields, updated=time.time())
+
+    def requested(self, source: str):
+        self._update(source, state="pending", requested=time.time(), error=None)
+
+    def verified(self, source: str, lease_seconds: Optional[int]):
+        self._update(source, state="active", lease_expires=time.time() + (lease_seconds or LEASE_SECONDS))
+
+    def failed(self, source: str, error: str):
+        self._update(source, state="failed", error=error[:200])
+
+    def pushed(self, source: str):
+        self._update(source, last_push=time.time())
+
+def subscribe(session: requests.Session, source: str, callback_base: str, store: "SubscriptionStore" = None,
+              lease_seconds: int = LEASE_SECONDS, timeout: float = 15.0) -> bool:
+    """Send a subscription request to the source's hub; verification arrives on the callback."""
+    store = store or STORE
+    rec = store.get(source)
+    store.requested(source)         # before the POST: some hubs verify before answering it
+    try:
+        resp = session.post(rec["hub"], data={
+            "hub.mode": "subscribe",
+            "hub.topic": rec["topic"],
+            "hub.callback": f"{callback_base.rstrip('/')}/{rec['id']}",
+            "hub.secret": rec["secret"],
+            "hub.lease_seconds": str(lease_seconds),
+        }, timeout=timeout)
+    except requests.RequestException as e:
+        store.failed(source, str(e))
+        return False
+    if resp.status_code not in (202, 204):
+        store.failed(source, f"hub answered HTTP {resp.status_code}")
+        return False
+    return True
+
+STORE = SubscriptionStore()
+
+def configure(path: Path):
+    with STORE._lock:
+        if Path(path) != STORE.path:
+            STORE.path = Path(path)
+            STORE._subs = None
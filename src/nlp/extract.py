@@ -0,0 +1,199 @@
+"""
+Full-article body extraction.
+Downloads the linked page of every relevant article, strips boilerplate
+with lxml (scripts, navigation, link-heavy blocks) and keeps the main text
+as `body` / `body_en`. Bodies are cached zlib-compressed under a SHA-1 of
+the URL, so re-runs never fetch the same page twice.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from lxml import etree, html as lxml_html
+
+from src import deadline, metrics, registry
+from src.config import CollectionSettings
+from src.net import fetch, ratelimit, rawstore
+from src.nlp.classifier import KEYWORDS
+from src.nlp.geotag import AFRICA
+
+log = logging.getLogger(__name__)
+
+CACHE_DIR = Path("data/cache/bodies")
+MAX_TEXT_CHARS = 20000
+FAILURE_TTL = 24 * 3600                 # failed fetches are retried after a day
+TRANSLATE_BATCH = 8               # bodies per translation call; the deadline is checked between calls
+MIN_PARAGRAPH_CHARS = 40
+MAX_LINK_DENSITY = 0.5            # paragraphs that are mostly links are navigation
+BOILERPLATE_TAGS = ["script", "style", "noscript", "nav", "header", "footer", "aside",
+                    "form", "iframe", "svg", "button", "figure"]
+BOILERPLATE_HINTS = re.compile(r"comment|share|social|related|promo|advert|cookie|subscribe|newsletter|sidebar|menu|breadcrumb", re.I)
+
+def _terms(words, stems: bool) -> re.Pattern:
+    """Whole-word matcher for words (multi-word ones as the same word sequence); stems may
+    run on ("traffick" -> "trafficking") but never start mid-word ("port" in "report")."""
+    alternatives = "|".join(r"\s+".join(map(re.escape, w.lower().split()))
+                            for w in sorted(words, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternatives})" + ("" if stems else r"\b"))
+
+COUNTRY_RE = _terms(AFRICA, stems=False)
+KEYWORD_RE = _terms(set().union(*KEYWORDS.values()), stems=True)
+
+http = ratelimit.session()
+http.headers["User-Agent"] = "Mozilla/5.0 (compatible; ACW-Collector/1.0; +https://github.com/Kithua/african-crime-weekly)"
+
+# ---------- relevance ----------
+def is_relevant(article: Dict[str, Any]) -> bool:
+    """Worth a page fetch: mentions an African country or a crime keyword."""
+    text = (str(article.get("title", "")) + " " + str(article.get("summary", ""))).lower()
+    return bool(COUNTRY_RE.search(text) or KEYWORD_RE.search(text))
+
+# ---------- extraction ----------
+def _text(el) -> str:
+    return " ".join(el.text_content().split())
+
+def _link_density(el) -> float:
+    total = len(_text(el)) or 1
+    return sum(len(_text(a)) for a in el.iter("a")) / total
+
+def extract_text(page: bytes) -> str:
+    """Main text of an HTML page; paragraphs of the best-scoring container, joined by blank lines."""
+    try:
+        doc = lxml_html.document_fromstring(page)
+    except (etree.ParserError, ValueError):
+        return ""
+    etree.strip_elements(doc, *BOILERPLATE_TAGS, with_tail=False)
+    for el in doc.xpath("//*[@class or @id]"):
+        hint = f"{el.get('class', '')} {el.get('id', '')}"
+        if el.getparent() is not None and el.tag not in ("html", "body", "article", "main") \
+                and BOILERPLATE_HINTS.search(hint):
+            el.drop_tree()
+
+    # score each paragraph's parent by the text it contributes (readability-style)
+    scores: Dict[Any, float] = {}
+    for p in doc.iter("p"):
+        text = _text(p)
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        parent = p.getparent()
+        if parent is None:
+            continue
+        scores[parent] = scores.get(parent, 0.0) + len(text) + 10 * text.count(",")
+        grand = parent.getparent()
+        if grand is not None:
+            scores[grand] = scores.get(grand, 0.0) + len(text) / 2
+
+    root = max(scores, key=lambda el: scores[el] * (1 - _link_density(el))) if scores else doc
+    paragraphs = [_text(p) for p in root.iter("p") if _link_density(p) < MAX_LINK_DENSITY]
+    body = "\n\n".join(p for p in paragraphs if len(p) >= MIN_PARAGRAPH_CHARS)
+    return body[:MAX_TEXT_CHARS]
+
+# ---------- cache ----------
+def _cache_path(url: str, cache_dir: Path) -> Path:
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return cache_dir / digest[:2] / f"{digest}.json.z"
+
+def cache_get(url: str, cache_dir: Path = CACHE_DIR) -> Optional[Dict[str, Any]]:
+    path = _cache_path(url, cache_dir)
+    try:
+        record = json.loads(zlib.decompress(path.read_bytes()))
+    except (OSError, ValueError, zlib.error):
+        return None
+    if not record.get("text") and time.time() - record.get("fetched_at", 0) > FAILURE_TTL:
+        return None
+    return record
+
+def cache_put(url: str, record: Dict[str, Any], cache_dir: Path = CACHE_DIR):
+    path = _cache_path(url, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # a private temp file per writer: two workers caching the same URL must not share one
+    with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as tmp:
+        tmp.write(zlib.compress(json.dumps(record, ensure_ascii=False).encode("utf-8"), 6))
+    os.replace(tmp.name, path)
+
+# ---------- fetching ----------
+def download(url: str, settings: CollectionSettings) -> bytes:
+    """GET an HTML page, reading at most settings.max_body_bytes of the body."""
+    resp = fetch.get(http, url, "html", deadline.clip(settings.http_timeout), max_bytes=settings.max_body_bytes)
+    resp.raise_for_status()
+    return resp.content
+
+def fetch_body(url: str, settings: CollectionSettings, cache_dir: Path = CACHE_DIR) -> Dict[str, Any]:
+    """Cached {url, text, fetched_at, error} for one article page."""
+    cached = cache_get(url, cache_dir)
+    if cached is not None:
+        metrics.count("bodies.cache_hits")
+        rawstore.snapshot(_cache_path(url, cache_dir))     # a replay has no network to refetch it from
+        return cached
+    record = {"url": url, "text": "", "fetched_at": time.time(), "error": None}
+    try:
+        record["text"] = extract_text(download(url, settings))
+        metrics.count("bodies.fetched")
+    except Exception as e:
+        record["error"] = str(e)[:200]
+        metrics.count("bodies.failed")
+        log.debug(f"Body fetch failed for {url}: {e}")
+    cache_put(url, record, cache_dir)
+    return record
+
+def translate_group(articles: List[Dict[str, Any]], lang: str, translate) -> int:
+    """Set body_en on articles in one language, a batch per call, until the deadline; returns how many."""
+    done = 0
+    for i in range(0, len(articles), TRANSLATE_BATCH):
+        batch = articles[i:i + TRANSLATE_BATCH]
+        if deadline.expired():
+            deadline.skip("translate", [a["link"] for a in articles[i:]])
+            break
+        try:
+            translated = translate([a["body"] for a in batch], lang)
+        except Exception as e:
+            log.debug(f"Translation failed for {len(batch)} {lang} bodies: {e}")
+            continue
+        for article, text in zip(batch, translated):
+            article["body_en"] = text
+        done += len(batch)
+    metrics.count("bodies.translated", done)
+    return done
+
+def fetch_bodies(articles: List[Dict[str, Any]], settings: Optional[CollectionSettings] = None,
+                 cache_dir: Path = CACHE_DIR) -> int:
+    """Fill body / body_en for relevant articles in place; returns how many got a body."""
+    settings = settings or CollectionSettings()
+    todo = [a for a in articles if a.get("link") and not a.get("body") and is_relevant(a)]
+    log.info(f"Fetching article bodies: {len(todo)}/{len(articles)} relevant")
+    needs_translation = any(a.get("lang", "en") not in ("en", "auto") for a in todo)
+    translate = registry.resolve("nlp.translate") if needs_translation else None
+
+    def work(item):
+        # one bad page (unparseable markup, a full disk) must not cost the others their bodies
+        try:
+            record = fetch_body(item["url"], settings, cache_dir)
+        except Exception as e:
+            metrics.count("bodies.failed")
+            log.warning(f"Body extraction failed for {item['url']}: {e}")
+            return []
+        return [(item["index"], record["text"])] if record["text"] else []
+
+    queue = [{"url": a["link"], "tier": a.get("tier", "B"), "index": i} for i, a in enumerate(todo)]
+    filled = 0
+    foreign: Dict[str, List[Dict[str, Any]]] = {}
+    for index, text in deadline.run_queue(queue, work, settings.concurrency, "bodies"):
+        article = todo[index]
+        article["body"] = text
+        if article.get("lang", "en") in ("en", "auto"):
+            article["body_en"] = text
+        elif translate:
+            foreign.setdefault(article["lang"], []).append(article)
+        filled += 1
+    for lang, group in foreign.items():
+        translate_group(group, lang, translate)
+    log.info(f"Article bodies: {filled} extracted")
+    log.info(f"Article bodies: {filled} extracted")
+    return filled
@@ -1,5 +1,15 @@
-import spacy, re
-nlp = spacy.load("xx_ent_wiki_sm")
+import re
+
+_nlp = None
+
+def model():
+    """spaCy NER model, loaded on first use so importing this module stays cheap."""
+    global _nlp
+    if _nlp is None:
+        import spacy
+        _nlp = spacy.load("xx_ent_wiki_sm")
+    return _nlp
+
 AFRICA = {"Algeria","Angola","Benin","Botswana","Burkina Faso","Burundi","Cameroon","Cape Verde",
           "Central African Republic","Chad","Comoros","Congo","Democratic Republic of the Congo",
           "Djibouti","Egypt","Equatorial Guinea","Eritrea","Eswatini","Ethiopia","Gabon","Gambia",
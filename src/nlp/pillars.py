@@ -0,0 +1,41 @@
+"""
+Keyword scoring into the four pillars, shared by the collectors.
+score() picks the pillar with the most distinct keywords in an article's
+title and summary (cyber when none occur); INTEL_MAP is the analyst
+sentence attached to rows of each pillar. Keywords match case-insensitively
+at the start of a word and may run on ("traffick" -> "trafficking");
+multi-word keywords match across any whitespace.
+"""
+import re
+from typing import Dict, Set, Tuple
+
+KEYWORDS = {
+    "terrorism": {"terror", "Jama at Nusrat al-Islam wal Muslimeen", "JNIM", "Islamic State in West Africa", "ISIS-WA", "Islamic State in the Greater Sahara", "ISGS", "Rapid Support Forces", "RSF", "ADF", "M23", "al-shabaab", "boko haram",
+                  "isis", "jihad", "attack", "bomb", "suicide", "extremist", "militant", "insurgent"},
+    "organised": {"drug", "cocaine", "heroin", "traffick", "smuggl", "mafia", "cartel", "mine illegal", "arms", "weapon", "border", "port", "customs", "kidnap", "ransom", "organized crime"},
+    "financial": {"money launder", "bitcoin", "usdt", "fraud", "scam", "ponzi", "pyramid", "ofac", "sanction", "nft", "evasion", "forex", "investment scam", "dnfbp"},
+    "cyber": {"ransomware", "phish", "malware", "hack", "breach", "ddos", "botnet", "zero-day", "exploit", "darkweb", "onion", "trojan", "worm", "c&c", "pig butchering", "romance scam"}
+}
+
+INTEL_MAP = {
+    "terrorism": "Regional conflict reporting; follow for local sentiment.",
+    "organised": "Mentions ports / borders; potential smuggling angle.",
+    "financial": "Banking / crypto references; fraud or laundering lead.",
+    "cyber": "No cyber keywords – default bucket."
+}
+
+def _matcher(keywords: Dict[str, Set[str]]) -> Tuple[re.Pattern, Dict[str, str]]:
+    """One regex for every keyword (longest first) and the pillar of each normalised keyword."""
+    pillar_of = {" ".join(kw.lower().split()): p for p, kws in keywords.items() for kw in kws}
+    alternatives = "|".join(r"\s+".join(map(re.escape, kw.split()))
+                            for kw in sorted(pillar_of, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternatives})"), pillar_of
+
+_DEFAULT = _matcher(KEYWORDS)
+
+def score(text: str, keywords: Dict[str, Set[str]] = KEYWORDS) -> str:
+    pattern, pillar_of = _DEFAULT if keywords is KEYWORDS else _matcher(keywords)
+    scores = dict.fromkeys(keywords, 0)
+    for kw in set(pattern.findall(text.lower())):
+        scores[pillar_of.get(kw) or pillar_of[" ".join(kw.split())]] += 1
+    return max(scores, key=scores.get) if max(scores.values()) else "cyber"
@@ -1,14 +1,21 @@
 """
 Helsinki-NLP offline translation (xx → en).
-Caches models in /app/cache/translate.
+Caches models in /app/cache/translate; each language's model is loaded
+once per process and texts are translated in batches.
 """
-import os, pathlib as pl, iso639
+import functools
+import pathlib as pl
+from typing import List
+
+import iso639
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 import torch
 
 CACHE = pl.Path("/app/cache/translate")
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+BATCH_SIZE = 8
 
+@functools.lru_cache(maxsize=None)
 def load_model(src_lang: str):
     code = iso639.to_iso639_1(src_lang)
     model_name = f"Helsinki-NLP/opus-mt-{code}-en"
@@ -16,8 +23,17 @@ def load_model(src_lang: str):
     mdl = AutoModelForSeq2SeqLM.from_pretrained(model_name, cache_dir=CACHE).to(DEVICE)
     return tok, mdl
 
-def translate(text: str, src_lang: str) -> str:
+def translate_batch(texts: List[str], src_lang: str) -> List[str]:
+    """English translations of texts, all in src_lang, BATCH_SIZE per generate() call."""
     tok, mdl = load_model(src_lang)
-    batch = tok(text, return_tensors="pt", truncation=True, max_length=512).to(DEVICE)
-    out = mdl.generate(**batch, max_length=512, num_beams=5)
-    return tok.decode(out[0], skip_special_tokens=True)
+    out: List[str] = []
+    for i in range(0, len(texts), BATCH_SIZE):
+        batch = tok(texts[i:i + BATCH_SIZE], return_tensors="pt", padding=True,
+                    truncation=True, max_length=512).to(DEVICE)
+        with torch.no_grad():
+            generated = mdl.generate(**batch, max_length=512, num_beams=5)
+        out.extend(tok.batch_decode(generated, skip_special_tokens=True))
+    return out
+
+def translate(text: str, src_lang: str) -> str:
+    return translate_batch([text], src_lang)[0]
@@ -0,0 +1,107 @@
+"""
+Feed parsing off the fetching threads.
+feedparser is pure Python, so with concurrent fetching the GIL makes
+parsing the bottleneck. Fetch threads hand the raw response bytes (no
+resp.text decode) to a process pool; workers parse, apply the [start, end]
+window and return only in-window entries as small tuples, so out-of-window
+entries never cross the process boundary. With one worker (or one CPU)
+feeds are parsed inline on the calling thread instead. window() is the
+one definition of a collection window every collector compares with.
+"""
+import atexit
+import calendar
+import datetime as dt
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import feedparser
+
+log = logging.getLogger(__name__)
+
+class Entry(NamedTuple):
+    title: str
+    summary: str
+    link: str
+    published: float                    # epoch seconds, UTC
+
+class ParsedFeed(NamedTuple):
+    bozo: Optional[str]                 # parse error, None when the document is well-formed
+    total: int                          # entries in the document
+    stamps: List[float]                 # publish times of all entries (for the poll schedule)
+    links: List[Dict[str, str]]         # feed-level <link>s (rel=hub/self for WebSub)
+    entries: List[Entry]                # in-window entries, document order, at most `limit`
+
+_pool: Optional[ProcessPoolExecutor] = None
+_workers = 1
+_lock = threading.Lock()
+
+def window(start: dt.datetime, end: dt.datetime) -> Tuple[dt.datetime, dt.datetime]:
+    """Aware, inclusive [start, end]: naive bounds are UTC and a bare end date
+    (midnight, as --end gives) covers that whole day."""
+    start = start if start.tzinfo else start.replace(tzinfo=dt.timezone.utc)
+    end = end if end.tzinfo else end.replace(tzinfo=dt.timezone.utc)
+    if end.timetz().replace(tzinfo=None) == dt.time(0):
+        end += dt.timedelta(days=1) - dt.timedelta(microseconds=1)
+    return start, end
+
+def parse_bytes(body: bytes, content_type: Optional[str], start: float, end: float, limit: int) -> ParsedFeed:
+    """Parse a feed document and keep the entries published within [start, end] (epoch seconds)."""
+    feed = feedparser.parse(body, response_headers={"content-type": content_type} if content_type else None)
+    stamps, entries = [], []
+    for entry in feed.entries:
+        parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+        if not parsed:
+            continue
+        published = float(calendar.timegm(parsed))
+        stamps.append(published)
+        if len(entries) < limit and start <= published <= end and entry.get("link"):
+            entries.append(Entry(entry.get("title", ""), entry.get("summary", ""), entry["link"], published))
+    links = [{"rel": l.get("rel", ""), "href": l.get("href", "")} for l in feed.get("feed", {}).get("links", [])]
+    bozo = str(feed.bozo_exception) if feed.bozo else None
+    return ParsedFeed(bozo, len(feed.entries), stamps, links, entries)
+
+def configure(settings):
+    """Size the pool from CollectionSettings.parse_workers (0 = one per CPU, 1 = inline)."""
+    global _workers
+    shutdown()
+    _workers = settings.parse_workers or os.cpu_count() or 1
+
+def _executor() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if _workers <= 1:
+        return None
+    with _lock:
+        if _pool is None:
+            # spawn, not fork: the parent is full of fetch threads holding locks
+            _pool = ProcessPoolExecutor(max_workers=_workers, mp_context=multiprocessing.get_context("spawn"))
+            log.info(f"Feed parse pool: {_workers} processes")
+        return _pool
+
+def parse(body: bytes, content_type: Optional[str], start: dt.datetime, end: dt.datetime, limit: int) -> ParsedFeed:
+    """Parse on the pool (blocking the calling fetch thread only) or inline."""
+    start, end = window(start, end)
+    args = (body, content_type, start.timestamp(), end.timestamp(), limit)
+    pool = _executor()
+    if pool is None:
+        return parse_bytes(*args)
+    try:
+        return pool.submit(parse_bytes, *args).result()
+    except BrokenProcessPool:
+        # a worker died (OOM on a huge document …): start a fresh pool next time, parse this one here
+        log.warning("Feed parse pool broke; parsing inline")
+        shutdown()
+        return parse_bytes(*args)
+
+def shutdown():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+atexit.register(shutdown)
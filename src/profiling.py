@@ -0,0 +1,135 @@
+"""
+Opt-in profiling for main.py (--profile / --profile-memory).
+Each pipeline phase gets its own cProfile run (<phase>.pstats) and/or a
+tracemalloc before/after diff (<phase>.memory.txt) under the cache dir.
+cProfile only sees the thread that enabled it, so work handed to thread
+pools is wrapped with in_thread(): each worker thread profiles itself and
+its stats are merged into the phase's. Feed parsing in parsepool's worker
+processes is not profiled (parse_workers: 1 parses inline, where it is).
+"""
+import cProfile
+import io
+import logging
+import pstats
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+_cpu = False
+_memory = False
+_out_dir: Optional[Path] = None
+_active: Optional[str] = None             # name of the phase being profiled
+_profiles: Dict[str, cProfile.Profile] = {}
+_thread_profiles: Dict[str, List[cProfile.Profile]] = {}
+_thread_local = threading.local()
+_lock = threading.Lock()
+_memory_reports: Dict[str, Dict[str, int]] = {}
+
+TOP_ALLOCATIONS = 25
+
+def enable(cache_dir: Path, cpu: bool = True, memory: bool = False) -> Path:
+    """Turn profiling on; returns the per-run output directory."""
+    global _cpu, _memory, _out_dir
+    _cpu, _memory = cpu, memory
+    _out_dir = Path(cache_dir) / "profile" / datetime.now().strftime("%Y%m%d-%H%M%S")
+    _out_dir.mkdir(parents=True, exist_ok=True)
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start(25)
+    return _out_dir
+
+def _filename(name: str) -> str:
+    return name.replace("/", "_").replace(" ", "_")
+
+@contextmanager
+def phase(name: str):
+    """Profile one phase. Nested phases are folded into the outer one."""
+    global _active
+    if not (_cpu or _memory) or _active:
+        yield
+        return
+
+    _active = name
+    prof = _profiles.setdefault(name, cProfile.Profile()) if _cpu else None
+    before = None
+    if _memory:
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+    if prof:
+        prof.enable()
+    try:
+        yield
+    finally:
+        if prof:
+            prof.disable()
+        if _memory:
+            _write_memory_report(name, before)
+        _active = None
+
+def in_thread(fn: Callable) -> Callable:
+    """Wrap a callable run on pool threads so its CPU time counts towards the active phase."""
+    name = _active if _cpu else None
+    if name is None:
+        return fn
+
+    def profiled(*args, **kwargs):
+        profiles = _thread_local.__dict__.setdefault("profiles", {})
+        prof = profiles.get(name)
+        if prof is None:
+            prof = profiles[name] = cProfile.Profile()
+            with _lock:
+                _thread_profiles.setdefault(name, []).append(prof)
+        prof.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            prof.disable()
+    return profiled
+
+def _write_memory_report(name: str, before: tracemalloc.Snapshot):
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    stats = after.compare_to(before, "lineno")
+    report = _memory_reports.setdefault(name, {"peak": 0, "current": 0})
+    report["peak"] = max(report["peak"], peak)
+    report["current"] = current
+
+    lines = [f"phase: {name}", f"peak: {peak / 1e6:.1f} MB", f"current: {current / 1e6:.1f} MB", ""]
+    lines += [str(stat) for stat in stats[:TOP_ALLOCATIONS]]
+    with open(_out_dir / f"{_filename(name)}.memory.txt", "a", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n\n")
+
+def finish(top: int = 20) -> Optional[str]:
+    """Dump .pstats files and return a ranked hot-function summary."""
+    if not (_cpu or _memory):
+        return None
+
+    out = io.StringIO()
+    out.write(f"Profile written to {_out_dir}\n")
+    if _profiles:
+        combined = None
+        for name, prof in _profiles.items():
+            stats = pstats.Stats(prof)
+            for worker in _thread_profiles.get(name, []):
+                stats.add(worker)
+            stats.dump_stats(str(_out_dir / f"{_filename(name)}.pstats"))
+            threads = len(_thread_profiles.get(name, []))
+            out.write(f"  {name:<24s} {stats.total_tt:8.2f}s" + (f"  (+{threads} worker threads)" if threads else "") + "\n")
+            if combined is None:
+                combined = pstats.Stats(prof, stream=out)
+            else:
+                combined.add(prof)
+            for worker in _thread_profiles.get(name, []):
+                combined.add(worker)
+        combined.dump_stats(str(_out_dir / "all.pstats"))
+        out.write(f"\nTop {top} functions by own time (all phases):\n")
+        combined.sort_stats(pstats.SortKey.TIME).print_stats(top)
+    if _memory_reports:
+        out.write("Peak traced memory per phase:\n")
+        for name, report in sorted(_memory_reports.items(), key=lambda kv: -kv[1]["peak"]):
+            out.write(f"  {name:<24s} {report['peak'] / 1e6:8.1f} MB\n")
+    return out.getvalue()
@@ -0,0 +1,83 @@
+"""
+Lazily resolved pipeline components.
+Collectors and NLP stages are named here instead of being imported at the
+top of main.py, so a run only pays for (and only fails on) what it uses.
+A component whose dependency, environment or import is missing resolves
+to None and is reported once as disabled.
+"""
+import importlib
+import importlib.util
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class Component:
+    target: str                          # "package.module" or "package.module:attribute"
+    requires: Tuple[str, ...] = ()       # third-party modules, checked without importing them
+    env: Tuple[str, ...] = ()            # environment variables that must be set
+
+COMPONENTS: Dict[str, Component] = {
+    "collector.rss": Component("src.collectors.rss:collect", requires=("feedparser", "lxml")),
+    "collector.telegram": Component(
+        "src.collectors.telegram:collect", requires=("telethon",),
+        env=("TELEGRAM_API_ID", "TELEGRAM_API_HASH", "TELEGRAM_SESSION_STRING"),
+    ),
+    "collector.multilingual": Component("src.collectors.multilingual:collect", requires=("feedparser", "lxml")),
+    "collector.social_media": Component("src.collectors.social_media:collect_all"),
+    "collector.darkweb": Component("src.collectors.darkweb:collect_all"),
+    "collector.gov_reports": Component("src.collectors.gov_reports:collect_all"),
+    "collector.scrape": Component("src.collectors.scrape:collect", requires=("feedparser", "lxml")),
+    "collector.sitemap": Component("src.collectors.sitemap:collect", requires=("feedparser", "lxml")),
+    "nlp.dedup": Component("src.nlp.dedup:remove_duplicates"),
+    "nlp.bodies": Component("src.nlp.extract:fetch_bodies", requires=("lxml",)),
+    "nlp.classify": Component("src.nlp.classifier:predict"),
+    "nlp.confidence": Component("src.nlp.classifier:confidence"),
+    "nlp.geotag": Component("src.nlp.geotag:extract", requires=("spacy",)),
+    "nlp.translate": Component("src.nlp.translate:translate_batch", requires=("torch", "transformers", "iso639")),
+    "report.intel_style": Component("src.analyst.weekly_fusion_intel_style", requires=("jinja2",)),
+    "render.pdf": Component("src.render.pdf", requires=("weasyprint",)),
+}
+
+_resolved: Dict[str, Any] = {}
+_disabled: Dict[str, str] = {}
+
+def _missing(component: Component) -> Optional[str]:
+    for var in component.env:
+        if not os.getenv(var):
+            return f"{var} not set"
+    for module in component.requires:
+        if importlib.util.find_spec(module) is None:
+            return f"{module} not installed"
+    return None
+
+def resolve(name: str) -> Optional[Any]:
+    """Import and return the component, or None (logged once) when it cannot be used."""
+    if name in _resolved:
+        return _resolved[name]
+    if name in _disabled:
+        return None
+
+    component = COMPONENTS[name]
+    reason = _missing(component)
+    if reason is None:
+        module_name, _, attr = component.target.partition(":")
+        try:
+            obj = importlib.import_module(module_name)
+            _resolved[name] = getattr(obj, attr) if attr else obj
+            return _resolved[name]
+        except Exception as e:
+            reason = f"{type(e).__name__}: {e}"
+    _disabled[name] = reason
+    log.warning(f"Component {name} disabled ({reason})")
+    return None
+
+def available(name: str) -> bool:
+    return resolve(name) is not None
+
+def disabled() -> Dict[str, str]:
+    """Components that failed to resolve so far, with the reason."""
+    return dict(_disabled)
@@ -1,41 +1,132 @@
 import os, smtplib, ssl, zipfile, tempfile
 from email.message import EmailMessage
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
 GMAIL_USER = os.getenv("GMAIL_USER")
 GMAIL_PASS = os.getenv("GMAIL_APP_PASSWORD")
 RECIPIENT  = os.getenv("EMAIL_TO")
 
-def send(pdf_paths: list[Path]):
-    """Send all 4 PDFs in ONE e-mail, zipped."""
-    msg = EmailMessage()
-    week = pdf_paths[0].stem.split("-")[0]   # 2025-W21
-    msg["Subject"] = f"African Crime Weekly – {week}"
-    msg["From"]    = f"Africa Intelligence <{GMAIL_USER}>"
-    msg["To"]      = RECIPIENT
-    msg.set_content(
-        "Please find the African Crime Weekly intelligence briefs "
-        f"for week {week} attached (zipped).\n\n"
-        "Reports: Terrorism & Violent Extremism, Organised Crime, "
-        "Financial Crime, Cyber Crime.\n\n"
-        "This is an automated product – contents do not reflect "
-        "the opinion of the author(s).\n\n"
-        "African Union – African Crime Weekly (ACW)"
-    )
-
-    # create in-memory zip
-    with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as tmp:
-        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zf:
-            for p in pdf_paths:
-                zf.write(p, p.name)
-        tmp.flush()
-        zip_data = Path(tmp.name).read_bytes()
+# SMTP endpoint – override to point at a local stand-in (SMTP_SECURITY=none)
+SMTP_HOST     = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT     = int(os.getenv("SMTP_PORT", "465"))
+SMTP_SECURITY = os.getenv("SMTP_SECURITY", "ssl")          # ssl | starttls | none
+
+MAX_ATTACHMENT_BYTES = int(os.getenv("ACW_MAX_ATTACHMENT_MB", "20")) * 1024 * 1024
+SPOOL_BYTES = 32 * 1024 * 1024                               # zip stays in RAM below this
 
-    msg.add_attachment(zip_data, maintype="application", subtype="zip",
-                       filename=f"{week}-African-Crime-Weekly.zip")
+def _recipients() -> List[str]:
+    return [r.strip() for r in (RECIPIENT or "").split(",") if r.strip()]
 
+def _week(pdf_paths: List[Path]) -> str:
+    return "-".join(Path(pdf_paths[0]).stem.split("-")[:2])   # 2025-W21
+
+def connect(host: Optional[str] = None, port: Optional[int] = None,
+            security: Optional[str] = None) -> smtplib.SMTP:
+    """Open ONE authenticated SMTP session; use as a context manager."""
+    host, port = host or SMTP_HOST, port or SMTP_PORT
+    security = security or SMTP_SECURITY
     context = ssl.create_default_context()
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465, context=context) as server:
+    if security == "ssl":
+        server = smtplib.SMTP_SSL(host, port, context=context)
+    else:
+        server = smtplib.SMTP(host, port)
+        if security == "starttls":
+            server.starttls(context=context)
+    if GMAIL_USER and GMAIL_PASS:
         server.login(GMAIL_USER, GMAIL_PASS)
-        server.send_message(msg)
-    print(f"E-mailed {len(pdf_paths)} reports in one ZIP to {RECIPIENT}")
+    return server
+
+class ZipVolumes:
+    """
+    The PDFs zipped into a spooled buffer (memory, or disk for large weeks),
+    read back as volumes of at most max_bytes, one at a time. A single
+    volume keeps the plain .zip name; larger archives become .zip.001,
+    .zip.002 … (rejoin with `cat`). Use as a context manager.
+    """
+
+    def __init__(self, pdf_paths: List[Path], max_bytes: int = MAX_ATTACHMENT_BYTES):
+        name = f"{_week(pdf_paths)}-African-Crime-Weekly.zip"
+        self.max_bytes = max_bytes
+        self._buf = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+        with zipfile.ZipFile(self._buf, "w", zipfile.ZIP_DEFLATED) as zf:
+            for p in pdf_paths:
+                zf.write(p, Path(p).name)
+        size = self._buf.tell()
+        self.names = [name] if size <= max_bytes else \
+            [f"{name}.{i:03d}" for i in range(1, -(-size // max_bytes) + 1)]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[Tuple[str, bytes]]:
+        """(filename, bytes) per volume; only the volume being sent is held in memory."""
+        for i, filename in enumerate(self.names):
+            self._buf.seek(i * self.max_bytes)
+            yield filename, self._buf.read(self.max_bytes)
+
+    def close(self):
+        self._buf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def build_messages(pdf_paths: List[Path], recipient: str, volumes: ZipVolumes) -> Iterator[EmailMessage]:
+    """One message per ZIP volume, built as it is sent."""
+    week = _week(pdf_paths)
+    for i, (filename, data) in enumerate(volumes, 1):
+        msg = EmailMessage()
+        part = f" (part {i}/{len(volumes)})" if len(volumes) > 1 else ""
+        msg["Subject"] = f"African Crime Weekly – {week}{part}"
+        msg["From"]    = f"Africa Intelligence <{GMAIL_USER}>"
+        msg["To"]      = recipient
+        msg.set_content(
+            "Please find the African Crime Weekly intelligence briefs "
+            f"for week {week} attached (zipped).\n\n"
+            "Reports: Terrorism & Violent Extremism, Organised Crime, "
+            "Financial Crime, Cyber Crime.\n\n"
+            + (f"The archive is split into {len(volumes)} parts; join them "
+               "in order before unzipping.\n\n" if len(volumes) > 1 else "")
+            + "This is an automated product – contents do not reflect "
+            "the opinion of the author(s).\n\n"
+            "African Union – African Crime Weekly (ACW)"
+        )
+        msg.add_attachment(data, maintype="application", subtype="zip", filename=filename)
+        yield msg
+
+def distribute(deliveries: Sequence[Tuple[str, List[Path]]], host: Optional[str] = None,
+               port: Optional[int] = None, security: Optional[str] = None,
+               max_bytes: int = MAX_ATTACHMENT_BYTES) -> int:
+    """
+    Send each (address, PDF set) delivery over a single SMTP session; an
+    address may appear more than once. Identical PDF sets are zipped once.
+    Returns the number of messages sent.
+    """
+    if not deliveries:
+        print("No recipients – nothing e-mailed")
+        return 0
+    zips: Dict[Tuple[str, ...], ZipVolumes] = {}
+    sent = 0
+    try:
+        with connect(host, port, security) as server:
+            for recipient, pdf_paths in deliveries:
+                key = tuple(str(p) for p in pdf_paths)
+                if key not in zips:
+                    zips[key] = ZipVolumes(pdf_paths, max_bytes)
+                for msg in build_messages(pdf_paths, recipient, zips[key]):
+                    server.send_message(msg)
+                    sent += 1
+                print(f"E-mailed {len(pdf_paths)} reports in {len(zips[key])} ZIP part(s) to {recipient}")
+    finally:
+        for volumes in zips.values():
+            volumes.close()
+    return sent
+
+def send(pdf_paths: list[Path], recipients: Optional[List[str]] = None,
+         host: Optional[str] = None, port: Optional[int] = None):
+    """Send all 4 PDFs, zipped, to every recipient (EMAIL_TO is comma-separated)."""
+    recipients = recipients or _recipients()
+    return distribute([(r, pdf_paths) for r in recipients], host, port)
@@ -1,7 +1,21 @@
+import argparse, hashlib, json, os, re, shutil, sys
+from concurrent.futures import ProcessPoolExecutor
+import weasyprint
 from weasyprint import HTML, CSS
+from weasyprint.text.fonts import FontConfiguration
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional
 import datetime as dt
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+PILLARS = ["terrorism", "organised", "financial", "cyber"]
+WEEKLY_DIR = Path("data/weekly")
+CACHE_DIR = Path("data/cache/pdf")
+CACHE_MAX_BYTES = int(os.getenv("ACW_PDF_CACHE_MB", "256")) * 1024 * 1024
+# The footer's generation timestamp changes every run; it is left out of the cache key
+VOLATILE = re.compile(r'(<time class="generation-time">)[^<]*(</time>)')
+
 # --- A4 UK-Intel house style -----------------------------------------------
 A4_CSS = """
 @page {
@@ -40,21 +54,163 @@ h1, h2, h3 { page-break-after: avoid; margin-top: 12pt; margin-bottom: 6pt; }
 """
 
 # ---------------------------------------------------------------------------
-def render(html: str, pillar: str, start: dt.datetime) -> Path:
-    week_str = start.strftime('%Y-W%U')
-    outfile = Path(f"{week_str}-{pillar}.pdf")
+# One FontConfiguration + parsed stylesheet per process (pool workers included)
+_font_config: Optional[FontConfiguration] = None
+_stylesheet: Optional[CSS] = None
+
+def _init_styles():
+    global _font_config, _stylesheet
+    if _stylesheet is None:
+        _font_config = FontConfiguration()
+        _stylesheet = CSS(string=A4_CSS, font_config=_font_config)
 
+def _wrap(html: str, week_str: str) -> str:
     # Inject the week string into the HTML so the running header can read it
-    html = f'<style>{A4_CSS}</style><div style="string-set: week {week_str}">{html}</div>'
-
-    HTML(string=html).write_pdf(outfile, stylesheets=[CSS(string=A4_CSS)])
-    # inside pdf.py  –  add alternative entry point
-    if sys.argv[1] == "weekly":
-        iso_week = datetime.datetime.utcnow().strftime("%G-W%V")
-        with open(f"data/weekly/{iso_week}.json") as f:
-            bundle = json.load(f)
-        html = populate_template("templates/weekly_template.html", bundle)
-        pdf_path = f"data/weekly/{iso_week}.pdf"
-        weasyprint.HTML(string=html).write_pdf(pdf_path)
-        print("Weekly PDF →", pdf_path)
+    return f'<style>{A4_CSS}</style><div style="string-set: week {week_str}">{html}</div>'
+
+# --- content-hash render cache ---------------------------------------------
+def _cache_key(html: Iterable[str], stylesheet: bool = True) -> str:
+    """sha256 over (HTML minus the generation timestamp, A4_CSS, WeasyPrint version) - any change re-renders.
+    html may be a string or its chunks (e.g. the lines of a file), with the same key."""
+    h = hashlib.sha256()
+    for chunk in [html] if isinstance(html, str) else html:
+        h.update(VOLATILE.sub(r"\1\2", chunk).encode("utf-8"))
+    h.update(b"\0")
+    for part in (A4_CSS if stylesheet else "", weasyprint.__version__):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+def _cache_fetch(key: str, outfile: Path, cache_dir: Optional[Path]) -> bool:
+    if cache_dir is None:
+        return False
+    cached = Path(cache_dir) / f"{key}.pdf"
+    if not cached.exists():
+        return False
+    shutil.copyfile(cached, outfile)
+    os.utime(cached)                       # LRU: hits count as recent use
+    return True
+
+def _cache_store(key: str, outfile: Path, cache_dir: Optional[Path]):
+    if cache_dir is None:
+        return
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = cache_dir / f".{key}.{os.getpid()}.tmp"
+    shutil.copyfile(outfile, tmp)
+    os.replace(tmp, cache_dir / f"{key}.pdf")
+
+def evict_cache(cache_dir: Path = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES) -> int:
+    """Drop least-recently-used PDFs until the cache fits in max_bytes."""
+    files = sorted(Path(cache_dir).glob("*.pdf"), key=lambda p: p.stat().st_mtime)
+    total = sum(p.stat().st_size for p in files)
+    removed = 0
+    for p in files:
+        if total <= max_bytes:
+            break
+        total -= p.stat().st_size
+        p.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+# ---------------------------------------------------------------------------
+def _write_pdf(html: str, outfile: Path, cache_dir: Optional[Path] = None,
+               stylesheet: bool = True) -> Path:
+    outfile = Path(outfile)
+    key = _cache_key(html, stylesheet)
+    if _cache_fetch(key, outfile, cache_dir):
+        return outfile
+
+    _init_styles()
+    HTML(string=html).write_pdf(outfile, stylesheets=[_stylesheet] if stylesheet else None,
+                                font_config=_font_config)
+    _cache_store(key, outfile, cache_dir)
+    return outfile
+
+def write_document(html_file: Path, outfile: Path, cache_dir: Optional[Path] = CACHE_DIR) -> Path:
+    """Render a complete HTML document file as-is (no house style), via the cache.
+    The file is hashed line by line and handed to WeasyPrint by name, never read into one string."""
+    html_file, outfile = Path(html_file), Path(outfile)
+    with open(html_file, encoding="utf-8") as f:
+        key = _cache_key(f, stylesheet=False)
+    if not _cache_fetch(key, outfile, cache_dir):
+        _init_styles()
+        HTML(filename=str(html_file)).write_pdf(outfile, font_config=_font_config)
+        _cache_store(key, outfile, cache_dir)
+    if cache_dir is not None:
+        evict_cache(cache_dir)
+    return outfile
+
+def render(html: str, pillar: str, start: dt.datetime, out_dir: Path = Path("."),
+           cache_dir: Optional[Path] = CACHE_DIR) -> Path:
+    week_str = start.strftime('%Y-W%U')
+    outfile = _write_pdf(_wrap(html, week_str), Path(out_dir) / f"{week_str}-{pillar}.pdf", cache_dir)
+    if cache_dir is not None:
+        evict_cache(cache_dir)
     return outfile
+
+def render_all(pillar_html: Dict[str, str], start: Optional[dt.datetime] = None,
+               out_dir: Path = Path("."), workers: Optional[int] = None,
+               cache_dir: Optional[Path] = CACHE_DIR) -> List[Path]:
+    """
+    Render every pillar in its own process; wall time ~ the slowest pillar.
+    Cache hits are copied in the parent and never reach the pool.
+    Paths come back in PILLARS order, then any extra pillars by name.
+    """
+    start = start or dt.datetime.now() - dt.timedelta(days=7)
+    week_str = start.strftime('%Y-W%U')
+    order = [p for p in PILLARS if p in pillar_html] + sorted(p for p in pillar_html if p not in PILLARS)
+
+    jobs = {}
+    for p in order:
+        html = _wrap(pillar_html[p], week_str)
+        outfile = Path(out_dir) / f"{week_str}-{p}.pdf"
+        if not _cache_fetch(_cache_key(html), outfile, cache_dir):
+            jobs[p] = (html, outfile)
+
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    if workers == 1:
+        for html, outfile in jobs.values():
+            _write_pdf(html, outfile, cache_dir)
+    elif jobs:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_styles) as pool:
+            futures = [pool.submit(_write_pdf, html, outfile, cache_dir) for html, outfile in jobs.values()]
+            for f in futures:
+                f.result()
+
+    if cache_dir is not None:
+        evict_cache(cache_dir)
+    return [Path(out_dir) / f"{week_str}-{p}.pdf" for p in order]
+
+# ---------------------------------------------------------------------------
+def render_weekly(bundle_path: Path, out_dir: Path = WEEKLY_DIR,
+                  cache_dir: Optional[Path] = CACHE_DIR) -> List[Path]:
+    """Render the four pillar PDFs from a saved weekly bundle."""
+    from src.analyst import weekly_fusion_intel_style
+
+    bundle = json.loads(Path(bundle_path).read_text(encoding="utf-8"))
+    start = dt.datetime.fromisoformat(bundle["period"]["start"])
+    pillar_html = weekly_fusion_intel_style.generate_pillar_reports(bundle)
+    return render_all(pillar_html, start=start, out_dir=out_dir, cache_dir=cache_dir)
+
+def main():
+    parser = argparse.ArgumentParser(description="Render weekly pillar PDFs")
+    parser.add_argument("mode", nargs="?", default="weekly", choices=["weekly"])
+    parser.add_argument("--bundle", type=Path,
+                        help="Weekly bundle JSON (defaults to the latest in data/weekly)")
+    parser.add_argument("--out-dir", type=Path, default=WEEKLY_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="Always re-render, bypassing the PDF cache")
+    args = parser.parse_args()
+
+    bundle_path = args.bundle
+    if bundle_path is None:
+        bundles = sorted(WEEKLY_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        if not bundles:
+            sys.exit(f"No weekly bundle found in {WEEKLY_DIR}")
+        bundle_path = bundles[-1]
+
+    for path in render_weekly(bundle_path, args.out_dir, None if args.no_cache else CACHE_DIR):
+        print("Weekly PDF →", path)
+
+if __name__ == "__main__":
+    main()
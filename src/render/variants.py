@@ -0,0 +1,104 @@
+"""
+Per-recipient report variants.
+Every variant is cut from ONE enriched report_data; article blocks and
+credibility matrices are rendered once and shared through a FragmentCache.
+"""
+import logging
+import os
+import re
+import datetime as dt
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+from src.analyst import weekly_fusion_intel_style
+from src.analyst.weekly_fusion_intel_style import FragmentCache, PILLAR_HEADINGS
+
+log = logging.getLogger(__name__)
+
+VARIANT_DIR = Path("data/weekly/variants")
+
+def load_distribution(path: Path) -> List[Dict[str, Any]]:
+    """Read recipients from the distribution config; ${VARS} are expanded."""
+    cfg = yaml.safe_load(Path(path).read_text(encoding="utf-8")) or {}
+    recipients = []
+    for r in cfg.get("recipients", []):
+        email = os.path.expandvars(r.get("email", "")).strip()
+        if not email or email.startswith("$"):
+            log.warning(f"Skipping recipient without address: {r.get('name', '?')}")
+            continue
+        recipients.append({
+            "email": email,
+            "name": r.get("name") or email,
+            "countries": {c.lower() for c in r.get("countries") or []},
+            "pillars": [p for p in PILLAR_HEADINGS if p in (r.get("pillars") or PILLAR_HEADINGS)],
+            "tiers": set(r.get("tiers") or []),
+        })
+    return recipients
+
+def _matches(article: Dict[str, Any], countries: set, tiers: set) -> bool:
+    if tiers and article.get("tier", "B") not in tiers:
+        return False
+    if countries:
+        geo = article.get("geo") or {}
+        return str(geo.get("country", "")).lower() in countries
+    return True
+
+def select(data: Dict[str, Any], recipient: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return a filtered view of report_data for one recipient.
+    Article dicts are shared, not copied, so cached fragments still apply.
+    """
+    countries, tiers, pillars = recipient["countries"], recipient["tiers"], recipient["pillars"]
+    keep = lambda arts: [a for a in arts if _matches(a, countries, tiers)]
+
+    selected = {p: keep(data["pillars"][p]) if p in pillars else [] for p in PILLAR_HEADINGS}
+    in_pillars = {id(a) for arts in selected.values() for a in arts}
+    all_articles = [a for a in data["all_articles"] if id(a) in in_pillars]
+
+    return {
+        **data,
+        "pillars": selected,
+        "all_articles": all_articles,
+        "summary": {
+            "total_articles": len(all_articles),
+            **{f"{p}_count": len(arts) for p, arts in selected.items()},
+        },
+        "top_articles": [a for a in data["top_articles"] if id(a) in in_pillars],
+    }
+
+def render_variants(
+    data: Dict[str, Any],
+    recipients: List[Dict[str, Any]],
+    start: dt.datetime,
+    out_dir: Path = VARIANT_DIR,
+    cache_dir: Optional[Path] = None,
+) -> List[Tuple[str, List[Path]]]:
+    """
+    Render each recipient's pillar PDFs. Returns one (email, [pdf paths])
+    per recipient, in config order, ready for email.distribute(); two
+    recipients sharing an address each get their own variant.
+    """
+    from src.render import pdf
+
+    fragments = FragmentCache()
+    deliveries = []
+    used_dirs = set()
+    for r in recipients:
+        variant = select(data, r)
+        pillar_html = weekly_fusion_intel_style.generate_pillar_reports(variant, r["pillars"], fragments)
+        slug = base = re.sub(r"[^\w.-]+", "_", r["name"])
+        n = 1
+        while slug in used_dirs:            # same name twice: keep both variants' PDFs
+            n += 1
+            slug = f"{base}-{n}"
+        used_dirs.add(slug)
+        variant_dir = Path(out_dir) / slug
+        variant_dir.mkdir(parents=True, exist_ok=True)
+        deliveries.append((r["email"], pdf.render_all(
+            pillar_html, start=start, out_dir=variant_dir, cache_dir=cache_dir or pdf.CACHE_DIR
+        )))
+        log.info(f"Variant {r['name']}: {variant['summary']['total_articles']} articles, "
+                 f"{len(pillar_html)} pillar(s)")
+    return deliveries
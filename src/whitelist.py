@@ -0,0 +1,167 @@
+"""
+Whitelist loader.
+Normalises both entry schemas found in the whitelists (url/lang/tier and
+name/url/type/lang) into one, drops duplicates by canonical URL and keeps
+a pickled snapshot per file under data/cache/whitelist/. The snapshot is
+reused while the YAML's mtime/size (or, failing that, its SHA-1) is
+unchanged, so only edited whitelists are parsed again, with libyaml's
+CSafeLoader when available.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+import yaml
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = Path("data/cache/whitelist")
+SNAPSHOT_VERSION = 1
+DEFAULTS = {"lang": "en", "tier": "B", "type": "rss"}
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_memo: Dict[Tuple[str, str], Tuple[Tuple[int, int], List[Dict[str, Any]]]] = {}
+_lock = threading.Lock()
+
+def canonical_url(url: str) -> str:
+    """Identity of a feed URL: scheme, www., default port, fragment and trailing slash ignored."""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    port = f":{parts.port}" if parts.port and parts.port not in (80, 443) else ""
+    return urlunsplit(("", host + port, parts.path.rstrip("/"), parts.query, "")).lstrip("/")
+
+def normalise(entries: List[Any]) -> List[Dict[str, Any]]:
+    """One schema (url, name, lang, tier, type + any extra keys), first occurrence of each URL wins."""
+    out, seen = [], set()
+    for entry in entries or []:
+        if isinstance(entry, str):
+            entry = {"url": entry}
+        if not isinstance(entry, dict) or not entry.get("url"):
+            continue
+        url = str(entry["url"]).strip()
+        key = canonical_url(url)
+        if key in seen:
+            continue
+        seen.add(key)
+        item = dict(DEFAULTS, **{k: v for k, v in entry.items() if v is not None})
+        item["url"] = url
+        item["tier"] = str(item["tier"]).upper()
+        item.setdefault("name", (urlsplit(url).hostname or "").removeprefix("www."))
+        out.append(item)
+    return out
+
+def _snapshot_path(path: Path, key: str) -> Path:
+    return SNAPSHOT_DIR / f"{path.name}.{key}.pickle"
+
+def _parse(path: Path, key: str, raw: bytes) -> List[Dict[str, Any]]:
+    data = yaml.load(raw, Loader=Loader) or {}
+    entries = data.get(key, []) if isinstance(data, dict) else data
+    normalised = normalise(entries)
+    dropped = len(entries or []) - len(normalised)
+    if dropped:
+        log.info(f"{path}: {dropped} duplicate/invalid entries ignored")
+    return normalised
+
+def load(path: Path, key: str = "feeds") -> List[Dict[str, Any]]:
+    """Normalised entries under `key` of a whitelist YAML ([] when the file is missing)."""
+    path = Path(path)
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        log.warning(f"Whitelist file not found: {path}")
+        return []
+    stamp = (st.st_mtime_ns, st.st_size)
+
+    with _lock:
+        memo = _memo.get((str(path), key))
+        if memo and memo[0] == stamp:
+            return [dict(e) for e in memo[1]]
+
+        snapshot = _snapshot_path(path, key)
+        cached = None
+        if snapshot.exists():
+            try:
+                with open(snapshot, "rb") as f:
+                    cached = pickle.load(f)
+                if cached.get("version") != SNAPSHOT_VERSION:
+                    cached = None
+            except Exception as e:
+                log.debug(f"Ignoring unreadable whitelist snapshot {snapshot}: {e}")
+
+        if cached and cached["stamp"] == stamp:
+            entries = cached["entries"]
+        else:
+            raw = path.read_bytes()
+            digest = hashlib.sha1(raw).hexdigest()
+            entries = cached["entries"] if cached and cached["sha1"] == digest else _parse(path, key, raw)
+            try:
+                snapshot.parent.mkdir(parents=True, exist_ok=True)
+                tmp = snapshot.with_suffix(".tmp")
+                with open(tmp, "wb") as f:
+                    pickle.dump({"version": SNAPSHOT_VERSION, "stamp": stamp, "sha1": digest,
+                                 "entries": entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, snapshot)
+            except OSError as e:
+                log.debug(f"Could not write whitelist snapshot {snapshot}: {e}")
+
+        _memo[(str(path), key)] = (stamp, entries)
+        return [dict(e) for e in entries]
+
+def append(path: Path, entries: List[Dict[str, Any]], key: str = "feeds") -> int:
+    """Add entries whose canonical URL is not yet listed; returns how many were written.
+    When `key` is the file's last top-level block the YAML is appended to in place,
+    keeping comments; otherwise the file is rewritten."""
+    path = Path(path)
+    existing = {canonical_url(e["url"]) for e in load(path, key)} if path.exists() else set()
+    new = [e for e in normalise(entries) if canonical_url(e["url"]) not in existing]
+    if not new:
+        return 0
+
+    text = path.read_text(encoding="utf-8") if path.exists() else ""
+    top_level = re.findall(r"^([A-Za-z_][\w-]*):", text, re.MULTILINE)
+    if top_level and top_level[-1] == key:
+        block = yaml.safe_dump(new, allow_unicode=True, sort_keys=False, default_flow_style=False)
+        indented = "".join(f"  {line}\n" for line in block.splitlines())
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(("" if text.endswith("\n") else "\n") + indented)
+    else:
+        data = (yaml.load(text, Loader=Loader) if text else None) or {}
+        data.setdefault(key, [])
+        data[key] = (data[key] or []) + new
+        path.write_text(yaml.safe_dump(data, allow_unicode=True, sort_keys=False,
+                                       default_flow_style=False), encoding="utf-8")
+    return len(new)
+
+def replace_urls(path: Path, replacements: Dict[str, str]) -> int:
+    """Rewrite `url:` values in place (old URL -> new URL, matched canonically), keeping
+    every other line, field and comment; returns how many entries were changed."""
+    path = Path(path)
+    wanted = {canonical_url(old): new for old, new in replacements.items() if old and new
+              and canonical_url(old) != canonical_url(new)}
+    if not wanted or not path.exists():
+        return 0
+    changed = 0
+
+    def swap(match: re.Match) -> str:
+        nonlocal changed
+        new = wanted.get(canonical_url(match.group(3)))
+        if new is None:
+            return match.group(0)
+        changed += 1
+        return f"{match.group(1)}{match.group(2)}{new}{match.group(2)}"
+
+    text = path.read_text(encoding="utf-8")
+    text = re.sub(r"^(\s*(?:-\s+)?url:\s*)(['\"]?)([^\s'\"#]+)\2", swap, text, flags=re.MULTILINE)
+    if changed:
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+    return changed
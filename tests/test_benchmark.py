@@ -0,0 +1,18 @@
+"""Benchmark gate: stage costs are compared relative to the calibration loop, not as raw throughput."""
+from scripts import benchmark
+
+BASELINE = {"sizes": {"10000": {"classification": {"seconds": 0.35, "items_per_second": 28000, "relative": 7.0}}}}
+
+def _results(seconds: float, relative: float):
+    return {"sizes": {"10000": {"classification": {
+        "seconds": seconds, "items_per_second": round(10000 / seconds), "relative": relative}}}}
+
+def test_a_slower_host_is_not_a_regression():
+    assert benchmark.compare(_results(0.7, 7.2), BASELINE, 0.25) == []
+
+def test_a_stage_costlier_than_the_calibration_allows_is():
+    assert len(benchmark.compare(_results(0.35, 9.0), BASELINE, 0.25)) == 1
+
+def test_a_baseline_without_relative_costs_gates_nothing():
+    old = {"sizes": {"10000": {"classification": {"seconds": 0.35, "items_per_second": 90000}}}}
+    assert benchmark.compare(_results(0.35, 9.0), old, 0.25) == []
@@ -0,0 +1,55 @@
+"""Collection deadline: the scheduled start and late starts still get a budget."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src import deadline
+from src.config import CollectionSettings
+
+# the workflow cron `0 0 * * 0` fires Sunday 2026-10-18 00:00 UTC, 03:00 EAT: three hours before the deadline
+CRON_START = datetime(2026, 10, 18, 0, 0, tzinfo=timezone.utc)
+DEADLINE = datetime(2026, 10, 18, 3, 0, tzinfo=timezone.utc)     # Sun 06:00 EAT
+SETTINGS = CollectionSettings(deadline="Sun 06:00", deadline_tz="Africa/Nairobi",
+                              deadline_reserve=1800.0, deadline_min_budget=600.0)
+
+@pytest.fixture(autouse=True)
+def unbounded():
+    yield
+    deadline._cutoff = None
+
+def test_cron_start_targets_this_mornings_deadline():
+    target = deadline.next_occurrence("Sun 06:00", "Africa/Nairobi", CRON_START, deadline.DEADLINE_GRACE)
+    assert target == DEADLINE
+
+def test_cron_start_collects_until_the_reserve():
+    deadline.configure(SETTINGS, now=CRON_START)
+    assert deadline.remaining() == pytest.approx(3 * 3600 - 1800, abs=5)
+
+def test_start_at_the_deadline_gets_the_minimum_budget_not_a_week():
+    deadline.configure(SETTINGS, now=DEADLINE)
+    assert deadline.remaining() == pytest.approx(600.0, abs=5)
+    assert not deadline.expired()
+
+def test_start_inside_the_reserve_gets_the_minimum_budget():
+    deadline.configure(SETTINGS, now=DEADLINE - timedelta(minutes=15))
+    assert deadline.remaining() == pytest.approx(600.0, abs=5)
+    assert not deadline.expired()
+
+def test_start_a_day_early_gets_the_time_left_minus_reserve():
+    deadline.configure(SETTINGS, now=DEADLINE - timedelta(days=1))
+    assert deadline.remaining() == pytest.approx(86400 - 1800, abs=5)
+
+def test_start_well_after_the_deadline_rolls_over_to_next_week():
+    now = DEADLINE + deadline.DEADLINE_GRACE + timedelta(minutes=1)
+    target = deadline.next_occurrence("Sun 06:00", "Africa/Nairobi", now, deadline.DEADLINE_GRACE)
+    assert target == DEADLINE + timedelta(days=7)
+
+def test_grace_spans_midnight():
+    now = datetime(2026, 10, 19, 1, 0, tzinfo=timezone.utc)      # Monday, 2h after Sunday 23:00 UTC
+    target = deadline.next_occurrence("Sun 23:00", "UTC", now, deadline.DEADLINE_GRACE)
+    assert target == datetime(2026, 10, 18, 23, 0, tzinfo=timezone.utc)
+
+def test_run_budget_still_caps_the_minimum():
+    deadline.configure(CollectionSettings(deadline="Sun 06:00", deadline_tz="Africa/Nairobi",
+                                          run_budget=60.0), now=DEADLINE)
+    assert deadline.remaining() == pytest.approx(60.0, abs=5)
@@ -0,0 +1,60 @@
+"""Article bodies: relevance matches whole words, one failing page does not sink the rest."""
+import time
+
+import pytest
+
+from src import deadline
+from src.config import CollectionSettings
+from src.nlp import extract
+
+@pytest.mark.parametrize("title, relevant", [
+    ("Annual report on urban transport", False),       # "port" inside other words
+    ("New passport office opens", False),
+    ("Chadwick wins the cup", False),
+    ("Drug seizure at the port of Mombasa", True),
+    ("Human trafficking ring dismantled", True),       # stem keyword
+    ("Boko  Haram claims raid", True),                 # multi-word keyword
+    ("Election day in Burkina Faso", True),            # multi-word country
+    ("Floods in Chad", True),
+])
+def test_relevance_matches_whole_words(title, relevant):
+    assert extract.is_relevant({"title": title}) is relevant
+
+def test_cache_round_trip_leaves_no_temp_files(tmp_path):
+    record = {"url": "https://example.org/a", "text": "body", "fetched_at": 1.0, "error": None}
+    extract.cache_put(record["url"], record, tmp_path)
+    extract.cache_put(record["url"], record, tmp_path)
+    assert extract.cache_get(record["url"], tmp_path) == record
+    assert [p.suffix for p in tmp_path.rglob("*") if p.is_file()] == [".z"]
+
+def test_one_failing_article_keeps_the_others(tmp_path, monkeypatch):
+    def fetch_body(url, settings, cache_dir):
+        if url.endswith("/bad"):
+            raise OSError("disk full")
+        return {"url": url, "text": f"text of {url}"}
+    monkeypatch.setattr(extract, "fetch_body", fetch_body)
+    articles = [{"title": "Kenya", "link": f"https://example.org/{name}"} for name in ("good", "bad", "fine")]
+    assert extract.fetch_bodies(articles, CollectionSettings(concurrency=2), tmp_path) == 2
+    assert [a.get("body_en") for a in articles] == \
+        ["text of https://example.org/good", None, "text of https://example.org/fine"]
+
+@pytest.fixture
+def no_deadline():
+    yield
+    deadline._cutoff = None
+
+def test_bodies_are_translated_in_batches_per_language_until_the_deadline(tmp_path, monkeypatch, no_deadline):
+    calls = []
+    def translate(texts, lang):
+        calls.append((lang, len(texts)))
+        deadline._cutoff = time.monotonic() - 1      # the first batch uses up the budget
+        return [f"en: {t}" for t in texts]
+    monkeypatch.setattr(extract, "fetch_body", lambda url, settings, cache_dir: {"url": url, "text": url})
+    monkeypatch.setattr(extract.registry, "resolve", lambda name: translate)
+    monkeypatch.setattr(extract, "TRANSLATE_BATCH", 2)
+    articles = [{"title": "Kenya", "link": f"https://example.org/{lang}/{i}", "lang": lang}
+                for lang, n in (("fr", 3), ("en", 1)) for i in range(n)]
+    assert extract.fetch_bodies(articles, CollectionSettings(concurrency=2), tmp_path) == 4
+    assert calls == [("fr", 2)]
+    assert sum(1 for a in articles if a.get("body_en", "").startswith("en: ")) == 2
+    assert articles[-1]["body_en"] == "https://example.org/en/0"
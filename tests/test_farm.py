@@ -0,0 +1,57 @@
+"""Mock feed farm: errors and malformed feeds cost only themselves, but one 429 slows the whole host."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from scripts import mock_feed_farm as farm_mod
+from src.config import CollectionSettings
+from src.net import ratelimit
+
+def _in_window(farm, idx: int) -> int:
+    since = datetime.now(timezone.utc) - timedelta(days=7)
+    return sum(1 for _, _, pub in farm_mod._entries(idx, farm.config.entries, farm.started) if pub >= since)
+
+def test_error_and_malformed_feeds_lose_only_their_own_rows(tmp_path):
+    config = farm_mod.FarmConfig(feeds=40, error_rate=0.1, malformed_rate=0.2, error_statuses=(500, 404))
+    with farm_mod.FeedFarm(config) as farm:
+        result = farm_mod.run_collector(farm, "rss", tmp_path)
+        expected = sum(_in_window(farm, i) for i in range(config.feeds) if config.behaviour(i) == "ok")
+    kinds = [config.behaviour(i) for i in range(config.feeds)]
+    assert kinds.count("error") and kinds.count("malformed")
+    assert result["items"] == expected
+    assert result["errors"] == kinds.count("error")
+    assert result["seconds"] < 5
+
+def _one_429_first(feeds: int) -> farm_mod.FarmConfig:
+    """Config whose only error feed is feed 0, a tier-A feed fetched before the rest."""
+    for seed in range(1000):
+        config = farm_mod.FarmConfig(feeds=feeds, error_rate=0.2, error_statuses=(429,), retry_after=0, seed=seed)
+        if [config.behaviour(i) for i in range(feeds)] == ["error"] + ["ok"] * (feeds - 1):
+            return config
+    pytest.fail("no seed puts the only error on feed 0")
+
+def test_a_429_from_one_feed_throttles_every_feed_on_the_host(tmp_path):
+    serial = CollectionSettings(concurrency=1)
+    with farm_mod.FeedFarm(_one_429_first(5)) as farm:
+        throttled = farm_mod.run_collector(farm, "rss", tmp_path / "throttled", settings=serial)
+        host = ratelimit.LIMITER._buckets[farm.httpd.server_address[0]]
+        assert host.rate < 2.0              # the unthrottled override dropped to about 1 request/s
+    with farm_mod.FeedFarm(farm_mod.FarmConfig(feeds=5)) as farm:
+        clean = farm_mod.run_collector(farm, "rss", tmp_path / "clean", settings=serial)
+    # Retry-After: 0 pauses nothing, yet the four healthy feeds wait about a second each
+    assert throttled["errors"] == 1 and clean.get("errors", 0) == 0
+    assert throttled["seconds"] > 2.0 > clean["seconds"]
+
+def test_rss_and_multilingual_share_one_feed_path(tmp_path, monkeypatch):
+    from src.collectors import multilingual, rss
+    monkeypatch.chdir(tmp_path)
+    end = datetime.now(timezone.utc)
+    with farm_mod.FeedFarm(farm_mod.FarmConfig(feeds=6, malformed_rate=0.2)) as farm:
+        ratelimit.LIMITER.override(farm.httpd.server_address[0], 0.0, 8, 8)
+        farm.write_whitelist(tmp_path / "data/whitelist_sources.yml", "rss")
+        farm.write_whitelist(tmp_path / "data/whitelist_multilingual.yml", "feeds")
+        rss_rows = rss.collect(end - timedelta(days=7), end)
+        multilingual_rows = multilingual.collect(end - timedelta(days=7), end)
+    assert rss_rows and sorted(r["link"] for r in rss_rows) == sorted(r["link"] for r in multilingual_rows)
+    assert all(r["intel_sentence"] == rss.INTEL_MAP[r["pillar"]] and "confidence" in r for r in rss_rows)
+    assert not any("confidence" in r for r in multilingual_rows)
@@ -0,0 +1,61 @@
+"""Body size caps: a body of exactly the limit is accepted, one byte more is refused or truncated;
+an error body left unread does not break the connection for the next request."""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.net import fetch, ratelimit
+
+class Body:
+    url = "https://example.org/page"
+
+    def __init__(self, size: int):
+        self.data = b"x" * size
+
+    def iter_content(self, chunk):
+        for i in range(0, len(self.data), chunk):
+            yield self.data[i:i + chunk]
+
+LIMIT = fetch.CHUNK * 2
+
+def test_body_at_the_limit_is_accepted():
+    assert len(fetch._read(Body(LIMIT), LIMIT, truncate=False)) == LIMIT
+
+def test_body_over_the_limit_is_refused():
+    with pytest.raises(fetch.BodyTooLarge):
+        fetch._read(Body(LIMIT + 1), LIMIT, truncate=False)
+
+def test_truncated_body_is_cut_at_the_limit():
+    assert len(fetch._read(Body(LIMIT + 1), LIMIT, truncate=True)) == LIMIT
+    assert len(fetch._read(Body(LIMIT), LIMIT, truncate=True)) == LIMIT
+
+def test_an_unread_error_body_does_not_poison_the_next_request():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"           # keep-alive, so requests share a connection
+
+        def do_GET(self):
+            status, body = (500, b"error page") if self.path == "/broken" else (200, b"<rss/>")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/rss+xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    ratelimit.LIMITER.override("127.0.0.1", 0.0, 8, 8)
+    http = ratelimit.session()
+    try:
+        for path in ("/broken", "/feed", "/broken", "/feed"):
+            resp = fetch.get(http, base + path, "feed", (5, 5))
+            assert resp.status_code == (500 if path == "/broken" else 200)
+        assert resp.content == b"<rss/>"
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
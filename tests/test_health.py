@@ -0,0 +1,61 @@
+"""Feed state: timeouts never shrink below the configured pair, and concurrent savers keep each other's records."""
+import requests
+
+from src.config import CollectionSettings
+from src.net import health, listings, resolver, schedule
+
+SETTINGS = CollectionSettings()
+FEED = "https://slow.example.org/feed"
+
+def test_a_timed_out_feed_gets_the_configured_timeout_until_it_succeeds(tmp_path):
+    store = health.HealthStore(tmp_path / "feed_health.json")
+    for i in range(5):
+        store.record_success(f"https://slow.example.org/{i}", 0.2)
+    assert store.timeout(FEED, SETTINGS) < SETTINGS.http_timeout       # fast host: shortened
+    store.record_failure(FEED, requests.ConnectionError("HTTPSConnectionPool: Read timed out."))
+    assert store.timeout(FEED, SETTINGS) == SETTINGS.http_timeout
+    store.record_success(FEED, 0.2)
+    assert store.timeout(FEED, SETTINGS) < SETTINGS.http_timeout
+
+def test_concurrent_savers_keep_each_others_records(tmp_path):
+    path = tmp_path / "feed_health.json"
+    run, daemon = health.HealthStore(path), health.HealthStore(path)
+    run.record_success("https://a.example.org/feed", 0.5)
+    daemon.record_failure("https://b.example.org/feed", "HTTP 500")
+    daemon.record_success("https://a.example.org/feed", 0.7)          # newer than the run's copy
+    run.save()
+    daemon.save()
+    run.save()
+    merged = health.HealthStore(path)
+    assert merged.get("https://b.example.org/feed")["failures"] == 1
+    assert merged.get("https://a.example.org/feed")["latencies"] == [0.7]
+
+def test_schedule_and_listing_saves_merge(tmp_path):
+    first, second = schedule.PollSchedule(tmp_path / "s.json"), schedule.PollSchedule(tmp_path / "s.json")
+    first.observe("https://a.example.org/feed", [1000.0, 2000.0])
+    second.observe("https://b.example.org/feed", [1000.0, 2000.0])
+    first.save()
+    second.save()
+    assert schedule.PollSchedule(tmp_path / "s.json").get("https://a.example.org/feed")["newest"] == 2000
+
+    first, second = listings.ListingState(tmp_path / "l.json"), listings.ListingState(tmp_path / "l.json")
+    first.set_selector("https://a.example.org/news", "h2 a")
+    second.mark_seen("https://b.example.org/news", ["https://b.example.org/1"])
+    first.save()
+    second.save()
+    merged = listings.ListingState(tmp_path / "l.json")
+    assert merged.selector("https://a.example.org/news") == "h2 a"
+    assert merged.first_seen("https://b.example.org/news", "https://b.example.org/1")
+
+def test_a_forgotten_resolution_stays_forgotten_after_a_merge(tmp_path):
+    path = tmp_path / "feed_resolution.json"
+    old = resolver.FeedResolver(path)
+    old._store("https://a.example.org/", "https://a.example.org/feed")
+    old.save()
+    run = resolver.FeedResolver(path)
+    assert run.lookup("https://a.example.org/") == "https://a.example.org/feed"
+    run.forget("https://a.example.org/")
+    old.save()                  # still holds the stale resolution
+    run.save()
+    assert resolver.FeedResolver(path).lookup("https://a.example.org/") is None
+    assert not resolver.FeedResolver(path).feedless("https://a.example.org/")
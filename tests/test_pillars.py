@@ -0,0 +1,18 @@
+"""Pillar scoring: keywords match whatever their case, across words and as stems, never mid-word."""
+import pytest
+
+from src.nlp import pillars
+
+@pytest.mark.parametrize("text, pillar", [
+    ("JNIM fighters raid a village near Mopti", "terrorism"),       # upper-case keyword
+    ("Boko  Haram claims the raid", "terrorism"),                   # multi-word keyword
+    ("Human trafficking ring dismantled", "organised"),             # stem keyword
+    ("Money laundering probe into forex dealers", "financial"),
+    ("Annual report on urban transport", "cyber"),                  # "port" inside words: no keyword
+    ("Ransomware attack on a bank: hackers demand bitcoin", "cyber"),
+])
+def test_score(text, pillar):
+    assert pillars.score(text) == pillar
+
+def test_each_keyword_counts_once():
+    assert pillars.score("bomb bomb bomb bomb fraud scam") == "financial"
@@ -0,0 +1,30 @@
+"""--profile: work handed to pool threads shows up in the phase's stats."""
+import pstats
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src import profiling
+
+@pytest.fixture
+def profiler(tmp_path):
+    out = profiling.enable(tmp_path, cpu=True)
+    yield out
+    profiling._cpu = profiling._memory = False
+    profiling._profiles.clear()
+    profiling._thread_profiles.clear()
+
+def busy_worker_function(n):
+    return sum(i * i for i in range(n))
+
+def test_pool_thread_work_is_merged_into_the_phase(profiler):
+    with profiling.phase("collect.rss"):
+        work = profiling.in_thread(busy_worker_function)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(work, [20000] * 4))
+    assert "worker threads" in profiling.finish()
+    stats = pstats.Stats(str(profiler / "collect.rss.pstats"))
+    assert any(func[2] == "busy_worker_function" for func in stats.stats)
+
+def test_in_thread_is_a_no_op_outside_a_profiled_phase():
+    assert profiling.in_thread(busy_worker_function) is busy_worker_function
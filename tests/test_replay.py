@@ -0,0 +1,115 @@
+"""--replay: a recorded run re-collects to the same articles and bodies, with no network."""
+import datetime as dt
+import threading
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src import parsepool
+from src.collectors import rss
+from src.config import CollectionSettings
+from src.net import fetch, health, listings, ratelimit, rawstore, resolver, schedule, websub
+from src.nlp import extract
+
+SETTINGS = CollectionSettings(parse_workers=1, rate_limit=0.0, concurrency=2)
+NOW = dt.datetime.now(dt.timezone.utc)
+
+def _pages(base: str):
+    items = "".join(
+        f"<item><title>Kenya: drug ring {i} dismantled</title><link>{base}/article/{i}</link>"
+        f"<description>Police in Kenya seized cocaine.</description>"
+        f"<pubDate>{format_datetime(NOW - dt.timedelta(hours=i))}</pubDate></item>" for i in (1, 2))
+    article = "<html><body><article><p>{}</p></article></body></html>".format(
+        "Officers seized a large shipment of cocaine at the port, the police said on Monday. " * 3)
+    return {
+        "/": ("text/html", f'<html><head><link rel="alternate" type="application/rss+xml" '
+                           f'href="{base}/feed.xml"></head><body>home</body></html>'),
+        "/feed.xml": ("application/rss+xml", f'<?xml version="1.0"?><rss version="2.0"><channel>'
+                                             f"<title>Farm</title>{items}</channel></rss>"),
+        "/article/1": ("text/html", article),
+        "/article/2": ("text/html", article),
+        "/big.xml": ("application/rss+xml", "x" * 100),
+        "/logo.png": ("image/png", "not a page"),
+    }
+
+@pytest.fixture
+def site():
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            ctype, body = pages.get(self.path, ("text/plain", None))
+            self.send_response(200 if body else 404)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len((body or "").encode())))
+            self.end_headers()
+            self.wfile.write((body or "").encode())
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    pages = _pages(base)
+    ratelimit.LIMITER.override("127.0.0.1", 0.0, 8, 8)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd, base
+    httpd.shutdown()
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    parsepool.configure(SETTINGS)
+    yield tmp_path
+    rawstore._replay = rawstore._run = rawstore._state_dir = None
+    rawstore._root = rawstore.STORE_DIR
+
+def _run(state_dir):
+    """The collection and body phases of main.py for the rss collector."""
+    health.configure(SETTINGS, state_dir / "feed_health.json")
+    schedule.configure(state_dir / "feed_schedule.json")
+    resolver.configure(state_dir / "feed_resolution.json")
+    listings.configure(state_dir / "listings.json")
+    websub.configure(state_dir / "websub.json")
+    articles = rss.collect(NOW - dt.timedelta(days=7), NOW + dt.timedelta(days=1), SETTINGS)
+    extract.fetch_bodies(articles, SETTINGS, state_dir / "bodies")
+    return sorted((a["link"], a["title"], a.get("body_en")) for a in articles)
+
+def test_replay_of_a_run_served_from_state_matches_it(site, workdir):
+    httpd, base = site
+    (workdir / "data").mkdir()
+    (workdir / "data" / "whitelist_sources.yml").write_text(f"rss:\n  - url: {base}/\n", encoding="utf-8")
+    raw, state = workdir / "raw", workdir / "state"
+
+    # first run resolves the homepage and caches both bodies; the second is served from that state
+    rawstore.start_run(raw, state, ["*.json"])
+    _run(state)
+    rawstore.finish_run()
+    run_id = rawstore.start_run(raw, state, ["*.json"])
+    recorded = _run(state)
+    rawstore.finish_run()
+    assert len(recorded) == 2 and all(body for _, _, body in recorded)
+    assert f"{base}/" not in rawstore.load_manifest(run_id, raw)["responses"]     # resolved from state
+
+    httpd.shutdown()
+    manifest = rawstore.start_replay(run_id, raw)
+    replay_state = workdir / "replay" / run_id
+    assert rawstore.restore_state(manifest, replay_state) == 5     # health, schedule, resolution, both bodies
+    assert _run(replay_state) == recorded
+
+@pytest.mark.parametrize("path, kind, error", [
+    ("/big.xml", "feed", fetch.BodyTooLarge),             # refused on Content-Length
+    ("/logo.png", "html", fetch.UnexpectedContentType),
+])
+def test_replay_raises_the_recorded_error_instead_of_an_empty_body(site, workdir, path, kind, error):
+    httpd, base = site
+    raw, http = workdir / "raw", ratelimit.session()
+    run_id = rawstore.start_run(raw)
+    with pytest.raises(error):
+        fetch.get(http, base + path, kind, (5, 5), max_bytes=10)
+    rawstore.finish_run()
+    assert rawstore.load_manifest(run_id, raw)["responses"][base + path]["error"]["type"] == error.__name__
+
+    httpd.shutdown()
+    rawstore.start_replay(run_id, raw)
+    with pytest.raises(error):
+        fetch.get(http, base + path, kind, (5, 5), max_bytes=10 ** 6)
@@ -0,0 +1,32 @@
+"""HTML report: the streamed file is the same document the string renderer builds."""
+import re
+
+from scripts import benchmark
+from src.analyst import weekly_fusion_intel_style as report
+
+GENERATED = re.compile(r'(<time class="generation-time">)[^<]*(</time>)')
+
+def _data(n: int = 60):
+    return benchmark.report_data(benchmark.synthetic_week(n))
+
+def test_streamed_report_matches_the_rendered_string(tmp_path):
+    data = _data()
+    path = report.write_html_report(data, tmp_path / "out" / "report.html")
+    streamed = path.read_text(encoding="utf-8")
+    assert GENERATED.sub(r"\1\2", streamed) == GENERATED.sub(r"\1\2", report.generate_html_report(data))
+    assert streamed.count('class="generation-time"') == 1
+
+def test_fragment_cache_renders_an_article_again_after_it_changes():
+    fragments = report.FragmentCache()
+    article = _data(1)["all_articles"][0]
+    first = fragments.article(article)
+    assert fragments.article(dict(article)) is first          # same content, another dict
+    article["title"] = "Kenya: port seizure updated"
+    assert "port seizure updated" in fragments.article(article)
+
+def test_fragment_cache_matrix_follows_confidence_changes():
+    fragments, articles = report.FragmentCache(), _data(20)["all_articles"]
+    before = fragments.matrix(articles)
+    for article in articles:
+        article["confidence"] = 0.99
+    assert fragments.matrix(articles) == report.render_matrix(articles) != before
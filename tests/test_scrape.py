@@ -0,0 +1,77 @@
+"""Scrape collector: failed article fetches are retried, scraped rows survive re-runs and 304s."""
+import datetime as dt
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.collectors import scrape
+from src.config import CollectionSettings
+from src.net import health, listings, ratelimit
+
+SETTINGS = CollectionSettings(rate_limit=0.0, concurrency=2, fetch_bodies=False)
+NOW = dt.datetime.now(dt.timezone.utc)
+SLUGS = ["police-seize-cocaine-haul", "court-jails-smuggling-ring", "customs-find-ivory-stash"]
+
+def _article(slug: str) -> str:
+    return (f'<html><head><meta property="og:title" content="{slug}">'
+            f'<meta property="article:published_time" content="{NOW.isoformat()}"></head>'
+            f'<body><p>{slug} ' + "and more words about it. " * 5 + "</p></body></html>")
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    state = {"broken": {SLUGS[2]}, "hits": []}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state["hits"].append(self.path)
+            if self.path == "/news":
+                if self.headers.get("If-None-Match") == '"v1"':
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                body = "<html><body><ul class='news'>" + "".join(
+                    f"<li><a href='/2026/10/{slug}'>{slug}</a></li>" for slug in SLUGS) + "</ul></body></html>"
+                status, extra = 200, {"ETag": '"v1"'}
+            else:
+                slug = self.path.rsplit("/", 1)[-1]
+                status, body, extra = (500, "", {}) if slug in state["broken"] else (200, _article(slug), {})
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html")
+            for name, value in extra.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body.encode())))
+            self.end_headers()
+            self.wfile.write(body.encode())
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    ratelimit.LIMITER.override("127.0.0.1", 0.0, 8, 8)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "whitelist_multilingual.yml").write_text(
+        f"feeds:\n  - url: {base}/news\n    type: scrape\n", encoding="utf-8")
+    health.configure(SETTINGS, tmp_path / "feed_health.json")
+    listings.configure(tmp_path / "listings.json")
+    yield state
+    httpd.shutdown()
+
+def _collect():
+    return sorted(row["title"] for row in scrape.collect(NOW - dt.timedelta(days=7), NOW, SETTINGS))
+
+def test_failed_articles_are_retried_and_rows_survive_reruns(site):
+    assert _collect() == sorted(SLUGS[:2])
+
+    site["broken"].clear()
+    site["hits"].clear()
+    assert _collect() == sorted(SLUGS)              # kept rows plus the article that failed before
+    assert site["hits"] == ["/news", f"/2026/10/{SLUGS[2]}"]
+
+    site["hits"].clear()
+    assert _collect() == sorted(SLUGS)              # listing answered 304
+    assert site["hits"] == ["/news"]
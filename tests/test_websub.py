@@ -0,0 +1,39 @@
+"""WebSub state: the weekly run and the daemon save the same file without losing each other's changes."""
+from src.net import websub
+
+HUB = [{"rel": "hub", "href": "https://hub.example.org/"}]
+
+def _note(store, source):
+    store.note(source, {"tier": "A"}, HUB + [{"rel": "self", "href": source}])
+
+def test_concurrent_writers_keep_each_others_changes(tmp_path):
+    path = tmp_path / "websub.json"
+    seed = websub.SubscriptionStore(path)
+    _note(seed, "https://a.example.org/feed")
+    seed.save()
+
+    run, daemon = websub.SubscriptionStore(path), websub.SubscriptionStore(path)
+    assert daemon.due() == ["https://a.example.org/feed"]
+    _note(run, "https://b.example.org/feed")           # the weekly run finds a new hub …
+    daemon.verified("https://a.example.org/feed", 3600)  # … while the daemon activates another
+    daemon.save()
+    run.save()
+
+    merged = websub.SubscriptionStore(path)
+    assert merged.get("https://a.example.org/feed")["state"] == "active"
+    assert merged.get("https://b.example.org/feed")["state"] == "new"
+    assert run.active("https://a.example.org/feed")     # the saver picked up the daemon's change too
+
+def test_each_daemon_sweep_sees_hubs_saved_since(tmp_path, monkeypatch):
+    from scripts import websub_daemon
+    requested = []
+    monkeypatch.setattr(websub, "STORE", websub.SubscriptionStore(tmp_path / "websub.json"))
+    monkeypatch.setattr(websub, "subscribe", lambda session, source, callback: requested.append(source))
+    websub_daemon.renew(None, "https://acw.example.org/websub")     # nothing due: nothing saved
+    assert requested == []
+
+    run = websub.SubscriptionStore(tmp_path / "websub.json")
+    _note(run, "https://b.example.org/feed")
+    run.save()
+    websub_daemon.renew(None, "https://acw.example.org/websub")
+    assert requested == ["https://b.example.org/feed"]
@@ -0,0 +1,66 @@
+"""One collection window for every collector: naive = UTC, a bare end date covers its day."""
+import datetime as dt
+
+from src import parsepool
+from src.collectors import darkweb, sitemap, social_media
+
+UTC = dt.timezone.utc
+
+def test_bare_end_date_covers_the_whole_day():
+    start, end = parsepool.window(dt.datetime(2026, 10, 12), dt.datetime(2026, 10, 18))
+    assert start == dt.datetime(2026, 10, 12, tzinfo=UTC)
+    assert dt.datetime(2026, 10, 18, 23, 59, 59, tzinfo=UTC) <= end < dt.datetime(2026, 10, 19, tzinfo=UTC)
+
+def test_explicit_end_time_is_kept():
+    _, end = parsepool.window(dt.datetime(2026, 10, 12), dt.datetime(2026, 10, 18, 6, 30, tzinfo=UTC))
+    assert end == dt.datetime(2026, 10, 18, 6, 30, tzinfo=UTC)
+
+def test_feed_entries_on_the_end_day_are_kept():
+    def item(day, hour):
+        stamp = dt.datetime(2026, 10, day, hour, tzinfo=UTC).strftime("%a, %d %b %Y %H:%M:%S +0000")
+        return f"<item><title>t</title><link>https://example.org/{day}-{hour}</link><pubDate>{stamp}</pubDate></item>"
+    feed = f'<rss version="2.0"><channel><title>f</title>{item(18, 15)}{item(19, 0)}{item(11, 23)}</channel></rss>'
+    parsed = parsepool.parse(feed.encode(), "application/rss+xml",
+                             dt.datetime(2026, 10, 12), dt.datetime(2026, 10, 18), 10)
+    assert [e.link for e in parsed.entries] == ["https://example.org/18-15"]
+
+def test_child_sitemaps_outside_the_window_are_skipped():
+    start, end = parsepool.window(dt.datetime(2026, 9, 28), dt.datetime(2026, 10, 4))
+    child = lambda loc, lastmod=None: {"loc": loc, "lastmod": lastmod}
+    assert sitemap.may_contain(child("https://example.org/sitemap-2026-09.xml"), start, end)
+    assert sitemap.may_contain(child("https://example.org/sitemap-2026-10.xml"), start, end)
+    assert not sitemap.may_contain(child("https://example.org/sitemap-2026-08.xml"), start, end)
+    assert not sitemap.may_contain(child("https://example.org/sitemap-2026-11.xml"), start, end)
+    assert sitemap.may_contain(child("https://example.org/sitemap.xml?yyyy=2026&mm=10"), start, end)
+    assert not sitemap.may_contain(child("https://example.org/sitemap.xml?year=2026&month=08"), start, end)
+    assert sitemap.may_contain(child("https://example.org/sitemap-12026-08.xml"), start, end)   # not a year
+    assert not sitemap.may_contain(child("https://example.org/news.xml", dt.datetime(2026, 9, 1, tzinfo=UTC)), start, end)
+    assert sitemap.may_contain(child("https://example.org/news.xml", dt.datetime(2026, 12, 1, tzinfo=UTC)), start, end)
+
+class _Response:
+    status_code, headers = 200, {"Content-Type": "application/rss+xml"}
+
+    def __init__(self, content=b"", payload=None):
+        self.content, self.payload = content, payload
+
+    def json(self):
+        return self.payload
+
+def test_social_and_darkweb_posts_on_the_end_day_are_kept(monkeypatch):
+    start, end = dt.datetime(2026, 10, 12), dt.datetime(2026, 10, 18)
+    # on the end day, the day after, before the start
+    stamps = [dt.datetime(2026, 10, 18, tzinfo=UTC) + dt.timedelta(hours=h) for h in (15, 24, -145)]
+    posts = [{"data": {"title": f"Post {i} about a ransomware gang", "selftext": "x" * 60, "author": "a",
+                       "permalink": f"/r/netsec/{i}", "created_utc": t.timestamp()}} for i, t in enumerate(stamps)]
+    monkeypatch.setattr(social_media.fetch, "get",
+                        lambda *a, **k: _Response(payload={"data": {"children": posts}}))
+    rows = social_media.collect_reddit(start, end)
+    assert len(rows) == len({r["source"] for r in rows}) == 7        # the first post, from each subreddit
+    assert {r["link"] for r in rows} == {"https://reddit.com/r/netsec/0"}
+
+    items = "".join(f"<item><title>Leak {i}</title><link>https://example.org/{i}</link><description>d</description>"
+                    f"<pubDate>{t.strftime('%a, %d %b %Y %H:%M:%S +0000')}</pubDate></item>"
+                    for i, t in enumerate(stamps))
+    feed = f'<rss version="2.0"><channel><title>f</title>{items}</channel></rss>'.encode()
+    monkeypatch.setattr(darkweb.fetch, "get", lambda *a, **k: _Response(content=feed))
+    assert {r["link"] for r in darkweb.collect_darkweb_mentions(start, end)} == {"https://example.org/0"}
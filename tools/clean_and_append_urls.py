@@ -5,10 +5,17 @@ to an existing whitelist yaml file used by African-Crime-Weekly.
 """
 
 import sys, os, yaml, requests, itertools
+from pathlib import Path
 from urllib.parse import urlparse
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-SRC_YAML = "whitelist_multilingual.yml"   # existing file in repo root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src import whitelist
+from src.net import ratelimit
+
+http = ratelimit.session(pool_maxsize=32)
+
+SRC_YAML = Path(__file__).parent.parent / "data" / "whitelist_multilingual.yml"
 TIMEOUT  = 10
 MAX_REDIRECTS = 5
 WORKERS = 32
@@ -1327,10 +1334,10 @@ https://iharare.com/
 
 # ---------- helpers ----------
 def url_normalise(url: str) -> str:
-    """Lower-case + remove trailing slash for uniqueness."""
-    return url.strip().rstrip("/").lower()
+    """Canonical form for uniqueness (scheme, www., trailing slash ignored)."""
+    return whitelist.canonical_url(url)
 
-def def guess_meta(url: str):
+def guess_meta(url: str):
     """Return explicit lang per country block."""
     url = url.lower()
     if any(tld in url for tld in (".ao", ".cv", ".mz")):          # lusophone
@@ -1351,7 +1358,7 @@ def def guess_meta(url: str):
 def probe(url: str):
     """Return (url, status_ok, reason)."""
     try:
-        resp = requests.head(url, timeout=TIMEOUT, allow_redirects=True)
+        resp = http.head(url, timeout=TIMEOUT, allow_redirects=True)
         ok = 200 <= resp.status_code < 400
         return url, ok, resp.status_code
     except Exception as e:
@@ -1363,11 +1370,7 @@ def main():
     candidates = list({url_normalise(u): u for u in RAW_HTTPS.strip().splitlines() if u.startswith("http")}.values())
 
     # 2.  load existing YAML so we can skip duplicates
-    if os.path.exists(SRC_YAML):
-        with open(SRC_YAML, encoding="utf8") as f:
-            existing = {url_normalise(entry["url"]): entry for entry in yaml.safe_load(f) or []}
-    else:
-        existing = {}
+    existing = {url_normalise(entry["url"]): entry for entry in whitelist.load(SRC_YAML, "feeds")}
 
     new_urls = [u for u in candidates if url_normalise(u) not in existing]
     print(f"Unique new URLs to test: {len(new_urls)}")
@@ -1395,10 +1398,9 @@ def main():
             "lang": guess_meta(url)
         })
 
-    # 5.  append to file
-    with open(SRC_YAML, "a", encoding="utf8") as f:
-        yaml.safe_dump(entries, f, allow_unicode=True, sort_keys=False)
-    print(f"Appended {len(entries)} records → {SRC_YAML}")
+    # 5.  append under feeds: (comments and existing entries untouched)
+    added = whitelist.append(SRC_YAML, entries, "feeds")
+    print(f"Appended {added} records → {SRC_YAML}")
 
 if __name__ == "__main__":
     main()